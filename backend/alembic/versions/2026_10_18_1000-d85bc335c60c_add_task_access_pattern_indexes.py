@@ -0,0 +1,61 @@
+"""add_task_access_pattern_indexes
+
+Revision ID: d85bc335c60c
+Revises: 3f2fff7978a1
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd85bc335c60c'
+down_revision: Union[str, None] = '3f2fff7978a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Built from column expressions, like the model's and the repository's, so
+# each dialect renders the form its queries use (SQLite: completed IS 0)
+OPEN_DUE_PREDICATE = sa.and_(
+    sa.column('completed', sa.Boolean).is_(False),
+    sa.column('due_date').isnot(None),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so build
+    # the indexes in autocommit mode to avoid locking the tasks table for writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_id_created_at_id', 'tasks',
+            ['user_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_user_id_completed_created_at', 'tasks',
+            ['user_id', 'completed', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_user_id_due_date', 'tasks',
+            ['user_id', 'due_date'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_open_due_date', 'tasks',
+            ['user_id', 'completed', 'due_date'],
+            unique=False, postgresql_concurrently=True,
+            postgresql_where=OPEN_DUE_PREDICATE,
+            sqlite_where=OPEN_DUE_PREDICATE,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_open_due_date', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_due_date', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_completed_created_at', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_created_at_id', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,107 @@
+"""add_task_full_text_search
+
+Revision ID: f86242056f40
+Revises: a67877ef8527
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f86242056f40'
+down_revision: Union[str, None] = 'a67877ef8527'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows per backfill transaction
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _search_vector(row: str) -> str:
+    """The tsvector of a row's title and description (``row`` is NEW or tasks)."""
+    return (
+        f"to_tsvector('english', coalesce({row}.title, '') || ' ' || "
+        f"coalesce({row}.description, ''))"
+    )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+            "title, description, content='tasks', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+            "INSERT INTO tasks_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+            "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+            "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO tasks_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        # Index the rows that already exist
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+        return
+
+    # A stored generated column would rewrite the whole table under an ACCESS
+    # EXCLUSIVE lock. A plain nullable column is a catalog-only change; a
+    # trigger keeps new and edited rows current, and existing rows are filled
+    # in short batches below
+    op.add_column('tasks', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(
+        "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ BEGIN "
+        f"NEW.search_vector = {_search_vector('NEW')}; RETURN NEW; END $$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_search_vector_tg BEFORE INSERT OR UPDATE OF title, description "
+        "ON tasks FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()"
+    )
+    with op.get_context().autocommit_block():
+        # Each batch commits on its own, so row locks are held only briefly
+        bind = op.get_bind()
+        after = 0
+        while True:
+            ids = bind.execute(
+                sa.text(
+                    "WITH batch AS (SELECT id FROM tasks WHERE id > :after ORDER BY id LIMIT :size) "
+                    f"UPDATE tasks SET search_vector = {_search_vector('tasks')} "
+                    "FROM batch WHERE tasks.id = batch.id RETURNING tasks.id"
+                ),
+                {"after": after, "size": BACKFILL_BATCH_SIZE},
+            ).scalars().all()
+            if not ids:
+                break
+            after = max(ids)
+        op.create_index(
+            'ix_tasks_search_vector', 'tasks', [sa.text('search_vector')],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_ai")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_search_vector', table_name='tasks', postgresql_concurrently=True)
+    op.execute("DROP TRIGGER IF EXISTS tasks_search_vector_tg ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS tasks_search_vector_update()")
+    op.drop_column('tasks', 'search_vector')
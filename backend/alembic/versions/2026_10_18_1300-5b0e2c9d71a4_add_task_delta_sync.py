@@ -0,0 +1,49 @@
+"""add_task_delta_sync
+
+Revision ID: 5b0e2c9d71a4
+Revises: f86242056f40
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e2c9d71a4'
+down_revision: Union[str, None] = 'f86242056f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_task_tombstones_user_id_deleted_at_id', 'task_tombstones',
+        ['user_id', 'deleted_at', 'id'], unique=False,
+    )
+
+    # Built concurrently, like the other task indexes (see d85bc335c60c)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_id_updated_at_id', 'tasks',
+            ['user_id', 'updated_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_user_id_updated_at_id', table_name='tasks', postgresql_concurrently=True)
+    op.drop_index('ix_task_tombstones_user_id_deleted_at_id', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
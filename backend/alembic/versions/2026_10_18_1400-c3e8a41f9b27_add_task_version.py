@@ -0,0 +1,26 @@
+"""add_task_version
+
+Revision ID: c3e8a41f9b27
+Revises: 5b0e2c9d71a4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a41f9b27'
+down_revision: Union[str, None] = '5b0e2c9d71a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'version')
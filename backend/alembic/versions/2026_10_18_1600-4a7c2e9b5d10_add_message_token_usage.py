@@ -0,0 +1,28 @@
+"""add_message_token_usage
+
+Revision ID: 4a7c2e9b5d10
+Revises: 9d4f1b6e2a83
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7c2e9b5d10'
+down_revision: Union[str, None] = '9d4f1b6e2a83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversation_messages', sa.Column('prompt_tokens', sa.Integer(), nullable=True))
+    op.add_column('conversation_messages', sa.Column('completion_tokens', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('conversation_messages', 'completion_tokens')
+    op.drop_column('conversation_messages', 'prompt_tokens')
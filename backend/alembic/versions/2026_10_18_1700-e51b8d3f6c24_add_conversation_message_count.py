@@ -0,0 +1,48 @@
+"""add_conversation_message_count
+
+Revision ID: e51b8d3f6c24
+Revises: 4a7c2e9b5d10
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e51b8d3f6c24'
+down_revision: Union[str, None] = '4a7c2e9b5d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'conversations',
+        sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # Backfill the counter, and updated_at, which adding messages never bumped
+    op.execute(
+        """
+        UPDATE conversations SET
+            message_count = (
+                SELECT count(*) FROM conversation_messages
+                WHERE conversation_messages.conversation_id = conversations.id
+            ),
+            updated_at = COALESCE((
+                SELECT max(created_at) FROM conversation_messages
+                WHERE conversation_messages.conversation_id = conversations.id
+            ), updated_at)
+        """
+    )
+    op.create_index(
+        'ix_conversations_user_id_updated_at', 'conversations',
+        ['user_id', 'updated_at'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conversations_user_id_updated_at', table_name='conversations')
+    op.drop_column('conversations', 'message_count')
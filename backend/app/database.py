@@ -1,10 +1,19 @@
 """Database connection and session management."""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, TypeVar
+
+from fastapi import Depends
+from sqlalchemy import Executable, Row, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 from app.config import settings
 
+T = TypeVar("T")
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.database_url,
@@ -15,14 +24,34 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory, created on first use in async mode
+_async_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
 # Base class for models
 Base = declarative_base()
 
 
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Get or create the async session factory (asyncpg / aiosqlite)."""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        async_engine = create_async_engine(
+            settings.async_database_url,
+            echo=settings.debug,
+            pool_pre_ping=True,
+        )
+        # Objects must stay readable after commit without an implicit reload,
+        # which would need a greenlet context outside run_sync
+        _async_sessionmaker = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker
+
+
 def get_db():
     """
     Dependency that provides a database session.
-    
+
     Yields:
         Session: SQLAlchemy database session
     """
@@ -31,3 +60,135 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def run_db(
+    db: "Session | AsyncSession | Database", fn: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """
+    Run sync ORM code against either kind of session.
+
+    AsyncSession work goes through run_sync on the event loop; a plain Session
+    is called inline, as the MCP tools always have. A request's Database
+    handle (from the async agent) defers to Database.run, which keeps blocking
+    sessions off the event loop.
+
+    Args:
+        db: Sync or async session, or a Database handle
+        fn: Callable taking a sync Session as its first argument
+        *args: Extra positional arguments for fn
+        **kwargs: Extra keyword arguments for fn
+
+    Returns:
+        The value returned by fn
+    """
+    if isinstance(db, Database):
+        return await db.run(fn, *args, **kwargs)
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return fn(db, *args, **kwargs)
+
+
+class Database:
+    """
+    Session handle for async route handlers, independent of DATABASE_MODE.
+
+    Handlers pass sync ORM functions to run(). In async mode they execute on
+    the AsyncSession via run_sync without leaving the event loop; in sync mode
+    they execute on the blocking Session in Starlette's threadpool.
+    """
+
+    def __init__(self, session: Session | AsyncSession, sync_session: Session):
+        self.session = session
+        self.sync_session = sync_session
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run fn(session, *args, **kwargs) without blocking the event loop.
+
+        Args:
+            fn: Callable taking a sync Session as its first argument
+            *args: Extra positional arguments for fn
+            **kwargs: Extra keyword arguments for fn
+
+        Returns:
+            The value returned by fn
+        """
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def stream(
+        self, statement: Executable, batch_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream a query's rows in batches from a server-side cursor.
+
+        The rows are read on a dedicated session bound to the same engine, so
+        a StreamingResponse can keep iterating after the request's own session
+        has been released. Only one batch is held in memory at a time.
+
+        Args:
+            statement: Select statement to stream
+            batch_size: Rows fetched per round trip (yield_per)
+
+        Yields:
+            Sequence[Row]: Consecutive batches of at most batch_size rows
+        """
+        statement = statement.execution_options(yield_per=batch_size)
+        if isinstance(self.session, AsyncSession):
+            async with get_async_sessionmaker()(bind=self.session.bind) as session:
+                result = await session.stream(statement)
+                async for batch in result.partitions():
+                    yield batch
+            return
+
+        def batches() -> Iterator[Sequence[Row]]:
+            with SessionLocal(bind=self.sync_session.get_bind()) as session:
+                yield from session.execute(statement).partitions()
+
+        async for batch in iterate_in_threadpool(batches()):
+            yield batch
+
+    @asynccontextmanager
+    async def fork(self) -> AsyncIterator["Database"]:
+        """
+        Open a Database on fresh sessions from the same engine's pool.
+
+        Sessions are not safe for concurrent use, so work that runs alongside
+        the request (e.g. parallel tool calls) takes its own fork. Forks come
+        from the configured factories, so they behave like the request's own
+        sessions (no autoflush; async objects stay readable after commit).
+
+        Yields:
+            Database: Handle whose sessions are closed on exit
+        """
+        sync_session = SessionLocal(bind=self.sync_session.get_bind())
+        try:
+            if isinstance(self.session, AsyncSession):
+                async with get_async_sessionmaker()(bind=self.session.bind) as session:
+                    yield Database(session, sync_session)
+            else:
+                yield Database(sync_session, sync_session)
+        finally:
+            await run_in_threadpool(sync_session.close)
+
+
+async def get_database(
+    db: Annotated[Session, Depends(get_db)],
+) -> AsyncIterator[Database]:
+    """
+    Dependency that provides a Database handle for the configured mode.
+
+    The sync session from get_db is always available as ``sync_session`` for
+    code that still needs a blocking Session (it connects lazily, so it costs
+    nothing when unused).
+
+    Yields:
+        Database: Session handle for the request
+    """
+    if settings.database_mode == "async":
+        async with get_async_sessionmaker()() as session:
+            yield Database(session, db)
+    else:
+        yield Database(db, db)
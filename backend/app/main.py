@@ -5,6 +5,12 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.routers import auth_router, tasks_router, chat_router
+from app.services.cache import get_task_cache
+from app.services.history_cache import get_history_cache
+from app.services.password_pool import get_password_pool
+from app.services.rate_limit import RateLimitMiddleware, rate_limit_policies
+from app.services.token_budget import usage_totals
+from app.services.token_cache import get_token_cache
 
 # Create FastAPI application
 app = FastAPI(
@@ -15,6 +21,9 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Token-bucket limits on login and chat (inside CORS, so 429s carry CORS headers)
+app.add_middleware(RateLimitMiddleware, policies=rate_limit_policies())
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +31,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "ETag", "Retry-After"],
 )
 
 # Include routers
@@ -46,3 +56,15 @@ def root() -> dict:
 def health_check() -> dict:
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+def metrics() -> dict:
+    """Runtime counters for in-process caches and pools."""
+    return {
+        "task_cache": get_task_cache().stats().as_dict(),
+        "token_cache": get_token_cache().stats().as_dict(),
+        "history_cache": get_history_cache().stats().as_dict(),
+        "password_pool": get_password_pool().stats().as_dict(),
+        "llm_usage": usage_totals.as_dict(),
+    }
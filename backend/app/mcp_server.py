@@ -3,11 +3,13 @@
 from typing import Any
 from mcp.server import Server
 from mcp.types import Tool, TextContent
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.database import SessionLocal
-from app.models.task import Task
+from app.config import settings
+from app.database import Database, SessionLocal, get_async_sessionmaker, run_db
+from app.services import task_repository, task_search, task_stats
 
 
 class TaskMCPServer:
@@ -64,6 +66,42 @@ class TaskMCPServer:
                         "required": ["user_id"],
                     },
                 ),
+                Tool(
+                    name="search_tasks",
+                    description="Search a user's tasks by words in the title or description, best match first",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "user_id": {
+                                "type": "integer",
+                                "description": "The ID of the user",
+                            },
+                            "query": {
+                                "type": "string",
+                                "description": "Words to search for",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of results (optional, default 10)",
+                            },
+                        },
+                        "required": ["user_id", "query"],
+                    },
+                ),
+                Tool(
+                    name="task_stats",
+                    description="Get task counts by status, priority and category, plus overdue and due-today counts",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "user_id": {
+                                "type": "integer",
+                                "description": "The ID of the user",
+                            },
+                        },
+                        "required": ["user_id"],
+                    },
+                ),
                 Tool(
                     name="get_task",
                     description="Get details of a specific task",
@@ -108,6 +146,10 @@ class TaskMCPServer:
                                 "type": "boolean",
                                 "description": "New completion status (optional)",
                             },
+                            "version": {
+                                "type": "integer",
+                                "description": "Version from get_task; the update is rejected if the task changed since (optional)",
+                            },
                         },
                         "required": ["user_id", "task_id"],
                     },
@@ -171,12 +213,19 @@ class TaskMCPServer:
         @self.server.call_tool()
         async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
             """Handle tool calls."""
-            db = SessionLocal()
+            if settings.database_mode == "async":
+                db = get_async_sessionmaker()()
+            else:
+                db = SessionLocal()
             try:
                 if name == "create_task":
                     return await self._create_task(db, arguments)
                 elif name == "list_tasks":
                     return await self._list_tasks(db, arguments)
+                elif name == "search_tasks":
+                    return await self._search_tasks(db, arguments)
+                elif name == "task_stats":
+                    return await self._task_stats(db, arguments)
                 elif name == "get_task":
                     return await self._get_task(db, arguments)
                 elif name == "update_task":
@@ -190,10 +239,13 @@ class TaskMCPServer:
                 else:
                     return [TextContent(type="text", text=f"Unknown tool: {name}")]
             finally:
-                db.close()
+                if isinstance(db, AsyncSession):
+                    await db.close()
+                else:
+                    db.close()
 
     async def _create_task(
-        self, db: Session, arguments: dict[str, Any]
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
     ) -> list[TextContent]:
         """Create a new task."""
         from datetime import date as date_type
@@ -238,18 +290,19 @@ class TaskMCPServer:
             except (ValueError, TypeError):
                 pass  # Invalid date format, leave as None
 
-        task = Task(
-            user_id=user_id,
-            title=title,
-            description=description,
-            completed=False,
-            priority=priority_enum,
-            category=category_enum,
-            due_date=due_date,
+        task = await run_db(
+            db,
+            task_repository.create_task,
+            user_id,
+            {
+                "title": title,
+                "description": description,
+                "completed": False,
+                "priority": priority_enum,
+                "category": category_enum,
+                "due_date": due_date,
+            },
         )
-        db.add(task)
-        db.commit()
-        db.refresh(task)
 
         return [
             TextContent(
@@ -259,17 +312,19 @@ class TaskMCPServer:
         ]
 
     async def _list_tasks(
-        self, db: Session, arguments: dict[str, Any]
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
     ) -> list[TextContent]:
         """List all tasks for a user."""
         user_id = arguments["user_id"]
         completed = arguments.get("completed")
 
-        query = db.query(Task).filter(Task.user_id == user_id)
-        if completed is not None:
-            query = query.filter(Task.completed == completed)
-
-        tasks = query.order_by(Task.created_at.desc()).all()
+        tasks = await run_db(
+            db,
+            task_repository.list_tasks,
+            user_id,
+            order="desc",
+            completed=completed,
+        )
 
         if not tasks:
             return [TextContent(type="text", text="No tasks found.")]
@@ -284,29 +339,73 @@ class TaskMCPServer:
 
         return [TextContent(type="text", text="\n".join(task_list))]
 
+    async def _search_tasks(
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
+    ) -> list[TextContent]:
+        """Search tasks by title and description."""
+        user_id = arguments["user_id"]
+        query = arguments.get("query", "")
+        limit = arguments.get("limit") or 10
+
+        tasks = await run_db(db, task_search.search_tasks, user_id, query, limit)
+
+        if not tasks:
+            return [TextContent(type="text", text="No matching tasks found.")]
+
+        task_list = []
+        for task in tasks:
+            status = "✓" if task.completed else "○"
+            task_list.append(
+                f"{status} [{task.id}] {task.title}"
+                + (f" - {task.description}" if task.description else "")
+            )
+
+        return [TextContent(type="text", text="\n".join(task_list))]
+
+    async def _task_stats(
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
+    ) -> list[TextContent]:
+        """Summarize task counts without listing tasks."""
+        user_id = arguments["user_id"]
+
+        stats = await run_db(db, task_stats.get_task_stats, user_id, datetime.utcnow())
+
+        if not stats.total:
+            return [TextContent(type="text", text="No tasks found.")]
+
+        def breakdown(counts: dict) -> str:
+            return ", ".join(f"{key.value}: {count}" for key, count in counts.items() if count)
+
+        text = (
+            f"Total: {stats.total}\n"
+            f"Completed: {stats.completed}\n"
+            f"Pending: {stats.pending}\n"
+            f"Overdue: {stats.overdue}\n"
+            f"Due today: {stats.due_today}\n"
+            f"By priority: {breakdown(stats.by_priority)}\n"
+            f"By category: {breakdown(stats.by_category)}"
+        )
+        return [TextContent(type="text", text=text)]
+
     async def _get_task(
-        self, db: Session, arguments: dict[str, Any]
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
     ) -> list[TextContent]:
         """Get details of a specific task."""
         user_id = arguments["user_id"]
         task_id = arguments["task_id"]
 
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.user_id == user_id)
-            .first()
-        )
+        task = await run_db(db, task_repository.get_task, user_id, task_id)
 
         if not task:
             return [TextContent(type="text", text="Task not found.")]
 
         status = "Complete" if task.completed else "Incomplete"
-        text = f"Task ID: {task.id}\nTitle: {task.title}\nDescription: {task.description}\nStatus: {status}\nCreated: {task.created_at}"
+        text = f"Task ID: {task.id}\nTitle: {task.title}\nDescription: {task.description}\nStatus: {status}\nCreated: {task.created_at}\nVersion: {task.version}"
 
         return [TextContent(type="text", text=text)]
 
     async def _update_task(
-        self, db: Session, arguments: dict[str, Any]
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
     ) -> list[TextContent]:
         """Update a task."""
         from app.models.task import TaskPriority, TaskCategory
@@ -314,27 +413,19 @@ class TaskMCPServer:
         user_id = arguments["user_id"]
         task_id = arguments["task_id"]
 
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.user_id == user_id)
-            .first()
-        )
-
-        if not task:
-            return [TextContent(type="text", text="Task not found.")]
-
+        values: dict[str, Any] = {}
         if "title" in arguments:
-            task.title = arguments["title"]
+            values["title"] = arguments["title"]
         if "description" in arguments:
-            task.description = arguments["description"]
+            values["description"] = arguments["description"]
         if "completed" in arguments:
-            task.completed = arguments["completed"]
+            values["completed"] = arguments["completed"]
         
         # Handle priority update
         if "priority" in arguments:
             try:
                 priority_enum = TaskPriority[arguments["priority"].upper()]
-                task.priority = priority_enum
+                values["priority"] = priority_enum
             except (KeyError, AttributeError):
                 pass  # Invalid priority, skip update
         
@@ -342,7 +433,7 @@ class TaskMCPServer:
         if "category" in arguments:
             try:
                 category_enum = TaskCategory[arguments["category"].upper()]
-                task.category = category_enum
+                values["category"] = category_enum
             except (KeyError, AttributeError):
                 pass  # Invalid category, skip update
         
@@ -354,25 +445,38 @@ class TaskMCPServer:
                     from datetime import datetime as dt
                     # Try ISO datetime format with fromisoformat (handles "2026-02-21T15:30", "2026-02-21T15:30:00", etc.)
                     try:
-                        task.due_date = dt.fromisoformat(due_date_str)
+                        values["due_date"] = dt.fromisoformat(due_date_str)
                     except ValueError:
                         # Try space-separated format "2026-02-21 15:30"
                         if ' ' in due_date_str:
                             try:
-                                task.due_date = dt.strptime(due_date_str, "%Y-%m-%d %H:%M:%S")
+                                values["due_date"] = dt.strptime(due_date_str, "%Y-%m-%d %H:%M:%S")
                             except ValueError:
-                                task.due_date = dt.strptime(due_date_str, "%Y-%m-%d %H:%M")
+                                values["due_date"] = dt.strptime(due_date_str, "%Y-%m-%d %H:%M")
                         else:
                             # Just a date, set time to start of day
-                            task.due_date = dt.strptime(due_date_str, "%Y-%m-%d")
+                            values["due_date"] = dt.strptime(due_date_str, "%Y-%m-%d")
                 except (ValueError, TypeError):
                     pass  # Invalid date format, skip update
             else:
-                task.due_date = None  # Clear due date
+                values["due_date"] = None  # Clear due date
 
-        task.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(task)
+        values["updated_at"] = datetime.utcnow()
+        expected_versions = [arguments["version"]] if arguments.get("version") is not None else None
+        try:
+            task = await run_db(
+                db, task_repository.update_task, user_id, task_id, values, expected_versions
+            )
+        except task_repository.TaskVersionConflict as conflict:
+            return [
+                TextContent(
+                    type="text",
+                    text=f"Task {task_id} was changed by someone else (now version {conflict.task.version}). Fetch it again with get_task and retry.",
+                )
+            ]
+
+        if not task:
+            return [TextContent(type="text", text="Task not found.")]
 
         return [
             TextContent(
@@ -381,51 +485,35 @@ class TaskMCPServer:
         ]
 
     async def _delete_task(
-        self, db: Session, arguments: dict[str, Any]
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
     ) -> list[TextContent]:
         """Delete a task."""
         user_id = arguments["user_id"]
         task_id = arguments["task_id"]
 
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.user_id == user_id)
-            .first()
-        )
+        task = await run_db(db, task_repository.delete_task, user_id, task_id)
 
         if not task:
             return [TextContent(type="text", text="Task not found.")]
 
-        title = task.title
-        db.delete(task)
-        db.commit()
-
         return [
             TextContent(
-                type="text", text=f"Task '{title}' deleted successfully!"
+                type="text", text=f"Task '{task.title}' deleted successfully!"
             )
         ]
 
     async def _mark_task_complete(
-        self, db: Session, arguments: dict[str, Any]
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
     ) -> list[TextContent]:
         """Mark a task as complete."""
         user_id = arguments["user_id"]
         task_id = arguments["task_id"]
 
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.user_id == user_id)
-            .first()
-        )
+        task = await run_db(db, task_repository.set_task_completed, user_id, task_id, True)
 
         if not task:
             return [TextContent(type="text", text="Task not found.")]
 
-        task.completed = True
-        task.updated_at = datetime.utcnow()
-        db.commit()
-
         return [
             TextContent(
                 type="text", text=f"Task '{task.title}' marked as complete! ✓"
@@ -433,25 +521,17 @@ class TaskMCPServer:
         ]
 
     async def _mark_task_incomplete(
-        self, db: Session, arguments: dict[str, Any]
+        self, db: Session | AsyncSession | Database, arguments: dict[str, Any]
     ) -> list[TextContent]:
         """Mark a task as incomplete."""
         user_id = arguments["user_id"]
         task_id = arguments["task_id"]
 
-        task = (
-            db.query(Task)
-            .filter(Task.id == task_id, Task.user_id == user_id)
-            .first()
-        )
+        task = await run_db(db, task_repository.set_task_completed, user_id, task_id, False)
 
         if not task:
             return [TextContent(type="text", text="Task not found.")]
 
-        task.completed = False
-        task.updated_at = datetime.utcnow()
-        db.commit()
-
         return [
             TextContent(
                 type="text", text=f"Task '{task.title}' marked as incomplete."
@@ -1,7 +1,7 @@
 """SQLAlchemy database models."""
 
 from app.models.user import User
-from app.models.task import Task
+from app.models.task import Task, TaskTombstone
 from app.models.conversation import Conversation, ConversationMessage
 
-__all__ = ["User", "Task", "Conversation", "ConversationMessage"]
+__all__ = ["User", "Task", "TaskTombstone", "Conversation", "ConversationMessage"]
@@ -1,7 +1,7 @@
 """Conversation state database model."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -18,6 +18,12 @@ class Conversation(Base):
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+    # Rolling summary of the messages older than the verbatim context window,
+    # covering every message up to and including summary_message_id
+    summary = Column(Text, nullable=True)
+    summary_message_id = Column(Integer, nullable=True)
+    # Maintained by the chat endpoint in the same transaction as the messages
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Relationship to user and messages
     owner = relationship("User", back_populates="conversations")
@@ -25,6 +31,9 @@ class Conversation(Base):
         "ConversationMessage", back_populates="conversation", cascade="all, delete-orphan"
     )
 
+    # list_conversations: a user's conversations, most recently updated first
+    __table_args__ = (Index("ix_conversations_user_id_updated_at", "user_id", "updated_at"),)
+
     def __repr__(self) -> str:
         return f"<Conversation(id={self.id}, user_id={self.user_id})>"
 
@@ -40,6 +49,9 @@ class ConversationMessage(Base):
     )
     role = Column(String(20), nullable=False)  # 'user' or 'assistant'
     content = Column(Text, nullable=False)
+    # Provider-reported token usage of the turn that produced an assistant reply
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationship to conversation
@@ -1,7 +1,7 @@
 """Task database model."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Date, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Date, ForeignKey, Index, Enum as SQLEnum, DDL, event
 from sqlalchemy.orm import relationship
 import enum
 
@@ -44,10 +44,105 @@ class Task(Base):
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+    # Optimistic concurrency: every UPDATE increments it, conditional writes
+    # match on it (exposed as the task's ETag)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
 
     # Relationship to user
     owner = relationship("User", back_populates="tasks")
 
+    # Indexes shaped to the hot per-user queries (see migration d85bc335c60c)
+    __table_args__ = (
+        # Keyset pagination / newest-first listing
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Listing filtered by completion status
+        Index(
+            "ix_tasks_user_id_completed_created_at",
+            "user_id", "completed", "created_at", "id",
+        ),
+        # Due-date range filters
+        Index("ix_tasks_user_id_due_date", "user_id", "due_date"),
+        # Delta sync: changes since an (updated_at, id) position
+        Index("ix_tasks_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        # Open tasks that have a due date (overdue / upcoming lookups). The
+        # constant "completed" key column keeps it strictly cheaper than
+        # ix_tasks_user_id_due_date for SQLite's planner, which otherwise
+        # breaks the tie by index creation order
+        Index(
+            "ix_tasks_open_due_date",
+            "user_id", "completed", "due_date",
+            postgresql_where=completed.is_(False) & due_date.isnot(None),
+            sqlite_where=completed.is_(False) & due_date.isnot(None),
+        ),
+    )
+
     def __repr__(self) -> str:
         status = "✓" if self.completed else " "
         return f"<Task(id={self.id}, title='{self.title}', priority={self.priority.value}, completed=[{status}])>"
+
+
+class TaskTombstone(Base):
+    """Record of a deleted task, kept so delta sync can report the deletion."""
+
+    __tablename__ = "task_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Delta sync: deletions since a (deleted_at, id) position
+        Index("ix_task_tombstones_user_id_deleted_at_id", "user_id", "deleted_at", "id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<TaskTombstone(task_id={self.task_id}, deleted_at={self.deleted_at})>"
+
+
+# Full-text search over title and description. Postgres keeps a tsvector
+# column, maintained by a trigger, with a GIN index; SQLite keeps an
+# external-content FTS5 table in sync with triggers. Migration f86242056f40
+# creates the same objects.
+TASK_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE tasks ADD COLUMN search_vector tsvector",
+        "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ BEGIN "
+        "NEW.search_vector = to_tsvector('english', coalesce(NEW.title, '') || ' ' || "
+        "coalesce(NEW.description, '')); RETURN NEW; END $$ LANGUAGE plpgsql",
+        "CREATE TRIGGER tasks_search_vector_tg BEFORE INSERT OR UPDATE OF title, description "
+        "ON tasks FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()",
+        "CREATE INDEX ix_tasks_search_vector ON tasks USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+        "title, description, content='tasks', content_rowid='id')",
+        "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO tasks_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO tasks_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+    ],
+}
+
+for _dialect, _statements in TASK_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            Task.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect)
+        )
+event.listen(
+    Task.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
+event.listen(
+    Task.__table__,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS tasks_search_vector_update()").execute_if(dialect="postgresql"),
+)
@@ -7,23 +7,41 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
+from app.database import Database, get_database
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
 from app.services.auth import (
     get_password_hash,
     verify_password,
     create_access_token,
+    decode_access_token,
     get_current_user,
+    oauth2_scheme,
+    run_password_work,
 )
+from app.services.token_cache import get_token_cache
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
+def _find_user(db: Session, criterion) -> User | None:
+    """Return the first user matching the criterion."""
+    return db.query(User).filter(criterion).first()
+
+
+def _create_user(db: Session, **values) -> User:
+    """Insert a user and return it with generated columns loaded."""
+    db_user = User(**values)
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_data: UserCreate,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Database, Depends(get_database)],
 ) -> User:
     """
     Register a new user.
@@ -36,40 +54,37 @@ def register_user(
         UserResponse: Created user information
 
     Raises:
-        HTTPException: If username or email already exists
+        HTTPException: If username or email already exists, or 503 if the
+            password pool is saturated
     """
     # Check if username exists
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.run(_find_user, User.username == user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered",
         )
 
     # Check if email exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.run(_find_user, User.email == user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    db_user = User(
+    # Create new user (bcrypt is CPU-bound, run it on the password pool)
+    hashed_password = await run_password_work(get_password_hash, user_data.password)
+    return await db.run(
+        _create_user,
         username=user_data.username,
         email=user_data.email,
         hashed_password=hashed_password,
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    return db_user
 
 
 @router.post("/login", response_model=Token)
-def login_user(
+async def login_user(
     credentials: UserLogin,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[Database, Depends(get_database)],
 ) -> dict:
     """
     Login user and return JWT token.
@@ -82,15 +97,19 @@ def login_user(
         Token: JWT access token
 
     Raises:
-        HTTPException: If credentials are invalid
+        HTTPException: If credentials are invalid, or 503 if the password
+            pool is saturated
     """
     # Find user by username OR email
-    user = db.query(User).filter(
-        (User.username == credentials.username) | (User.email == credentials.username)
-    ).first()
+    user = await db.run(
+        _find_user,
+        (User.username == credentials.username) | (User.email == credentials.username),
+    )
 
     # Verify password
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await run_password_work(
+        verify_password, credentials.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -107,7 +126,7 @@ def login_user(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
+async def get_current_user_info(
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> User:
     """
@@ -120,3 +139,22 @@ def get_current_user_info(
         UserResponse: Current user information
     """
     return current_user
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> None:
+    """
+    Revoke the presented access token.
+
+    The token is dropped from the verified-token cache and put on this
+    process's deny list until its ``exp``, after which the signature check
+    refuses it anyway.
+
+    Args:
+        token: JWT token from request header
+        current_user: Current authenticated user (validates the token)
+    """
+    get_token_cache().revoke(token, decode_access_token(token))
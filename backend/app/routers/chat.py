@@ -1,24 +1,285 @@
 """Chat endpoint for AI-powered task management."""
 
+import asyncio
+import json
+from datetime import datetime
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models.user import User
+from app.config import settings
+from app.database import Database, get_database
 from app.models.conversation import Conversation, ConversationMessage
 from app.schemas.conversation import ChatRequest, ChatResponse
-from app.services.auth import get_current_user
-from app.services.ai_agent import get_ai_agent
+from app.services.auth import Principal, get_current_principal
+from app.services.ai_agent import TOOL_ROUNDS_EXCEEDED_REPLY, get_ai_agent
+from app.services.conversation_context import cached_context, fold_history, load_context
+from app.services.export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    message_export_statement,
+    stream_export,
+)
+from app.services.history_cache import CachedHistory, CachedMessage, get_history_cache
+from app.services.token_budget import PromptBudgetExceeded, TurnUsage
 
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
+# Saved as the reply of a streamed turn whose client left before any text
+INTERRUPTED_REPLY = "(The reply was interrupted before it finished.)"
+
+# Saves of interrupted streams, referenced until they finish
+_interrupted_saves: set[asyncio.Task] = set()
+
+
+def _get_conversation(db: Session, conversation_id: int, user_id: int) -> Conversation | None:
+    """Return the user's conversation, or None if it does not exist."""
+    return (
+        db.query(Conversation)
+        .filter(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user_id,
+        )
+        .first()
+    )
+
+
+def _get_messages(db: Session, conversation_id: int) -> list[ConversationMessage]:
+    """Return a conversation's messages in chronological order."""
+    return (
+        db.query(ConversationMessage)
+        .filter(ConversationMessage.conversation_id == conversation_id)
+        .order_by(ConversationMessage.created_at, ConversationMessage.id)
+        .all()
+    )
+
+
+def _save_turn(
+    db: Session,
+    user_id: int,
+    conversation_id: int | None,
+    user_message: str,
+    started_at: datetime,
+    assistant_response: str,
+    usage: TurnUsage | None = None,
+) -> int:
+    """
+    Save a chat turn in a single transaction.
+
+    Both messages go in one multi-row INSERT, and the conversation's
+    ``updated_at`` and ``message_count`` are bumped in the same transaction.
+    A new conversation (``conversation_id`` None) is inserted there too.
+    After the commit the messages are added to the history cache.
+
+    Args:
+        db: Database session
+        user_id: Owner of the conversation
+        conversation_id: Existing conversation, or None to create one
+        user_message: The user's message
+        started_at: When the turn began (the user message's timestamp)
+        assistant_response: The reply
+        usage: The turn's token usage, stored on the reply
+
+    Returns:
+        int: The conversation ID
+    """
+    now = datetime.utcnow()
+    created = conversation_id is None
+    if created:
+        conversation_id = db.execute(
+            insert(Conversation)
+            .values(user_id=user_id, created_at=started_at, updated_at=now, message_count=2)
+            .returning(Conversation.id)
+        ).scalar_one()
+    else:
+        db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(updated_at=now, message_count=Conversation.message_count + 2),
+            execution_options={"synchronize_session": False},
+        )
+
+    measured = usage is not None and usage.completions > 0
+    message_ids = db.scalars(
+        insert(ConversationMessage).values([
+            {
+                "conversation_id": conversation_id,
+                "role": "user",
+                "content": user_message,
+                "prompt_tokens": None,
+                "completion_tokens": None,
+                "created_at": started_at,
+            },
+            {
+                "conversation_id": conversation_id,
+                "role": "assistant",
+                "content": assistant_response,
+                "prompt_tokens": usage.prompt_tokens if measured else None,
+                "completion_tokens": usage.completion_tokens if measured else None,
+                "created_at": now,
+            },
+        ]).returning(ConversationMessage.id)
+    ).all()
+    db.commit()
+
+    user_message_id, assistant_id = sorted(message_ids)
+    turn = (
+        CachedMessage.create(user_message_id, "user", user_message),
+        CachedMessage.create(assistant_id, "assistant", assistant_response),
+    )
+    if created:
+        get_history_cache().put(conversation_id, CachedHistory(user_id, None, None, turn))
+    else:
+        get_history_cache().append(conversation_id, turn)
+    return conversation_id
+
+
+def _list_conversations(db: Session, user_id: int) -> list[dict]:
+    """Summarize the user's conversations, most recently updated first."""
+    conversations = (
+        db.query(Conversation)
+        .filter(Conversation.user_id == user_id)
+        .order_by(Conversation.updated_at.desc())
+        .all()
+    )
+    return [
+        {
+            "id": conv.id,
+            "created_at": conv.created_at,
+            "updated_at": conv.updated_at,
+            "message_count": conv.message_count,
+        }
+        for conv in conversations
+    ]
+
+
+def _delete_conversation(db: Session, conversation_id: int, user_id: int) -> bool:
+    """Delete a conversation and its messages; False if it does not exist."""
+    conversation = _get_conversation(db, conversation_id, user_id)
+    if not conversation:
+        return False
+
+    # Delete all messages in the conversation
+    db.query(ConversationMessage).filter(
+        ConversationMessage.conversation_id == conversation_id
+    ).delete()
+
+    # Delete the conversation
+    db.delete(conversation)
+    db.commit()
+    get_history_cache().invalidate(conversation_id)
+    return True
+
+
+async def _load_history(
+    db: Database, request: ChatRequest, user_id: int
+) -> list[dict[str, str]]:
+    """
+    Build the bounded context of the requested conversation (empty if new).
+
+    The context is the stored rolling summary plus the most recent messages
+    (see conversation_context), never the full history. Nothing is written:
+    the turn's messages are saved together by _save_turn once the reply is in.
+
+    Raises:
+        HTTPException: If the requested conversation does not exist
+    """
+    if not request.conversation_id:
+        return []
+
+    # A cached history needs no query (not even the ownership check, the
+    # entry records the owner)
+    context = cached_context(request.conversation_id, user_id)
+    if context is not None:
+        return context.as_history()
+
+    conversation = await db.run(_get_conversation, request.conversation_id, user_id)
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found",
+        )
+
+    # Load the summary and recent messages
+    context = await db.run(load_context, conversation)
+    return context.as_history()
+
+
+async def _fold_history(db: Database, conversation_id: int) -> None:
+    """Background task: fold messages past the context window into the summary."""
+    try:
+        async with db.fork() as fold_db:
+            await fold_history(fold_db, conversation_id, get_ai_agent().asummarize)
+    except Exception as e:
+        # The next turn retries; the context stays bounded meanwhile
+        print(f"Failed to update summary of conversation {conversation_id}: {e}")
+
+
+async def _save_interrupted_turn(db: Database, user_id: int, *args) -> None:
+    """Background task: save a streamed turn whose client disconnected."""
+    try:
+        async with db.fork() as save_db:
+            await save_db.run(_save_turn, user_id, *args)
+    except Exception as e:
+        print(f"Failed to save interrupted chat turn of user {user_id}: {e}")
+
+
+def _agent_error_message(e: Exception) -> str:
+    """Log an agent failure and return the reply shown to the user instead."""
+    import traceback
+    error_details = traceback.format_exc()
+    
+    if isinstance(e, PromptBudgetExceeded):
+        print(f"Chat turn refused: {e}")
+        return (
+            "That request is too large for me to handle in one go. "
+            "Please shorten your message or start a new conversation."
+        )
+
+    if isinstance(e, ValueError):
+        # Handle missing API key error specifically
+        print(f"Configuration error in AI agent: {e}")
+        print(f"Full traceback:\n{error_details}")
+        
+        # Check if it's a missing GROQ_API_KEY error
+        if "GROQ_API_KEY" in str(e):
+            return (
+                "⚠️ AI Agent Configuration Error\n\n"
+                "The chatbot AI service is not properly configured. "
+                "The GROQ_API_KEY environment variable is missing.\n\n"
+                "If you're the administrator:\n"
+                "1. Get a free API key from https://console.groq.com\n"
+                "2. Add GROQ_API_KEY to your environment variables\n"
+                "3. Restart the application\n\n"
+                "Please contact support for assistance."
+            )
+        return (
+            f"⚠️ Configuration Error: {str(e)}\n\n"
+            "Please contact support if the issue persists."
+        )
+    
+    # Log the error with more details for debugging
+    print(f"Error in AI agent: {e}")
+    print(f"Full traceback:\n{error_details}")
+    return (
+        "I'm sorry, I encountered an error processing your request. "
+        "Please try again or contact support if the issue persists."
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
 @router.post("", response_model=ChatResponse)
-def chat(
+async def chat(
     request: ChatRequest,
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    background_tasks: BackgroundTasks,
 ) -> ChatResponse:
     """
     Chat endpoint for conversational task management.
@@ -30,6 +291,7 @@ def chat(
         request: Chat request with message and optional conversation_id
         current_user: Current authenticated user from JWT token
         db: Database session
+        background_tasks: Runs the summary fold after the response
         
     Returns:
         ChatResponse with assistant's message and conversation_id
@@ -37,118 +299,193 @@ def chat(
     Raises:
         HTTPException: If conversation not found or unauthorized
     """
-    # Get or create conversation
-    if request.conversation_id:
-        # Load existing conversation
-        conversation = (
-            db.query(Conversation)
-            .filter(
-                Conversation.id == request.conversation_id,
-                Conversation.user_id == current_user.id,
-            )
-            .first()
-        )
-        
-        if not conversation:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found",
-            )
-        
-        # Load conversation history
-        messages = (
-            db.query(ConversationMessage)
-            .filter(ConversationMessage.conversation_id == conversation.id)
-            .order_by(ConversationMessage.created_at)
-            .all()
-        )
-        
-        conversation_history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
-    else:
-        # Create new conversation
-        conversation = Conversation(user_id=current_user.id)
-        db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
-        
-        conversation_history = []
-    
-    # Save user message
-    user_message = ConversationMessage(
-        conversation_id=conversation.id,
-        role="user",
-        content=request.message,
-    )
-    db.add(user_message)
-    db.commit()
+    started_at = datetime.utcnow()
+    conversation_history = await _load_history(db, request, current_user.id)
     
-    # Get AI response using MCP tools
+    # Get AI response using MCP tools. LLM calls and tool coroutines are
+    # awaited on the event loop, so a waiting conversation holds no thread.
+    usage = TurnUsage()
     try:
         ai_agent = get_ai_agent()
-        assistant_response = ai_agent.chat(
+        assistant_response = await ai_agent.achat(
             user_message=request.message,
             conversation_history=conversation_history,
             user_id=current_user.id,
             db=db,
+            usage=usage,
         )
-    except ValueError as e:
-        # Handle missing API key error specifically
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Configuration error in AI agent: {e}")
-        print(f"Full traceback:\n{error_details}")
-        
-        # Check if it's a missing GROQ_API_KEY error
-        if "GROQ_API_KEY" in str(e):
-            assistant_response = (
-                "⚠️ AI Agent Configuration Error\n\n"
-                "The chatbot AI service is not properly configured. "
-                "The GROQ_API_KEY environment variable is missing.\n\n"
-                "If you're the administrator:\n"
-                "1. Get a free API key from https://console.groq.com\n"
-                "2. Add GROQ_API_KEY to your environment variables\n"
-                "3. Restart the application\n\n"
-                "Please contact support for assistance."
-            )
-        else:
-            assistant_response = (
-                f"⚠️ Configuration Error: {str(e)}\n\n"
-                "Please contact support if the issue persists."
-            )
     except Exception as e:
-        # Log the error with more details for debugging
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Error in AI agent: {e}")
-        print(f"Full traceback:\n{error_details}")
-        assistant_response = (
-            "I'm sorry, I encountered an error processing your request. "
-            "Please try again or contact support if the issue persists."
-        )
+        assistant_response = _agent_error_message(e)
     
-    # Save assistant message
-    assistant_message = ConversationMessage(
-        conversation_id=conversation.id,
-        role="assistant",
-        content=assistant_response,
+    # Save both messages (and the conversation, if new) in one transaction
+    conversation_id = await db.run(
+        _save_turn,
+        current_user.id,
+        request.conversation_id,
+        request.message,
+        started_at,
+        assistant_response,
+        usage,
     )
-    db.add(assistant_message)
-    db.commit()
+    if request.conversation_id:
+        background_tasks.add_task(_fold_history, db, conversation_id)
     
     return ChatResponse(
         message=assistant_response,
-        conversation_id=conversation.id,
+        conversation_id=conversation_id,
+    )
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    background_tasks: BackgroundTasks,
+) -> StreamingResponse:
+    """
+    Chat endpoint that streams the reply as Server-Sent Events.
+
+    Events, in order: ``conversation`` (``conversation_id``), then ``token``
+    (``content``) for each text delta and ``tool_call`` / ``tool_result`` as
+    tools run, then ``done`` (``message``, ``conversation_id``) once the full
+    reply has been saved. If the agent fails, an ``error`` event carrying the
+    fallback reply comes before ``done``.
+
+    A new conversation is only inserted with the turn's messages, in one
+    transaction, so its ``conversation`` event comes right before ``done``.
+
+    The saved reply is the final round's text, as ``/api/chat`` would return;
+    text the model streams before calling tools is shown but not kept. If the
+    client disconnects mid-stream, the turn is still saved in the background
+    (with the text so far, or INTERRUPTED_REPLY), since its tool calls may
+    already have changed tasks.
+
+    Args:
+        request: Chat request with message and optional conversation_id
+        current_user: Current authenticated user from JWT token
+        db: Database session
+        background_tasks: Runs the summary fold after the stream ends
+
+    Returns:
+        StreamingResponse: ``text/event-stream`` of chat events
+
+    Raises:
+        HTTPException: If conversation not found or unauthorized
+    """
+    started_at = datetime.utcnow()
+    conversation_history = await _load_history(db, request, current_user.id)
+    if request.conversation_id:
+        background_tasks.add_task(_fold_history, db, request.conversation_id)
+
+    async def events():
+        tokens: list[str] = []
+        usage = TurnUsage()
+        saved = False
+        try:
+            # The body runs after the handler has returned, so it works on its
+            # own sessions rather than the request's (see Database.stream)
+            async with db.fork() as stream_db:
+                if request.conversation_id:
+                    yield _sse("conversation", {"conversation_id": request.conversation_id})
+                try:
+                    ai_agent = get_ai_agent()
+                    async for event in ai_agent.achat_stream(
+                        user_message=request.message,
+                        conversation_history=conversation_history,
+                        user_id=current_user.id,
+                        db=stream_db,
+                        usage=usage,
+                    ):
+                        if event["type"] == "tool_call":
+                            # Text before a tool call is not part of the reply
+                            tokens.clear()
+                        elif event["type"] == "token":
+                            if event["content"] == TOOL_ROUNDS_EXCEEDED_REPLY:
+                                # Replaces the capped round's text, as in achat
+                                tokens.clear()
+                            tokens.append(event["content"])
+                        event_type = event.pop("type")
+                        yield _sse(event_type, event)
+                    assistant_response = "".join(tokens)
+                except Exception as e:
+                    assistant_response = _agent_error_message(e)
+                    yield _sse("error", {"message": assistant_response})
+
+                conversation_id = await stream_db.run(
+                    _save_turn,
+                    current_user.id,
+                    request.conversation_id,
+                    request.message,
+                    started_at,
+                    assistant_response,
+                    usage,
+                )
+                saved = True
+                if not request.conversation_id:
+                    yield _sse("conversation", {"conversation_id": conversation_id})
+                yield _sse(
+                    "done", {"message": assistant_response, "conversation_id": conversation_id}
+                )
+        finally:
+            if not saved:
+                # The client went away (the stream was cancelled or closed);
+                # save on a task of its own, which that cancellation cannot reach
+                task = asyncio.create_task(
+                    _save_interrupted_turn(
+                        db,
+                        current_user.id,
+                        request.conversation_id,
+                        request.message,
+                        started_at,
+                        "".join(tokens) or INTERRUPTED_REPLY,
+                        usage,
+                    )
+                )
+                _interrupted_saves.add(task)
+                task.add_done_callback(_interrupted_saves.discard)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_conversations(
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    format: Annotated[ExportFormat, Query()] = "ndjson",
+) -> StreamingResponse:
+    """
+    Export every message of the user's conversations as NDJSON or CSV.
+
+    Messages are grouped by conversation in chronological order and streamed
+    from a server-side cursor in batches of EXPORT_BATCH_SIZE.
+
+    Args:
+        current_user: Current authenticated user
+        db: Database session
+        format: "ndjson" (default) or "csv"
+
+    Returns:
+        StreamingResponse: Export download
+    """
+    return StreamingResponse(
+        stream_export(
+            db, message_export_statement(current_user.id), format, settings.export_batch_size
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="conversations.{format}"'},
     )
 
 
 @router.get("/{conversation_id}", response_model=dict)
-def get_conversation(
+async def get_conversation(
     conversation_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
 ) -> dict:
     """
     Get a conversation and its messages.
@@ -164,14 +501,7 @@ def get_conversation(
     Raises:
         HTTPException: If conversation not found or unauthorized
     """
-    conversation = (
-        db.query(Conversation)
-        .filter(
-            Conversation.id == conversation_id,
-            Conversation.user_id == current_user.id,
-        )
-        .first()
-    )
+    conversation = await db.run(_get_conversation, conversation_id, current_user.id)
     
     if not conversation:
         raise HTTPException(
@@ -179,12 +509,7 @@ def get_conversation(
             detail="Conversation not found",
         )
     
-    messages = (
-        db.query(ConversationMessage)
-        .filter(ConversationMessage.conversation_id == conversation.id)
-        .order_by(ConversationMessage.created_at)
-        .all()
-    )
+    messages = await db.run(_get_messages, conversation.id)
     
     return {
         "id": conversation.id,
@@ -196,6 +521,8 @@ def get_conversation(
                 "id": msg.id,
                 "role": msg.role,
                 "content": msg.content,
+                "prompt_tokens": msg.prompt_tokens,
+                "completion_tokens": msg.completion_tokens,
                 "created_at": msg.created_at,
             }
             for msg in messages
@@ -204,9 +531,9 @@ def get_conversation(
 
 
 @router.get("", response_model=list[dict])
-def list_conversations(
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+async def list_conversations(
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
 ) -> list[dict]:
     """
     List all conversations for the current user.
@@ -218,29 +545,14 @@ def list_conversations(
     Returns:
         List of conversations with basic info
     """
-    conversations = (
-        db.query(Conversation)
-        .filter(Conversation.user_id == current_user.id)
-        .order_by(Conversation.updated_at.desc())
-        .all()
-    )
-    
-    return [
-        {
-            "id": conv.id,
-            "created_at": conv.created_at,
-            "updated_at": conv.updated_at,
-            "message_count": len(conv.messages),
-        }
-        for conv in conversations
-    ]
+    return await db.run(_list_conversations, current_user.id)
 
 
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_conversation(
+async def delete_conversation(
     conversation_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
 ) -> None:
     """
     Delete a conversation and all its messages.
@@ -253,26 +565,8 @@ def delete_conversation(
     Raises:
         HTTPException: If conversation not found or unauthorized
     """
-    conversation = (
-        db.query(Conversation)
-        .filter(
-            Conversation.id == conversation_id,
-            Conversation.user_id == current_user.id,
-        )
-        .first()
-    )
-    
-    if not conversation:
+    if not await db.run(_delete_conversation, conversation_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found",
         )
-    
-    # Delete all messages in the conversation
-    db.query(ConversationMessage).filter(
-        ConversationMessage.conversation_id == conversation_id
-    ).delete()
-    
-    # Delete the conversation
-    db.delete(conversation)
-    db.commit()
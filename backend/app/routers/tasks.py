@@ -1,22 +1,58 @@
 """Task CRUD endpoints."""
 
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session
-
-from app.database import get_db
-from app.models.task import Task
-from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
-from app.services.auth import get_current_user
+import hashlib
+from datetime import datetime
+from typing import Annotated, Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    status,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.database import Database, get_database
+from app.models.task import Task, TaskPriority, TaskCategory
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskImportResponse,
+    TaskChangesResponse,
+    TaskStatsResponse,
+)
+from app.services import task_repository, task_search, task_stats, task_sync
+from app.services.export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    stream_export,
+    task_export_statement,
+)
+from app.services.auth import Principal, get_current_principal
+from app.services.cache import get_task_cache
+from app.services.task_batch import apply_task_batch
+from app.services.task_import import ImportFormat, import_tasks
+from app.services.task_serialization import TASK_RESPONSE_COLUMNS, dump_task_rows
+from app.services.pagination import encode_cursor, decode_cursor, decode_sync_cursor
 
 router = APIRouter(prefix="/api/{user_id}/tasks", tags=["Tasks"])
 
+task_list_adapter = TypeAdapter(list[TaskResponse])
+
 
 def verify_user_access(
     user_id: int,
-    current_user: User,
+    current_user: Principal,
 ) -> None:
     """
     Verify that the current user has access to the requested user's tasks.
@@ -35,34 +71,187 @@ def verify_user_access(
         )
 
 
+def task_etag(version: int, *scope: object) -> str:
+    """
+    Build a weak ETag from the user's task version and the request scope.
+
+    Args:
+        version: Current task-collection version of the user
+        scope: Values identifying the representation (user, task, query string)
+
+    Returns:
+        str: Weak ETag header value
+    """
+    digest = hashlib.blake2b(repr(scope).encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag using weak comparison.
+
+    Args:
+        if_none_match: Raw If-None-Match header value
+        etag: Current ETag of the resource
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def task_entity_tag(task: Task) -> str:
+    """Strong ETag of a single task, derived from its row version."""
+    return f'"{task.version}"'
+
+
+def if_match_versions(if_match: str | None) -> set[int] | None:
+    """
+    Parse an If-Match header into the task versions it accepts.
+
+    Args:
+        if_match: Raw If-Match header value
+
+    Returns:
+        set[int] | None: Accepted versions, or None when any version is fine
+        (no header, or "*"). Weak and foreign tags never match, per RFC 9110.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    versions = set()
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag.startswith('"') and tag.endswith('"') and tag[1:-1].isdigit():
+            versions.add(int(tag[1:-1]))
+    return versions
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 response carrying the validator headers."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
+
+
 @router.get("", response_model=list[TaskResponse])
-def get_all_tasks(
+async def get_all_tasks(
     user_id: Annotated[int, Path()],
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
-) -> list[Task]:
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    if_none_match: Annotated[str | None, Header()] = None,
+    limit: Annotated[
+        int, Query(ge=1, le=settings.task_page_size_max)
+    ] = settings.task_page_size,
+    cursor: Annotated[str | None, Query()] = None,
+    order: Annotated[Literal["asc", "desc"], Query()] = "asc",
+    completed: Annotated[bool | None, Query()] = None,
+    priority: Annotated[TaskPriority | None, Query()] = None,
+    category: Annotated[TaskCategory | None, Query()] = None,
+    due_after: Annotated[datetime | None, Query()] = None,
+    due_before: Annotated[datetime | None, Query()] = None,
+) -> Response:
     """
-    Get all tasks for the authenticated user.
+    Get one page of tasks for the authenticated user.
+
+    Tasks are ordered by (created_at, id) and paginated with an opaque keyset
+    cursor. When more tasks are available, the cursor for the next page is
+    returned in the X-Next-Cursor response header.
+
+    The response carries an ETag derived from the user's task version and the
+    query string; a matching If-None-Match is answered with 304 before any
+    task is loaded. Serialized pages are cached per user under the same
+    version, so repeated reads skip the task query and serialization. With
+    TASK_FAST_SERIALIZATION enabled, pages are read as Core rows and encoded
+    with orjson instead of going through TaskResponse.
 
     Args:
         user_id: User ID from path
+        request: Incoming request (its query string scopes the ETag)
         current_user: Current authenticated user
         db: Database session
+        if_none_match: Validator from a previous response
+        limit: Maximum number of tasks to return
+        cursor: Cursor from a previous page's X-Next-Cursor header
+        order: Sort direction on (created_at, id)
+        completed: Filter by completion status
+        priority: Filter by priority
+        category: Filter by category
+        due_after: Only tasks due at or after this time
+        due_before: Only tasks due at or before this time
 
     Returns:
-        list[TaskResponse]: List of all tasks
+        list[TaskResponse]: One page of tasks
     """
     verify_user_access(user_id, current_user)
-    tasks = db.query(Task).filter(Task.user_id == user_id).all()
-    return tasks
+
+    version = await db.run(task_repository.get_task_version, user_id)
+    query_scope = sorted(request.query_params.multi_items())
+    etag = task_etag(version, user_id, query_scope)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    # Cached entries hold "<next cursor>\n<json body>"
+    cache = get_task_cache()
+    cache_key = f"{version}:{query_scope!r}"
+    cached = cache.get(str(user_id), cache_key)
+    if cached is not None:
+        next_cursor, _, body = cached.partition(b"\n")
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor.decode()
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    # Fetch one extra row to learn whether another page exists
+    filters = dict(
+        limit=limit + 1,
+        after=decode_cursor(cursor) if cursor else None,
+        order=order,
+        completed=completed,
+        priority=priority,
+        category=category,
+        due_after=due_after,
+        due_before=due_before,
+    )
+    if settings.task_fast_serialization:
+        tasks = await db.run(
+            task_repository.list_task_rows, user_id, TASK_RESPONSE_COLUMNS, **filters
+        )
+    else:
+        tasks = await db.run(task_repository.list_tasks, user_id, **filters)
+
+    next_cursor = ""
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        last = tasks[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+        headers["X-Next-Cursor"] = next_cursor
+
+    if settings.task_fast_serialization:
+        body = dump_task_rows(tasks)
+    else:
+        body = task_list_adapter.dump_json(
+            task_list_adapter.validate_python(tasks, from_attributes=True)
+        )
+    cache.set(str(user_id), cache_key, next_cursor.encode() + b"\n" + body)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     user_id: Annotated[int, Path()],
     task_data: TaskCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    response: Response,
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
 ) -> Task:
     """
     Create a new task for the authenticated user.
@@ -70,6 +259,7 @@ def create_task(
     Args:
         user_id: User ID from path
         task_data: Task creation data
+        response: Outgoing response (used to set the ETag)
         current_user: Current authenticated user
         db: Database session
 
@@ -78,36 +268,247 @@ def create_task(
     """
     verify_user_access(user_id, current_user)
 
-    db_task = Task(
-        title=task_data.title,
-        description=task_data.description,
-        priority=task_data.priority,
-        category=task_data.category,
-        due_date=task_data.due_date,
-        user_id=user_id,
+    task = await db.run(task_repository.create_task, user_id, task_data.model_dump())
+    response.headers["ETag"] = task_entity_tag(task)
+    return task
+
+
+@router.get("/search", response_model=list[TaskResponse])
+async def search_tasks(
+    user_id: Annotated[int, Path()],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    response: Response,
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    limit: Annotated[
+        int, Query(ge=1, le=settings.task_page_size_max)
+    ] = settings.task_page_size,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> list[Task]:
+    """
+    Full-text search over task titles and descriptions, best match first.
+
+    When more results are available, the offset of the next page is returned
+    in the X-Next-Offset response header.
+
+    Args:
+        user_id: User ID from path
+        q: Search text
+        response: Outgoing response (used to set pagination headers)
+        current_user: Current authenticated user
+        db: Database session
+        limit: Maximum number of results
+        offset: Number of results to skip
+
+    Returns:
+        list[TaskResponse]: Matching tasks in rank order
+    """
+    verify_user_access(user_id, current_user)
+
+    tasks = await db.run(task_search.search_tasks, user_id, q, limit + 1, offset)
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        response.headers["X-Next-Offset"] = str(offset + limit)
+
+    return tasks
+
+
+@router.get("/stats", response_model=TaskStatsResponse)
+async def get_task_stats(
+    user_id: Annotated[int, Path()],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+) -> TaskStatsResponse:
+    """
+    Get aggregated task counts for the authenticated user.
+
+    Counts by status, priority and category plus overdue and due-today (UTC)
+    counts come from one GROUP BY query, so no task rows are transferred.
+
+    Args:
+        user_id: User ID from path
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        TaskStatsResponse: Aggregated counts
+    """
+    verify_user_access(user_id, current_user)
+
+    return await db.run(task_stats.get_task_stats, user_id, datetime.utcnow())
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def get_task_changes(
+    user_id: Annotated[int, Path()],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    since: Annotated[str | None, Query()] = None,
+    limit: Annotated[
+        int, Query(ge=1, le=settings.task_page_size_max)
+    ] = settings.task_page_size,
+) -> TaskChangesResponse:
+    """
+    Get the tasks created, updated or deleted since a sync cursor.
+
+    Without ``since`` every live task is returned (an initial sync). Each
+    response carries the cursor to pass as ``since`` next time; while
+    ``has_more`` is true, call again right away to drain the backlog.
+
+    Args:
+        user_id: User ID from path
+        current_user: Current authenticated user
+        db: Database session
+        since: Cursor from a previous sync
+        limit: Maximum number of changes to return
+
+    Returns:
+        TaskChangesResponse: Updated tasks, tombstones and the next cursor
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    verify_user_access(user_id, current_user)
+
+    tasks_position, tombstones_position = (
+        decode_sync_cursor(since) if since else (None, None)
+    )
+    return await db.run(
+        task_sync.get_task_changes,
+        user_id,
+        tasks_position,
+        tombstones_position,
+        since is None,
+        limit,
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    user_id: Annotated[int, Path()],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    format: Annotated[ExportFormat, Query()] = "ndjson",
+) -> StreamingResponse:
+    """
+    Export all of the user's tasks as NDJSON or CSV.
+
+    Rows are streamed from a server-side cursor in batches of
+    EXPORT_BATCH_SIZE, so memory use does not grow with the number of tasks.
+    NDJSON lines have the TaskResponse shape; CSV uses the same fields.
+
+    Args:
+        user_id: User ID from path
+        current_user: Current authenticated user
+        db: Database session
+        format: "ndjson" (default) or "csv"
+
+    Returns:
+        StreamingResponse: Export download
+    """
+    verify_user_access(user_id, current_user)
+
+    return StreamingResponse(
+        stream_export(db, task_export_statement(user_id), format, settings.export_batch_size),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks_endpoint(
+    user_id: Annotated[int, Path()],
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    format: Annotated[ImportFormat, Query()] = "ndjson",
+) -> TaskImportResponse:
+    """
+    Bulk-import tasks from a streamed NDJSON or CSV request body.
+
+    Each record is validated like a TaskCreate body as it is read. Invalid
+    rows are reported and skipped without aborting the import; valid rows are
+    loaded in transactions of TASK_IMPORT_CHUNK_SIZE rows (COPY on Postgres).
+    CSV bodies need a header row naming the TaskCreate fields.
+
+    Args:
+        user_id: User ID from path
+        request: Incoming request (its body is read as a stream)
+        current_user: Current authenticated user
+        db: Database session
+        format: "ndjson" (default) or "csv"
+
+    Returns:
+        TaskImportResponse: Imported and failed counts with per-row errors
+    """
+    verify_user_access(user_id, current_user)
+
+    return await import_tasks(
+        db,
+        user_id,
+        request.stream(),
+        format,
+        settings.task_import_chunk_size,
+        settings.task_import_max_errors,
     )
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
 
-    return db_task
+
+@router.post("/batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    user_id: Annotated[int, Path()],
+    batch: TaskBatchRequest,
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+) -> TaskBatchResponse:
+    """
+    Apply a batch of create/update/complete/delete operations atomically.
+
+    Args:
+        user_id: User ID from path
+        batch: Operations to apply
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        TaskBatchResponse: Per-operation results in request order
+
+    Raises:
+        HTTPException: If the batch is too large or targets a task twice
+    """
+    verify_user_access(user_id, current_user)
+
+    if len(batch.operations) > settings.task_batch_max_operations:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds {settings.task_batch_max_operations} operations",
+        )
+
+    results = await db.run(apply_task_batch, user_id, batch.operations)
+    return TaskBatchResponse(results=results)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task(
+async def get_task(
     user_id: Annotated[int, Path()],
     task_id: Annotated[int, Path()],
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    response: Response,
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> Task:
     """
     Get a specific task by ID.
 
+    The response carries a strong ETag of the task's version, for
+    If-None-Match (304) and for If-Match on a later update.
+
     Args:
         user_id: User ID from path
         task_id: Task ID to retrieve
+        response: Outgoing response (used to set the ETag)
         current_user: Current authenticated user
         db: Database session
+        if_none_match: Validator from a previous response
 
     Returns:
         TaskResponse: Task details
@@ -117,75 +518,87 @@ def get_task(
     """
     verify_user_access(user_id, current_user)
 
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
+    task = await db.run(task_repository.get_task, user_id, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
 
+    etag = task_entity_tag(task)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
     return task
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     user_id: Annotated[int, Path()],
     task_id: Annotated[int, Path()],
     task_data: TaskUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    response: Response,
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
+    if_match: Annotated[str | None, Header()] = None,
 ) -> Task:
     """
     Update an existing task.
 
+    With an If-Match header carrying the task's ETag, the update only applies
+    if nobody changed the task since that version was read; otherwise 412 is
+    returned with the current ETag.
+
     Args:
         user_id: User ID from path
         task_id: Task ID to update
         task_data: Task update data
+        response: Outgoing response (used to set the ETag)
         current_user: Current authenticated user
         db: Database session
+        if_match: ETag of the version being edited
 
     Returns:
         TaskResponse: Updated task
 
     Raises:
-        HTTPException: If task not found
+        HTTPException: If task not found or the If-Match precondition fails
     """
     verify_user_access(user_id, current_user)
 
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
+    # Update only provided fields
+    try:
+        task = await db.run(
+            task_repository.update_task,
+            user_id,
+            task_id,
+            task_data.model_dump(exclude_none=True),
+            if_match_versions(if_match),
+        )
+    except task_repository.TaskVersionConflict as conflict:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Task has been modified",
+            headers={"ETag": task_entity_tag(conflict.task)},
+        )
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
 
-    # Update only provided fields
-    if task_data.title is not None:
-        task.title = task_data.title
-    if task_data.description is not None:
-        task.description = task_data.description
-    if task_data.completed is not None:
-        task.completed = task_data.completed
-    if task_data.priority is not None:
-        task.priority = task_data.priority
-    if task_data.category is not None:
-        task.category = task_data.category
-    if task_data.due_date is not None:
-        task.due_date = task_data.due_date
-
-    db.commit()
-    db.refresh(task)
-
+    response.headers["ETag"] = task_entity_tag(task)
     return task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     user_id: Annotated[int, Path()],
     task_id: Annotated[int, Path()],
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[Principal, Depends(get_current_principal)],
+    db: Annotated[Database, Depends(get_database)],
 ) -> None:
     """
     Delete a task.
@@ -201,12 +614,8 @@ def delete_task(
     """
     verify_user_access(user_id, current_user)
 
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
-    if not task:
+    if not await db.run(task_repository.delete_task, user_id, task_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
-
-    db.delete(task)
-    db.commit()
@@ -1,7 +1,16 @@
 """Pydantic schemas for request/response validation."""
 
 from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskImportResponse,
+    TaskChangesResponse,
+    TaskStatsResponse,
+)
 from app.schemas.conversation import (
     ConversationMessageCreate,
     ConversationMessageResponse,
@@ -19,6 +28,11 @@ __all__ = [
     "TaskCreate",
     "TaskUpdate",
     "TaskResponse",
+    "TaskBatchRequest",
+    "TaskBatchResponse",
+    "TaskImportResponse",
+    "TaskChangesResponse",
+    "TaskStatsResponse",
     "ConversationMessageCreate",
     "ConversationMessageResponse",
     "ConversationCreate",
@@ -1,6 +1,8 @@
 """Task-related Pydantic schemas."""
 
 from datetime import datetime, date
+from typing import Annotated, Literal, Union
+
 from pydantic import BaseModel, Field
 from app.models.task import TaskPriority, TaskCategory
 
@@ -39,5 +41,109 @@ class TaskResponse(BaseModel):
     user_id: int
     created_at: datetime
     updated_at: datetime
+    version: int
 
     model_config = {"from_attributes": True}
+
+
+class TaskBatchCreate(BaseModel):
+    """Batch operation: create a task."""
+
+    op: Literal["create"]
+    task: TaskCreate
+
+
+class TaskBatchUpdate(BaseModel):
+    """Batch operation: update fields of an existing task."""
+
+    op: Literal["update"]
+    task_id: int
+    changes: TaskUpdate
+
+
+class TaskBatchComplete(BaseModel):
+    """Batch operation: set the completion status of a task."""
+
+    op: Literal["complete"]
+    task_id: int
+    completed: bool = True
+
+
+class TaskBatchDelete(BaseModel):
+    """Batch operation: delete a task."""
+
+    op: Literal["delete"]
+    task_id: int
+
+
+TaskBatchOperation = Annotated[
+    Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchComplete, TaskBatchDelete],
+    Field(discriminator="op"),
+]
+
+
+class TaskBatchRequest(BaseModel):
+    """Schema for a batch of task operations applied in one transaction."""
+
+    operations: list[TaskBatchOperation] = Field(..., min_length=1)
+
+
+class TaskBatchResult(BaseModel):
+    """Outcome of a single batch operation, in request order."""
+
+    index: int
+    op: str
+    status: Literal["created", "updated", "deleted", "not_found"]
+    task_id: int | None = None
+    task: TaskResponse | None = None
+
+
+class TaskBatchResponse(BaseModel):
+    """Schema for batch operation results."""
+
+    results: list[TaskBatchResult]
+
+
+class TaskImportError(BaseModel):
+    """A rejected import row and the reason."""
+
+    row: int
+    error: str
+
+
+class TaskImportResponse(BaseModel):
+    """Schema for task import results."""
+
+    imported: int
+    failed: int
+    errors: list[TaskImportError]
+
+
+class TaskTombstoneResponse(BaseModel):
+    """Schema for a deleted task in a delta sync."""
+
+    task_id: int
+    deleted_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class TaskChangesResponse(BaseModel):
+    """Schema for delta sync results."""
+
+    updated: list[TaskResponse]
+    deleted: list[TaskTombstoneResponse]
+    cursor: str
+    has_more: bool
+
+
+class TaskStatsResponse(BaseModel):
+    """Schema for aggregated task statistics."""
+
+    total: int
+    completed: int
+    pending: int
+    overdue: int
+    due_today: int
+    by_priority: dict[TaskPriority, int]
+    by_category: dict[TaskCategory, int]
@@ -5,6 +5,8 @@ from app.services.auth import (
     verify_password,
     create_access_token,
     get_current_user,
+    get_current_principal,
+    Principal,
 )
 
 __all__ = [
@@ -12,4 +14,6 @@ __all__ = [
     "verify_password",
     "create_access_token",
     "get_current_user",
+    "get_current_principal",
+    "Principal",
 ]
@@ -1,14 +1,34 @@
 """AI Agent service using Groq and MCP tools."""
 
+import asyncio
 import os
 import json
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
 from typing import Any
-from groq import Groq
+from groq import AsyncGroq
 from mcp.types import TextContent
 from sqlalchemy.orm import Session
 
+from app.database import Database
 from app.mcp_server import task_mcp_server
 from app.config import settings
+from app.services.token_budget import (
+    PromptBudgetExceeded,
+    TurnUsage,
+    compact_tool_result,
+    fit_prompt,
+    usage_totals,
+)
+
+# Longest excerpt of one message passed to the summarizer
+SUMMARY_MESSAGE_CHARS = 2000
+
+# Reply when the model still asks for tools after chat_max_tool_rounds rounds
+TOOL_ROUNDS_EXCEEDED_REPLY = (
+    "I had to stop: that request needed more tool steps than I can take in one "
+    "turn. Please break it into smaller requests."
+)
 
 
 class AIAgent:
@@ -24,7 +44,7 @@ class AIAgent:
         if not api_key:
             raise ValueError("GROQ_API_KEY must be set in .env file or environment variables")
         
-        self.client = Groq(api_key=api_key)
+        self.async_client = AsyncGroq(api_key=api_key)
         # Using Llama 3.3 70B - newest and most capable model on Groq!
         self.model = "llama-3.3-70b-versatile"
         
@@ -96,6 +116,48 @@ class AIAgent:
                     },
                 },
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "task_stats",
+                    "description": "Get the user's task counts: total, completed, pending, overdue, due today, and breakdowns by priority and category. Use this for any counting or summary question instead of listing every task.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "user_id": {
+                                "type": "integer",
+                                "description": "The ID of the user",
+                            },
+                        },
+                        "required": ["user_id"],
+                    },
+                },
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_tasks",
+                    "description": "Search the user's tasks by words in the title or description, best match first. Use this to find a task the user refers to by name instead of listing every task.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "user_id": {
+                                "type": "integer",
+                                "description": "The ID of the user",
+                            },
+                            "query": {
+                                "type": "string",
+                                "description": "Words from the task title or description",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of results (optional, default 10)",
+                            },
+                        },
+                        "required": ["user_id", "query"],
+                    },
+                },
+            },
             {
                 "type": "function",
                 "function": {
@@ -159,6 +221,10 @@ class AIAgent:
                                 "type": "string",
                                 "description": "New due date in YYYY-MM-DD format (optional)",
                             },
+                            "version": {
+                                "type": "integer",
+                                "description": "Version shown by get_task; pass it so the update is rejected if the task changed in the meantime (optional)",
+                            },
                         },
                         "required": ["user_id", "task_id"],
                     },
@@ -229,13 +295,15 @@ class AIAgent:
             },
         ]
 
-    async def _call_mcp_tool(self, tool_name: str, arguments: dict[str, Any], db: Session) -> str:
+    async def _call_mcp_tool(
+        self, tool_name: str, arguments: dict[str, Any], db: Session | Database
+    ) -> str:
         """Call an MCP tool and return the result.
         
         Args:
             tool_name: Name of the tool to call
             arguments: Arguments to pass to the tool
-            db: Database session (passed from the request context)
+            db: Session or Database handle (passed from the request context)
             
         Returns:
             The tool result as a string
@@ -246,6 +314,10 @@ class AIAgent:
             result = await task_mcp_server._create_task(db, arguments)
         elif tool_name == "list_tasks":
             result = await task_mcp_server._list_tasks(db, arguments)
+        elif tool_name == "search_tasks":
+            result = await task_mcp_server._search_tasks(db, arguments)
+        elif tool_name == "task_stats":
+            result = await task_mcp_server._task_stats(db, arguments)
         elif tool_name == "get_task":
             result = await task_mcp_server._get_task(db, arguments)
         elif tool_name == "update_task":
@@ -266,21 +338,10 @@ class AIAgent:
         
         return str(result)
 
-    def chat(self, user_message: str, conversation_history: list[dict[str, str]], user_id: int, db: Session) -> str:
-        """
-        Process a chat message and return the assistant's response.
-        
-        Args:
-            user_message: The user's message
-            conversation_history: List of previous messages [{"role": "user/assistant", "content": "..."}]
-            user_id: The ID of the user for tool calls
-            db: Database session from the request context
-            
-        Returns:
-            The assistant's response
-        """
-        import asyncio
-        
+    def _build_messages(
+        self, user_message: str, conversation_history: list[dict[str, str]], user_id: int
+    ) -> list[dict[str, Any]]:
+        """Build the model input: system prompt, history, then the new message."""
         # Build messages with enhanced system prompt
         messages = [
             {
@@ -311,7 +372,7 @@ class AIAgent:
                     "   - Use task_id from list results for all operations\\n"
                     "   - Examples:\\n"
                     "     * 'Update my first task priority to high' → list_tasks, get ID from first item, update_task\\n"
-                    "     * 'Mark buy groceries as done' → list_tasks (find ID), then mark_task_complete\\n"
+                    "     * 'Mark buy groceries as done' → search_tasks (query='buy groceries'), then mark_task_complete\\n"
                     "     * 'Set task 5 category to work' → update_task with task_id=5, category='work'\\n"
                     "     * 'Change first task due date to Friday' → list_tasks, get first ID, update with due_date\\n\\n"
                     
@@ -322,10 +383,10 @@ class AIAgent:
                     "     * Extract its task_id\\n"
                     "     * THEN call update_task with that task_id\\n"
                     "   - When user references a task by name/title:\\n"
-                    "     * Call list_tasks first\\n"
-                    "     * Search for matching title\\n"
+                    "     * Call search_tasks with words from the title\\n"
+                    "     * Pick the best matching result (fall back to list_tasks if nothing matches)\\n"
                     "     * Use that task's ID for update/delete\\n"
-                    "   - ALWAYS call list_tasks BEFORE update_task if task_id is not explicitly provided\\n"
+                    "   - ALWAYS look the task up (search_tasks or list_tasks) BEFORE update_task if task_id is not explicitly provided\\n"
                     "   - NEVER guess or assume task IDs\\n\\n"
                     
                     "4. AI-POWERED SMART FEATURES:\\n"
@@ -373,7 +434,7 @@ class AIAgent:
                     
                     "6. ENHANCED FEATURES:\n"
                     "   - When listing tasks, format them nicely with status indicators: [✓] or [○]\n"
-                    "   - Provide task statistics when relevant (e.g., 'You have 5 pending tasks')\n"
+                    "   - Provide task statistics when relevant (e.g., 'You have 5 pending tasks') - get the numbers from task_stats, never by listing tasks and counting\n"
                     "   - Suggest productivity tips occasionally\n"
                     "   - Detect patterns (e.g., 'Looks like you have several shopping tasks!')\n"
                     "   - Offer bulk operations when appropriate\n\n"
@@ -396,75 +457,352 @@ class AIAgent:
         
         # Add current user message
         messages.append({"role": "user", "content": user_message})
-        
-        # Make initial API call
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            tools=self.tools,
-            tool_choice="auto",
-        )
-        
-        assistant_message = response.choices[0].message
-        
-        # Handle tool calls
-        while assistant_message.tool_calls:
-            # Add assistant message with tool calls to messages
-            messages.append({
-                "role": "assistant",
-                "content": assistant_message.content,
-                "tool_calls": [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments,
-                        }
-                    }
+        return messages
+
+    @staticmethod
+    def _tool_arguments(arguments: str, user_id: int) -> dict[str, Any]:
+        """Parse a tool call's JSON arguments, defaulting user_id to the caller."""
+        function_args = json.loads(arguments)
+
+        # Ensure user_id is in the arguments
+        if "user_id" not in function_args:
+            function_args["user_id"] = user_id
+        return function_args
+
+    async def _arun_tool(self, name: str, arguments: str, user_id: int, db: Database) -> str:
+        """Await one tool call from the model and return its text result."""
+        return await self._call_mcp_tool(name, self._tool_arguments(arguments, user_id), db)
+
+    async def _arun_tools(
+        self, calls: list[dict[str, str]], user_id: int, db: Database
+    ) -> AsyncIterator[tuple[int, str]]:
+        """
+        Run one turn's tool calls concurrently, yielding results as they finish.
+
+        Calls naming the same ``task_id`` (compared as an int, since the model
+        writes ``5`` and ``"5"`` interchangeably) form a chain that runs in order;
+        chains, and calls without a task (list, search, stats, create), run
+        side by side, each on its own fork of the request's sessions. A
+        single chain runs on ``db`` itself.
+
+        Args:
+            calls: Tool calls as {"id", "name", "arguments"}
+            user_id: The ID of the user for tool calls
+            db: Database handle from the request context
+
+        Yields:
+            tuple[int, str]: Index into ``calls`` and the tool's text result
+        """
+        chains: dict[tuple[str, int], list[int]] = {}
+        for index, call in enumerate(calls):
+            try:
+                task_id = json.loads(call["arguments"]).get("task_id")
+                if task_id is not None:
+                    task_id = int(task_id)
+            except (ValueError, TypeError, AttributeError):
+                task_id = None
+            key = ("task", task_id) if task_id is not None else ("call", index)
+            chains.setdefault(key, []).append(index)
+
+        if len(chains) == 1:
+            for index, call in enumerate(calls):
+                yield index, await self._arun_tool(call["name"], call["arguments"], user_id, db)
+            return
+
+        finished: asyncio.Queue[tuple[int, str | BaseException]] = asyncio.Queue()
+
+        async def run_chain(indexes: list[int]) -> None:
+            async with db.fork() as chain_db:
+                for index in indexes:
+                    call = calls[index]
+                    try:
+                        result = await self._arun_tool(
+                            call["name"], call["arguments"], user_id, chain_db
+                        )
+                    except Exception as exc:
+                        finished.put_nowait((index, exc))
+                        return
+                    finished.put_nowait((index, result))
+
+        tasks = [asyncio.create_task(run_chain(indexes)) for indexes in chains.values()]
+        try:
+            for _ in calls:
+                index, result = await finished.get()
+                if isinstance(result, BaseException):
+                    raise result
+                yield index, result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _fit_request(self, messages: list[dict[str, Any]], usage: TurnUsage) -> None:
+        """Check an outgoing completion against the prompt budget, trimming history."""
+        before = len(messages)
+        estimate = fit_prompt(messages, self.tools, settings.chat_prompt_max_tokens)
+        usage.trimmed_messages += before - len(messages)
+        usage.record_request(estimate)
+
+    @staticmethod
+    def _compact_tool_result(result: str, usage: TurnUsage) -> str:
+        """Cap a tool result at the per-result token limit."""
+        compacted = compact_tool_result(result, settings.chat_tool_result_max_tokens)
+        if compacted is not result:
+            usage.truncated_tool_results += 1
+        return compacted
+
+    async def achat(
+        self,
+        user_message: str,
+        conversation_history: list[dict[str, str]],
+        user_id: int,
+        db: Database,
+        usage: TurnUsage | None = None,
+    ) -> str:
+        """
+        Process a chat message on the event loop and return the response.
+
+        The async Groq client is awaited for each completion and the MCP tool
+        coroutines are awaited directly, so no thread is held while the model
+        is thinking. At most ``chat_max_tool_rounds`` rounds of tool calls run;
+        if the model asks for more, TOOL_ROUNDS_EXCEEDED_REPLY is returned.
+
+        Args:
+            user_message: The user's message
+            conversation_history: List of previous messages [{"role": "user/assistant", "content": "..."}]
+            user_id: The ID of the user for tool calls
+            db: Database handle from the request context
+            usage: Filled in with the turn's token accounting, if given
+
+        Returns:
+            The assistant's response
+
+        Raises:
+            PromptBudgetExceeded: If a completion cannot fit the prompt budget
+        """
+        messages = self._build_messages(user_message, conversation_history, user_id)
+
+        with _accounted(usage if usage is not None else TurnUsage()) as usage:
+            # One completion per tool round, plus the one that answers
+            for tool_round in range(settings.chat_max_tool_rounds + 1):
+                self._fit_request(messages, usage)
+                response = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    tools=self.tools,
+                    tool_choice="auto",
+                )
+                usage.record_usage(getattr(response, "usage", None))
+                assistant_message = response.choices[0].message
+                if not assistant_message.tool_calls:
+                    return assistant_message.content or "I'm not sure how to respond to that."
+                if tool_round == settings.chat_max_tool_rounds:
+                    break
+
+                calls = [
+                    {"id": tc.id, "name": tc.function.name, "arguments": tc.function.arguments}
                     for tc in assistant_message.tool_calls
                 ]
-            })
-            
-            # Execute each tool call
-            for tool_call in assistant_message.tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                # Ensure user_id is in the arguments
-                if "user_id" not in function_args:
-                    function_args["user_id"] = user_id
-                
-                # Call the MCP tool
-                try:
-                    loop = asyncio.get_event_loop()
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                tool_result = loop.run_until_complete(
-                    self._call_mcp_tool(function_name, function_args, db)
+                messages.append(_assistant_tool_message(assistant_message.content, calls))
+                results: list[str] = [""] * len(calls)
+                async for index, tool_result in self._arun_tools(calls, user_id, db):
+                    results[index] = self._compact_tool_result(tool_result, usage)
+                for call, tool_result in zip(calls, results):
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": call["id"],
+                        "content": tool_result,
+                    })
+        return TOOL_ROUNDS_EXCEEDED_REPLY
+
+    async def achat_stream(
+        self,
+        user_message: str,
+        conversation_history: list[dict[str, str]],
+        user_id: int,
+        db: Database,
+        usage: TurnUsage | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Process a chat message, yielding events as the model produces them.
+
+        Completions are requested with ``stream=True``; text deltas are
+        forwarded as they arrive, and tool calls are assembled from their
+        deltas, executed, and fed back for another streamed round. After
+        ``chat_max_tool_rounds`` rounds, further tool calls are not run and
+        TOOL_ROUNDS_EXCEEDED_REPLY is streamed instead.
+
+        Args:
+            user_message: The user's message
+            conversation_history: List of previous messages [{"role": "user/assistant", "content": "..."}]
+            user_id: The ID of the user for tool calls
+            db: Database handle from the request context
+            usage: Filled in with the turn's token accounting, if given
+
+        Yields:
+            dict: ``{"type": "token", "content": ...}`` for each text delta,
+            ``{"type": "tool_call", "id": ..., "name": ..., "arguments": ...}``
+            for each call of a turn before any runs, and
+            ``{"type": "tool_result", "id": ..., "name": ..., "content": ...}``
+            as each one finishes
+
+        Raises:
+            PromptBudgetExceeded: If a completion cannot fit the prompt budget
+        """
+        messages = self._build_messages(user_message, conversation_history, user_id)
+
+        with _accounted(usage if usage is not None else TurnUsage()) as usage:
+            # One completion per tool round, plus the one that answers
+            for tool_round in range(settings.chat_max_tool_rounds + 1):
+                self._fit_request(messages, usage)
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    tools=self.tools,
+                    tool_choice="auto",
+                    stream=True,
                 )
-                
-                # Add tool result to messages
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": tool_result,
-                })
-            
-            # Make another API call with tool results
-            response = self.client.chat.completions.create(
+
+                content = ""
+                tool_calls: dict[int, dict[str, str]] = {}
+                async for chunk in stream:
+                    # Groq reports usage on the last chunk, under x_groq
+                    usage.record_usage(
+                        getattr(chunk, "usage", None)
+                        or getattr(getattr(chunk, "x_groq", None), "usage", None)
+                    )
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        content += delta.content
+                        yield {"type": "token", "content": delta.content}
+                    # Tool calls arrive in fragments keyed by index
+                    for tc in delta.tool_calls or []:
+                        call = tool_calls.setdefault(
+                            tc.index, {"id": "", "name": "", "arguments": ""}
+                        )
+                        if tc.id:
+                            call["id"] = tc.id
+                        if tc.function and tc.function.name:
+                            call["name"] += tc.function.name
+                        if tc.function and tc.function.arguments:
+                            call["arguments"] += tc.function.arguments
+
+                if not tool_calls:
+                    if not content:
+                        yield {"type": "token", "content": "I'm not sure how to respond to that."}
+                    return
+                if tool_round == settings.chat_max_tool_rounds:
+                    break
+
+                calls = [tool_calls[index] for index in sorted(tool_calls)]
+                messages.append(_assistant_tool_message(content or None, calls))
+                for call in calls:
+                    yield {
+                        "type": "tool_call",
+                        "id": call["id"],
+                        "name": call["name"],
+                        "arguments": call["arguments"],
+                    }
+                # Results are reported as they finish, but sent back in call order
+                results: list[str] = [""] * len(calls)
+                async for index, tool_result in self._arun_tools(calls, user_id, db):
+                    tool_result = self._compact_tool_result(tool_result, usage)
+                    results[index] = tool_result
+                    yield {
+                        "type": "tool_result",
+                        "id": calls[index]["id"],
+                        "name": calls[index]["name"],
+                        "content": tool_result,
+                    }
+                for call, tool_result in zip(calls, results):
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": call["id"],
+                        "content": tool_result,
+                    })
+        yield {"type": "token", "content": TOOL_ROUNDS_EXCEEDED_REPLY}
+
+    async def asummarize(
+        self, previous_summary: str | None, messages: list[dict[str, str]]
+    ) -> str:
+        """
+        Fold older conversation messages into a running summary.
+
+        Args:
+            previous_summary: Summary of everything before ``messages``, if any
+            messages: Messages leaving the verbatim context, oldest first
+
+        Returns:
+            The updated summary
+
+        Raises:
+            PromptBudgetExceeded: If the summary prompt cannot fit the prompt budget
+        """
+        transcript = "\n".join(
+            f"{message['role']}: {message['content'][:SUMMARY_MESSAGE_CHARS]}"
+            for message in messages
+        )
+        request = [
+            {
+                "role": "system",
+                "content": (
+                    "You maintain a running summary of a task-management chat. "
+                    "Merge the new messages into the summary. Keep user preferences, "
+                    "decisions, task titles and IDs, and open questions; drop "
+                    "greetings and tool output already reflected in the tasks. "
+                    "Reply with the summary only, as short bullet points."
+                ),
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"Current summary:\n{previous_summary or '(none)'}\n\n"
+                    f"New messages:\n{transcript}"
+                ),
+            },
+        ]
+
+        with _accounted(TurnUsage()) as usage:
+            # No tools are offered and there is no history to trim, so an
+            # oversized prompt is refused outright
+            usage.record_request(fit_prompt(request, [], settings.chat_prompt_max_tokens))
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
-                messages=messages,
-                tools=self.tools,
-                tool_choice="auto",
+                messages=request,
+                max_tokens=settings.chat_summary_max_tokens,
             )
-            
-            assistant_message = response.choices[0].message
-        
-        # Return the final assistant response
-        return assistant_message.content or "I'm not sure how to respond to that."
+            usage.record_usage(getattr(response, "usage", None))
+        return response.choices[0].message.content or previous_summary or ""
+
+
+@contextmanager
+def _accounted(usage: TurnUsage) -> Iterator[TurnUsage]:
+    """Add a turn's usage to the process totals when it ends."""
+    try:
+        yield usage
+    except PromptBudgetExceeded:
+        usage_totals.reject()
+        raise
+    finally:
+        usage_totals.add(usage)
+
+
+def _assistant_tool_message(content: str | None, calls: list[dict[str, str]]) -> dict[str, Any]:
+    """The assistant turn that requested ``calls``, as sent back to the model."""
+    return {
+        "role": "assistant",
+        "content": content,
+        "tool_calls": [
+            {
+                "id": call["id"],
+                "type": "function",
+                "function": {"name": call["name"], "arguments": call["arguments"]},
+            }
+            for call in calls
+        ],
+    }
 
 
 # Lazy initialization - only create when first accessed
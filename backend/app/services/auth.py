@@ -1,26 +1,44 @@
 """Authentication and authorization services."""
 
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Annotated
+from typing import Annotated, Any, TypeVar
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
+from app.database import Database, get_database
 from app.models.user import User
 from app.schemas.user import TokenData
+from app.services.cache import CacheBackend, LRUCache, NullCache
+from app.services.password_pool import PasswordPoolSaturated, get_password_pool
+from app.services.token_cache import get_token_cache
+
+T = TypeVar("T")
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds
+)
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as stated by the token's signed claims."""
+
+    id: int
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against a hashed password.
@@ -48,6 +66,30 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def run_password_work(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run a password hash or verification on the bounded password pool.
+
+    Args:
+        fn: ``get_password_hash`` or ``verify_password``
+        *args: Its arguments
+
+    Returns:
+        The function's result
+
+    Raises:
+        HTTPException: 503 if the pool is saturated
+    """
+    try:
+        return await get_password_pool().run(fn, *args)
+    except PasswordPoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
     Create a JWT access token.
@@ -71,44 +113,136 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_db)],
-) -> User:
+def decode_access_token(token: str) -> dict:
     """
-    Get the current authenticated user from JWT token.
+    Verify a JWT and return its claims, reusing earlier verifications.
+
+    Verified claims are cached until the token expires, so repeated requests
+    with the same token skip the signature check.
 
     Args:
-        token: JWT token from request header
-        db: Database session
+        token: Encoded JWT
 
     Returns:
-        User: Current authenticated user
+        dict: Decoded claims
 
     Raises:
-        HTTPException: If token is invalid or user not found
+        JWTError: If the token is invalid, expired or revoked
     """
-    credentials_exception = HTTPException(
+    cache = get_token_cache()
+    if cache.is_revoked(token):
+        raise JWTError("Token has been revoked")
+    claims = cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, settings.jwt_secret, algorithms=[settings.algorithm])
+        cache.set(token, claims)
+    return claims
+
+
+def _credentials_exception() -> HTTPException:
+    """401 response for a missing, invalid or revoked token."""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _token_user_id(token: str) -> int:
+    """
+    Verify a token and return the user ID from its claims.
+
+    Raises:
+        HTTPException: If the token is invalid or has no user ID
+    """
     try:
-        payload = jwt.decode(
-            token, settings.jwt_secret, algorithms=[settings.algorithm]
-        )
+        payload = decode_access_token(token)
         # Better Auth uses 'sub' for user ID, try that first
         # Also support 'userId' for Better Auth compatibility
-        user_id: int | None = payload.get("sub") or payload.get("userId")
+        user_id = payload.get("sub") or payload.get("userId")
         if user_id is None:
-            raise credentials_exception
-        token_data = TokenData(user_id=int(user_id))
-    except JWTError:
-        raise credentials_exception
+            raise _credentials_exception()
+        return TokenData(user_id=int(user_id)).user_id
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+
+_user_cache: CacheBackend | None = None
+
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+def get_user_cache() -> CacheBackend:
+    """Get or create the cache of confirmed user IDs used by get_current_principal."""
+    global _user_cache
+    if _user_cache is None:
+        if settings.auth_user_check_ttl_seconds > 0:
+            # Entries are a user id and a one-byte flag, so only the count
+            # needs a bound
+            _user_cache = LRUCache(
+                max_entries=settings.auth_user_cache_max_entries,
+                max_bytes=sys.maxsize,
+                ttl_seconds=settings.auth_user_check_ttl_seconds,
+            )
+        else:
+            _user_cache = NullCache()
+    return _user_cache
+
+
+def _user_exists(db: Session, user_id: int) -> bool:
+    """Check for the user's row without loading it."""
+    return db.scalar(select(User.id).where(User.id == user_id)) is not None
+
+
+async def get_current_principal(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[Database, Depends(get_database)],
+) -> Principal:
+    """
+    Get the caller from the token's claims without loading the User row.
+
+    With ``auth_user_check_ttl_seconds`` > 0 the user's existence is confirmed
+    at most once per TTL, so a deleted user is locked out within that window.
+    With 0 the signed claims are trusted as they are.
+
+    Args:
+        token: JWT token from request header
+        db: Database session
+
+    Returns:
+        Principal: The authenticated caller
+
+    Raises:
+        HTTPException: If the token is invalid or the user no longer exists
+    """
+    user_id = _token_user_id(token)
+    if settings.auth_user_check_ttl_seconds > 0:
+        cache = get_user_cache()
+        if cache.get(str(user_id), "exists") is None:
+            if not await db.run(_user_exists, user_id):
+                raise _credentials_exception()
+            cache.set(str(user_id), "exists", b"1")
+    return Principal(id=user_id)
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[Database, Depends(get_database)],
+) -> User:
+    """
+    Get the current authenticated user from JWT token.
+
+    Args:
+        token: JWT token from request header
+        db: Database session
+
+    Returns:
+        User: Current authenticated user
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id = _token_user_id(token)
+    user = await db.run(lambda session: session.get(User, user_id))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     return user
@@ -0,0 +1,204 @@
+"""Pluggable cache for serialized per-user task lists."""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Protocol
+
+from app.config import settings
+
+
+@dataclass
+class CacheStats:
+    """Counters reported by a cache backend."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        return asdict(self)
+
+
+class CacheBackend(Protocol):
+    """
+    Interface for a grouped byte cache.
+
+    Entries live in a group (one per user) so that every entry of a user can be
+    dropped at once. A shared store such as Redis can implement this with one
+    hash or key prefix per group.
+    """
+
+    def get(self, group: str, key: str) -> bytes | None:
+        """Return the cached value, or None on a miss."""
+        ...
+
+    def set(self, group: str, key: str, value: bytes) -> None:
+        """Store a value, evicting older entries if needed."""
+        ...
+
+    def invalidate(self, group: str) -> None:
+        """Drop every entry in the group."""
+        ...
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        ...
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the counters."""
+        ...
+
+
+class LRUCache:
+    """
+    In-process LRU cache bounded by entry count, total bytes and TTL.
+
+    Thread-safe; sync endpoints run on Starlette's threadpool.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept
+            max_bytes: Ceiling on the summed size of keys and values
+            ttl_seconds: Lifetime of an entry; 0 disables expiry
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[bytes, float]] = OrderedDict()
+        self._groups: dict[str, set[str]] = {}
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(group: str, key: str, value: bytes) -> int:
+        """Encoded size in bytes (keys can hold non-ASCII filter values)."""
+        return len(group.encode()) + len(key.encode()) + len(value)
+
+    def _remove(self, group: str, key: str) -> None:
+        value, _ = self._entries.pop((group, key))
+        self._bytes -= self._size(group, key, value)
+        keys = self._groups.get(group)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._groups[group]
+
+    def get(self, group: str, key: str) -> bytes | None:
+        """Return the cached value, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get((group, key))
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._remove(group, key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end((group, key))
+            self._stats.hits += 1
+            return value
+
+    def set(self, group: str, key: str, value: bytes) -> None:
+        """Store a value and evict least-recently-used entries over the limits."""
+        size = self._size(group, key, value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            if (group, key) in self._entries:
+                self._remove(group, key)
+            self._entries[(group, key)] = (value, expires_at)
+            self._groups.setdefault(group, set()).add(key)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest_group, oldest_key = next(iter(self._entries))
+                self._remove(oldest_group, oldest_key)
+                self._stats.evictions += 1
+
+    def invalidate(self, group: str) -> None:
+        """Drop every entry in the group."""
+        with self._lock:
+            for key in list(self._groups.get(group, ())):
+                self._remove(group, key)
+            self._stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return CacheStats(
+                **{
+                    **self._stats.as_dict(),
+                    "entries": len(self._entries),
+                    "bytes": self._bytes,
+                }
+            )
+
+
+class NullCache:
+    """Backend that never stores anything (used when caching is disabled)."""
+
+    def __init__(self) -> None:
+        self._stats = CacheStats()
+
+    def get(self, group: str, key: str) -> bytes | None:
+        self._stats.misses += 1
+        return None
+
+    def set(self, group: str, key: str, value: bytes) -> None:
+        pass
+
+    def invalidate(self, group: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> CacheStats:
+        return CacheStats(misses=self._stats.misses)
+
+
+_task_cache: CacheBackend | None = None
+
+
+def get_task_cache() -> CacheBackend:
+    """Get or create the task-list cache configured in settings."""
+    global _task_cache
+    if _task_cache is None:
+        if settings.task_cache_enabled:
+            _task_cache = LRUCache(
+                max_entries=settings.task_cache_max_entries,
+                max_bytes=settings.task_cache_max_bytes,
+                ttl_seconds=settings.task_cache_ttl_seconds,
+            )
+        else:
+            _task_cache = NullCache()
+    return _task_cache
+
+
+def set_task_cache(cache: CacheBackend) -> None:
+    """Replace the task-list cache, e.g. with a shared-store backend."""
+    global _task_cache
+    _task_cache = cache
@@ -0,0 +1,229 @@
+"""Bounded chat context: recent turns verbatim, older turns as a rolling summary.
+
+Only messages newer than the conversation's summary watermark are ever read.
+The prompt gets the stored summary plus the most recent of those messages,
+trimmed to the history token budget. Once a batch of messages has fallen out
+of the verbatim window, they are folded into the summary (one short LLM call)
+and the watermark advances, so the work per turn stays flat however long the
+conversation grows.
+
+With the history cache enabled (see history_cache), a turn on a cached
+conversation builds its context without any query.
+"""
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Database
+from app.models.conversation import Conversation, ConversationMessage
+from app.services.history_cache import CachedHistory, CachedMessage, get_history_cache
+from app.services.token_budget import estimate_tokens
+
+# Summarizer: (previous summary or None, messages to fold) -> new summary
+Summarizer = Callable[[str | None, list[dict[str, str]]], Awaitable[str]]
+
+
+@dataclass
+class ConversationContext:
+    """What a chat turn sends to the model in place of the full history."""
+
+    summary: str | None
+    messages: list[dict[str, str]]
+
+    def as_history(self) -> list[dict[str, str]]:
+        """The summary (as a system note) followed by the verbatim messages."""
+        if not self.summary:
+            return list(self.messages)
+        note = {
+            "role": "system",
+            "content": f"Summary of the earlier conversation:\n{self.summary}",
+        }
+        return [note, *self.messages]
+
+
+def _unsummarized_messages(
+    db: Session, conversation_id: int, after_id: int | None, limit: int
+) -> tuple[CachedMessage, ...]:
+    """The newest ``limit`` messages after the watermark, oldest first."""
+    statement = select(
+        ConversationMessage.id, ConversationMessage.role, ConversationMessage.content
+    ).where(ConversationMessage.conversation_id == conversation_id)
+    if after_id is not None:
+        statement = statement.where(ConversationMessage.id > after_id)
+    rows = db.execute(
+        statement.order_by(ConversationMessage.id.desc()).limit(limit)
+    ).all()
+    # Plain rows into slotted records: no ORM instances or identity map
+    return tuple(CachedMessage.create(*row) for row in reversed(rows))
+
+
+def _fit_budget(
+    summary: str | None, messages: tuple[CachedMessage, ...], max_tokens: int
+) -> list[dict[str, str]]:
+    """Drop the oldest messages until summary + messages fit the budget."""
+    used = estimate_tokens(summary) if summary else 0
+    kept: list[dict[str, str]] = []
+    for message in reversed(messages):
+        used += message.tokens
+        # Always keep the newest message, even on its own over budget
+        if kept and used > max_tokens:
+            break
+        kept.append({"role": message.role, "content": message.content})
+    return list(reversed(kept))
+
+
+def _context(summary: str | None, rows: tuple[CachedMessage, ...]) -> ConversationContext:
+    """Fit the summary and unsummarized messages into a context."""
+    return ConversationContext(
+        summary=summary,
+        messages=_fit_budget(summary, rows, settings.chat_history_max_tokens),
+    )
+
+
+def cached_context(conversation_id: int, user_id: int) -> ConversationContext | None:
+    """
+    Build the context from the history cache without touching the database.
+
+    Returns:
+        ConversationContext | None: The context, or None on a miss or if the
+        conversation belongs to someone else (the caller then checks the database)
+    """
+    history = get_history_cache().get(conversation_id)
+    if history is None or history.user_id != user_id:
+        return None
+    return _context(history.summary, history.messages)
+
+
+def load_context(db: Session, conversation: Conversation) -> ConversationContext:
+    """
+    Build the bounded context for a conversation's next turn.
+
+    Reads at most ``chat_history_turns + chat_summary_batch_turns`` turns of
+    unsummarized messages, so the query and the prompt stay bounded even when
+    a fold is pending. The result is put in the history cache.
+
+    Args:
+        db: Database session
+        conversation: The conversation (with its summary columns loaded)
+
+    Returns:
+        ConversationContext: Stored summary and the recent messages to send
+    """
+    limit = 2 * (settings.chat_history_turns + settings.chat_summary_batch_turns)
+    rows = _unsummarized_messages(db, conversation.id, conversation.summary_message_id, limit)
+    get_history_cache().put(
+        conversation.id,
+        CachedHistory(
+            user_id=conversation.user_id,
+            summary=conversation.summary,
+            summary_message_id=conversation.summary_message_id,
+            messages=rows,
+        ),
+    )
+    return _context(conversation.summary, rows)
+
+
+def _messages_to_fold(
+    db: Session, conversation_id: int, after_id: int | None, keep: int, limit: int
+) -> list[Row]:
+    """
+    The oldest ``limit`` unsummarized messages outside the newest ``keep``.
+
+    Plain (id, role, content) rows, so they stay readable after the summary
+    is committed.
+    """
+    newest_outside = db.scalar(
+        select(ConversationMessage.id)
+        .where(ConversationMessage.conversation_id == conversation_id)
+        .order_by(ConversationMessage.id.desc())
+        .offset(keep)
+        .limit(1)
+    )
+    if newest_outside is None:
+        return []
+    statement = select(
+        ConversationMessage.id, ConversationMessage.role, ConversationMessage.content
+    ).where(
+        ConversationMessage.conversation_id == conversation_id,
+        ConversationMessage.id <= newest_outside,
+    )
+    if after_id is not None:
+        statement = statement.where(ConversationMessage.id > after_id)
+    return list(db.execute(statement.order_by(ConversationMessage.id).limit(limit)).all())
+
+
+def _summary_state(db: Session, conversation_id: int) -> tuple[str | None, int | None]:
+    """Current (summary, summary_message_id) of a conversation."""
+    row = db.execute(
+        select(Conversation.summary, Conversation.summary_message_id).where(
+            Conversation.id == conversation_id
+        )
+    ).one()
+    return row.summary, row.summary_message_id
+
+
+def _store_summary(
+    db: Session,
+    conversation_id: int,
+    summary: str,
+    previous_message_id: int | None,
+    through_message_id: int,
+) -> bool:
+    """
+    Save a new summary if nobody advanced the watermark in the meantime.
+
+    Returns:
+        bool: True if the summary was stored
+    """
+    watermark = Conversation.summary_message_id
+    result = db.execute(
+        update(Conversation)
+        .where(
+            Conversation.id == conversation_id,
+            watermark.is_(None) if previous_message_id is None else watermark == previous_message_id,
+        )
+        .values(summary=summary, summary_message_id=through_message_id),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return bool(result.rowcount)
+
+
+async def fold_history(db: Database, conversation_id: int, summarize: Summarizer) -> bool:
+    """
+    Fold messages that left the verbatim window into the rolling summary.
+
+    Nothing happens until at least ``chat_summary_batch_turns`` turns are
+    waiting beyond the last ``chat_history_turns``, so the summarizer runs once
+    per batch rather than every turn. Oldest messages are folded first, at
+    most two batches per call, so a long pre-existing history catches up over
+    a few turns. The update is conditional on the old watermark, so
+    concurrent folds of one conversation cannot interleave.
+
+    Args:
+        db: Database handle
+        conversation_id: Conversation to fold
+        summarize: Produces the new summary from the old one and the messages
+
+    Returns:
+        bool: True if a new summary was stored
+    """
+    keep = 2 * settings.chat_history_turns
+    batch = 2 * settings.chat_summary_batch_turns
+    summary, watermark = await db.run(_summary_state, conversation_id)
+    folded = await db.run(_messages_to_fold, conversation_id, watermark, keep, 2 * batch)
+    if not folded or len(folded) < batch:
+        return False
+
+    through_id = folded[-1].id
+    new_summary = await summarize(
+        summary, [{"role": row.role, "content": row.content} for row in folded]
+    )
+    stored = await db.run(_store_summary, conversation_id, new_summary, watermark, through_id)
+    if stored:
+        get_history_cache().fold(conversation_id, new_summary, through_id)
+    return stored
@@ -0,0 +1,119 @@
+"""Streaming NDJSON / CSV export of a user's tasks and conversations.
+
+Rows are read in batches from a server-side cursor (see Database.stream) and
+encoded one batch at a time, so memory stays flat regardless of how much data
+the user has and the first bytes go out before the query has finished.
+"""
+
+import csv
+import enum
+import io
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any, Literal
+
+from sqlalchemy import Select, select
+
+from app.database import Database
+from app.models.conversation import Conversation, ConversationMessage
+from app.models.task import Task
+from app.services.task_serialization import TASK_RESPONSE_COLUMNS, dumps
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+MESSAGE_EXPORT_COLUMNS = (
+    ConversationMessage.conversation_id,
+    ConversationMessage.id,
+    ConversationMessage.role,
+    ConversationMessage.content,
+    ConversationMessage.created_at,
+)
+
+
+def task_export_statement(user_id: int) -> Select:
+    """All of a user's tasks as TaskResponse columns, oldest first."""
+    return (
+        select(*TASK_RESPONSE_COLUMNS)
+        .where(Task.user_id == user_id)
+        .order_by(Task.created_at, Task.id)
+    )
+
+
+def message_export_statement(user_id: int) -> Select:
+    """Every message of a user's conversations, grouped by conversation."""
+    return (
+        select(*MESSAGE_EXPORT_COLUMNS)
+        .join(Conversation, Conversation.id == ConversationMessage.conversation_id)
+        .where(Conversation.user_id == user_id)
+        .order_by(
+            ConversationMessage.conversation_id,
+            ConversationMessage.created_at,
+            ConversationMessage.id,
+        )
+    )
+
+
+def _csv_value(value: Any) -> Any:
+    """Render a column value the way the JSON representation spells it."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+async def _ndjson_chunks(
+    batches: AsyncIterator[Sequence[Any]], fields: Sequence[str]
+) -> AsyncIterator[bytes]:
+    """Encode each batch of rows as newline-delimited JSON objects."""
+    async for batch in batches:
+        yield b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in batch)
+
+
+async def _csv_chunks(
+    batches: AsyncIterator[Sequence[Any]], fields: Sequence[str]
+) -> AsyncIterator[bytes]:
+    """Encode a header line, then each batch of rows as CSV records."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for batch in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # No rows at all: still send the header
+        yield buffer.getvalue().encode()
+
+
+def stream_export(
+    db: Database,
+    statement: Select,
+    export_format: ExportFormat,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a query's rows in the requested export format.
+
+    Args:
+        db: Database handle
+        statement: Select statement whose column names become the fields
+        export_format: "ndjson" or "csv"
+        batch_size: Rows fetched and encoded per chunk
+
+    Returns:
+        AsyncIterator[bytes]: Response body chunks
+    """
+    fields = [column.key for column in statement.selected_columns]
+    batches = db.stream(statement, batch_size)
+    if export_format == "csv":
+        return _csv_chunks(batches, fields)
+    return _ndjson_chunks(batches, fields)
@@ -0,0 +1,252 @@
+"""In-process LRU cache of the recent history each chat turn is built from.
+
+An entry holds what conversation_context.load_context would otherwise query:
+the rolling summary, its watermark and the newest unsummarized messages, as
+compact slotted records rather than ORM instances. Entries are appended to as
+turns are saved, updated when a summary fold lands, and dropped when the
+conversation is deleted. Writes made by another process are not seen until
+the entry expires, so the cache is opt-in (CHAT_HISTORY_CACHE_ENABLED).
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.config import settings
+from app.services.cache import CacheStats
+from app.services.token_budget import estimate_tokens
+
+
+@dataclass(frozen=True, slots=True)
+class CachedMessage:
+    """One history message, as much of it as the context window needs."""
+
+    id: int
+    role: str
+    content: str
+    # Estimated once, so budgeting a cached history costs no re-tokenizing
+    tokens: int
+
+    @classmethod
+    def create(cls, id: int, role: str, content: str) -> "CachedMessage":
+        """Build a record, estimating its tokens."""
+        return cls(id, role, content, estimate_tokens(content))
+
+
+@dataclass(frozen=True, slots=True)
+class CachedHistory:
+    """A conversation's summary state and newest unsummarized messages (oldest first)."""
+
+    user_id: int
+    summary: str | None
+    summary_message_id: int | None
+    messages: tuple[CachedMessage, ...]
+
+
+def _size(history: CachedHistory) -> int:
+    """Approximate memory held by an entry, in bytes."""
+    size = sys.getsizeof(history) + sys.getsizeof(history.messages)
+    if history.summary:
+        size += sys.getsizeof(history.summary)
+    for message in history.messages:
+        size += sys.getsizeof(message) + sys.getsizeof(message.content)
+    return size
+
+
+class HistoryCache:
+    """
+    LRU of CachedHistory per conversation, bounded by total bytes and TTL.
+
+    Entries are immutable; every change swaps in a new one, so a reader never
+    sees a summary paired with messages from a different state. Thread-safe.
+    """
+
+    def __init__(self, max_bytes: int, max_messages: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Ceiling on the summed size of all entries
+            max_messages: Newest messages kept per conversation
+            ttl_seconds: Lifetime of an entry; 0 disables expiry
+        """
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, tuple[CachedHistory, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _remove(self, conversation_id: int) -> None:
+        _, size, _ = self._entries.pop(conversation_id)
+        self._bytes -= size
+
+    def _store(self, conversation_id: int, history: CachedHistory, expires_at: float) -> None:
+        """Insert or replace an entry and evict past the byte ceiling (lock held)."""
+        if conversation_id in self._entries:
+            self._remove(conversation_id)
+        size = _size(history)
+        if size > self.max_bytes:
+            return
+        self._entries[conversation_id] = (history, size, expires_at)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._stats.evictions += 1
+
+    def get(self, conversation_id: int) -> CachedHistory | None:
+        """Return the cached history, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            history, _, expires_at = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._remove(conversation_id)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(conversation_id)
+            self._stats.hits += 1
+            return history
+
+    def put(self, conversation_id: int, history: CachedHistory) -> None:
+        """
+        Cache a history loaded from the database.
+
+        An existing entry is kept: it was appended to after this history was
+        read, so it is at least as new.
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        history = CachedHistory(
+            history.user_id,
+            history.summary,
+            history.summary_message_id,
+            history.messages[-self.max_messages:],
+        )
+        with self._lock:
+            if conversation_id not in self._entries:
+                self._store(conversation_id, history, expires_at)
+
+    def append(self, conversation_id: int, messages: Iterable[CachedMessage]) -> None:
+        """Add newly saved messages to a cached conversation (no-op on a miss)."""
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                return
+            history, _, expires_at = entry
+            combined = history.messages + tuple(messages)
+            if any(a.id > b.id for a, b in zip(combined, combined[1:])):
+                # Concurrent turns on one conversation can commit out of order
+                combined = tuple(sorted(combined, key=lambda message: message.id))
+            self._store(
+                conversation_id,
+                CachedHistory(
+                    history.user_id,
+                    history.summary,
+                    history.summary_message_id,
+                    combined[-self.max_messages:],
+                ),
+                expires_at,
+            )
+
+    def fold(self, conversation_id: int, summary: str, through_message_id: int) -> None:
+        """Apply a stored summary: replace it and drop the messages it covers."""
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                return
+            history, _, expires_at = entry
+            self._store(
+                conversation_id,
+                CachedHistory(
+                    history.user_id,
+                    summary,
+                    through_message_id,
+                    tuple(m for m in history.messages if m.id > through_message_id),
+                ),
+                expires_at,
+            )
+
+    def invalidate(self, conversation_id: int) -> None:
+        """Drop a conversation's entry."""
+        with self._lock:
+            if conversation_id in self._entries:
+                self._remove(conversation_id)
+            self._stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return CacheStats(
+                **{
+                    **self._stats.as_dict(),
+                    "entries": len(self._entries),
+                    "bytes": self._bytes,
+                }
+            )
+
+
+class NullHistoryCache:
+    """Cache that never stores anything (used when the history cache is disabled)."""
+
+    def __init__(self) -> None:
+        self._stats = CacheStats()
+
+    def get(self, conversation_id: int) -> CachedHistory | None:
+        self._stats.misses += 1
+        return None
+
+    def put(self, conversation_id: int, history: CachedHistory) -> None:
+        pass
+
+    def append(self, conversation_id: int, messages: Iterable[CachedMessage]) -> None:
+        pass
+
+    def fold(self, conversation_id: int, summary: str, through_message_id: int) -> None:
+        pass
+
+    def invalidate(self, conversation_id: int) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> CacheStats:
+        return CacheStats(misses=self._stats.misses)
+
+
+_history_cache: HistoryCache | NullHistoryCache | None = None
+
+
+def get_history_cache() -> HistoryCache | NullHistoryCache:
+    """Get or create the conversation history cache configured in settings."""
+    global _history_cache
+    if _history_cache is None:
+        if settings.chat_history_cache_enabled:
+            _history_cache = HistoryCache(
+                max_bytes=settings.chat_history_cache_max_bytes,
+                # The window load_context reads: verbatim turns plus one fold batch
+                max_messages=2 * (settings.chat_history_turns + settings.chat_summary_batch_turns),
+                ttl_seconds=settings.chat_history_cache_ttl_seconds,
+            )
+        else:
+            _history_cache = NullHistoryCache()
+    return _history_cache
+
+
+def set_history_cache(cache: HistoryCache | NullHistoryCache) -> None:
+    """Replace the conversation history cache."""
+    global _history_cache
+    _history_cache = cache
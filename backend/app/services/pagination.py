@@ -0,0 +1,99 @@
+"""Keyset (cursor) pagination helpers."""
+
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    """
+    Encode a (created_at, id) keyset position as an opaque cursor.
+
+    Args:
+        created_at: Creation timestamp of the last row on the page
+        task_id: ID of the last row on the page
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = json.dumps([created_at.isoformat(), task_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Opaque cursor string from a previous page
+
+    Returns:
+        tuple[datetime, int]: The (created_at, id) keyset position
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def encode_sync_cursor(
+    tasks_position: tuple[datetime, int] | None,
+    tombstones_position: tuple[datetime, int] | None,
+) -> str:
+    """
+    Encode delta-sync positions in the task and tombstone change streams.
+
+    Args:
+        tasks_position: Last (updated_at, id) of a task sent to the client
+        tombstones_position: Last (deleted_at, id) of a tombstone sent
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = json.dumps(
+        [
+            [position[0].isoformat(), position[1]] if position else None
+            for position in (tasks_position, tombstones_position)
+        ],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(
+    cursor: str,
+) -> tuple[tuple[datetime, int] | None, tuple[datetime, int] | None]:
+    """
+    Decode a cursor produced by encode_sync_cursor.
+
+    Args:
+        cursor: Opaque cursor string from a previous sync
+
+    Returns:
+        tuple: The task and tombstone positions (None where nothing was sent)
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tasks_position, tombstones_position = [
+            (datetime.fromisoformat(position[0]), int(position[1])) if position else None
+            for position in json.loads(base64.urlsafe_b64decode(padded))
+        ]
+        return tasks_position, tombstones_position
+    except (ValueError, TypeError, IndexError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
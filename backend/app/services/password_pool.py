@@ -0,0 +1,129 @@
+"""Bounded worker pool for CPU-heavy password hashing and verification."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+@dataclass
+class PasswordPoolStats:
+    """Counters reported by the password pool (times in seconds)."""
+
+    workers: int = 0
+    max_queue: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    rejected: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    work_time_total: float = 0.0
+    work_time_max: float = 0.0
+
+    def as_dict(self) -> dict[str, int | float]:
+        """Return the counters as a plain dict."""
+        return asdict(self)
+
+
+class PasswordPool:
+    """
+    Fixed-size thread pool with a bounded queue for bcrypt work.
+
+    bcrypt releases the GIL while hashing, so threads run in parallel without
+    the pickling cost of a process pool. Work beyond ``workers + max_queue``
+    pending jobs is rejected immediately instead of queueing behind a burst of
+    logins, and the Starlette threadpool stays free for other endpoints.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Number of hashing threads
+            max_queue: Jobs allowed to wait for a free thread
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._stats = PasswordPoolStats(workers=workers, max_queue=max_queue)
+        self._lock = threading.Lock()
+
+    def _timed(self, submitted_at: float, fn: Callable[..., T], *args: Any) -> T:
+        """Run a job on a worker thread, recording queue wait and work time."""
+        started_at = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished_at = time.perf_counter()
+            waited, worked = started_at - submitted_at, finished_at - started_at
+            with self._lock:
+                stats = self._stats
+                stats.in_flight -= 1
+                stats.completed += 1
+                stats.queue_wait_total += waited
+                stats.queue_wait_max = max(stats.queue_wait_max, waited)
+                stats.work_time_total += worked
+                stats.work_time_max = max(stats.work_time_max, worked)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run ``fn(*args)`` on the pool and await its result.
+
+        Args:
+            fn: Blocking function to run (e.g. ``verify_password``)
+            *args: Its arguments
+
+        Returns:
+            The function's result
+
+        Raises:
+            PasswordPoolSaturated: If the pool and its queue are full
+        """
+        with self._lock:
+            if self._stats.in_flight >= self.workers + self.max_queue:
+                self._stats.rejected += 1
+                raise PasswordPoolSaturated()
+            self._stats.in_flight += 1
+        future = self._executor.submit(self._timed, time.perf_counter(), fn, *args)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> PasswordPoolStats:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return PasswordPoolStats(**asdict(self._stats))
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once queued jobs finish."""
+        self._executor.shutdown(wait=True)
+
+
+_password_pool: PasswordPool | None = None
+
+
+def get_password_pool() -> PasswordPool:
+    """Get or create the password pool configured in settings."""
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = PasswordPool(
+            workers=settings.password_pool_workers,
+            max_queue=settings.password_pool_max_queue,
+        )
+    return _password_pool
+
+
+def set_password_pool(pool: PasswordPool) -> None:
+    """Replace the password pool (e.g. with different limits in tests)."""
+    global _password_pool
+    _password_pool = pool
@@ -0,0 +1,212 @@
+"""Token-bucket rate limiting for expensive endpoints (login, chat)."""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Literal, Protocol
+
+from jose import JWTError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.services.auth import decode_access_token
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    Limit for one route: ``burst`` requests at once, refilled at ``rate``/s.
+
+    ``key`` selects the bucket: "ip" per client address, "user" per token
+    subject (requests without a valid token fall back to their address).
+    """
+
+    name: str
+    method: str
+    path: str
+    rate: float
+    burst: int
+    key: Literal["ip", "user"] = "ip"
+
+
+class RateLimitStore(Protocol):
+    """
+    Interface for token-bucket state.
+
+    A shared store such as Redis can implement ``acquire`` atomically with a
+    small script keeping (tokens, updated_at) per key.
+    """
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; return 0 if allowed, else seconds until one is free."""
+        ...
+
+    def clear(self) -> None:
+        """Drop every bucket."""
+        ...
+
+
+class InMemoryRateLimitStore:
+    """
+    In-process token buckets, bounded to ``max_keys`` least recently used keys.
+
+    A dropped bucket comes back full, which only ever errs on the side of
+    letting a request through.
+    """
+
+    def __init__(self, max_keys: int):
+        """
+        Initialize the store.
+
+        Args:
+            max_keys: Maximum number of buckets kept
+        """
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; return 0 if allowed, else seconds until one is free."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(burst)
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                tokens, updated_at = bucket
+                tokens = min(float(burst), tokens + (now - updated_at) * rate)
+                self._buckets.move_to_end(key)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+
+    def clear(self) -> None:
+        """Drop every bucket."""
+        with self._lock:
+            self._buckets.clear()
+
+
+_rate_limit_store: RateLimitStore | None = None
+
+
+def get_rate_limit_store() -> RateLimitStore:
+    """Get or create the rate-limit store configured in settings."""
+    global _rate_limit_store
+    if _rate_limit_store is None:
+        _rate_limit_store = InMemoryRateLimitStore(max_keys=settings.rate_limit_max_keys)
+    return _rate_limit_store
+
+
+def set_rate_limit_store(store: RateLimitStore) -> None:
+    """Replace the rate-limit store, e.g. with a shared-store backend."""
+    global _rate_limit_store
+    _rate_limit_store = store
+
+
+def rate_limit_policies() -> list[RateLimitPolicy]:
+    """Build the per-route policies from settings (none when disabled)."""
+    if not settings.rate_limit_enabled:
+        return []
+    return [
+        RateLimitPolicy(
+            name="login",
+            method="POST",
+            path="/api/auth/login",
+            rate=settings.rate_limit_login_per_minute / 60,
+            burst=settings.rate_limit_login_burst,
+            key="ip",
+        ),
+        RateLimitPolicy(
+            name="chat",
+            method="POST",
+            path="/api/chat",
+            rate=settings.rate_limit_chat_per_minute / 60,
+            burst=settings.rate_limit_chat_burst,
+            key="user",
+        ),
+        # Streaming chat draws from the same per-user bucket
+        RateLimitPolicy(
+            name="chat",
+            method="POST",
+            path="/api/chat/stream",
+            rate=settings.rate_limit_chat_per_minute / 60,
+            burst=settings.rate_limit_chat_burst,
+            key="user",
+        ),
+    ]
+
+
+def _client_address(scope: Scope) -> str:
+    """
+    The peer address of the connection.
+
+    Behind a proxy this is the proxy's address unless uvicorn runs with
+    ``--proxy-headers`` and trusts it via ``FORWARDED_ALLOW_IPS``, in which
+    case uvicorn has already replaced it with the forwarded client address.
+    """
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _token_subject(scope: Scope) -> str | None:
+    """The subject of a valid bearer token, or None."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                claims = decode_access_token(token)
+            except JWTError:
+                return None
+            subject = claims.get("sub") or claims.get("userId")
+            return str(subject) if subject is not None else None
+    return None
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying token-bucket policies to exact (method, path) routes.
+
+    Unlisted routes pass straight through after one dict lookup. A request over
+    its limit gets 429 with ``Retry-After`` (whole seconds, rounded up).
+    """
+
+    def __init__(self, app: ASGIApp, policies: list[RateLimitPolicy]):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            policies: Route policies (see rate_limit_policies)
+        """
+        self.app = app
+        self._routes = {(policy.method, policy.path): policy for policy in policies}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self._routes:
+            policy = self._routes.get((scope["method"], scope["path"]))
+            if policy is not None:
+                subject = _token_subject(scope) if policy.key == "user" else None
+                key = (
+                    f"{policy.name}:user:{subject}"
+                    if subject is not None
+                    else f"{policy.name}:ip:{_client_address(scope)}"
+                )
+                retry_after = get_rate_limit_store().acquire(key, policy.rate, policy.burst)
+                if retry_after:
+                    response = JSONResponse(
+                        {"detail": "Too many requests, please retry later"},
+                        status_code=429,
+                        headers={"Retry-After": str(math.ceil(retry_after))},
+                    )
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
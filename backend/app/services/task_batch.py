@@ -0,0 +1,178 @@
+"""Set-based execution of batched task operations."""
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.services import task_repository
+from app.services.cache import get_task_cache
+from app.schemas.task import (
+    TaskBatchComplete,
+    TaskBatchCreate,
+    TaskBatchDelete,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskResponse,
+)
+
+
+def apply_task_batch(
+    db: Session,
+    user_id: int,
+    operations: list[TaskBatchCreate | TaskBatchUpdate | TaskBatchComplete | TaskBatchDelete],
+) -> list[TaskBatchResult]:
+    """
+    Apply a batch of task operations in a single transaction.
+
+    Operations are grouped by kind and each group runs as one statement, so the
+    number of round trips is bounded by the number of operation kinds rather
+    than the number of items. Groups run in a fixed phase order (create,
+    update, complete, delete); a task may appear in at most one operation.
+
+    Args:
+        db: Database session
+        user_id: Owner of every task touched by the batch
+        operations: Operations in request order
+
+    Returns:
+        list[TaskBatchResult]: One result per operation, in request order
+
+    Raises:
+        HTTPException: If the same task is targeted by more than one operation
+    """
+    creates: list[tuple[int, TaskBatchCreate]] = []
+    targeted: list[tuple[int, TaskBatchUpdate | TaskBatchComplete | TaskBatchDelete]] = []
+    for index, operation in enumerate(operations):
+        if isinstance(operation, TaskBatchCreate):
+            creates.append((index, operation))
+        else:
+            targeted.append((index, operation))
+
+    task_ids = [operation.task_id for _, operation in targeted]
+    if len(task_ids) != len(set(task_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each task may appear in at most one batch operation",
+        )
+
+    # One ownership check for every referenced task
+    owned: set[int] = set()
+    if task_ids:
+        owned = set(
+            db.scalars(
+                select(Task.id).where(Task.user_id == user_id, Task.id.in_(task_ids))
+            )
+        )
+
+    results: dict[int, TaskBatchResult] = {}
+
+    # Multi-row INSERT ... RETURNING
+    if creates:
+        rows = [
+            {**operation.task.model_dump(), "user_id": user_id, "completed": False}
+            for _, operation in creates
+        ]
+        # Autoincrement ids follow VALUES order within one statement; sorting by
+        # id avoids sort_by_parameter_order, which SQLite can only honour by
+        # falling back to one INSERT per row
+        created = sorted(
+            db.scalars(insert(Task).returning(Task), rows).all(),
+            key=lambda task: task.id,
+        )
+        for (index, operation), task in zip(creates, created):
+            results[index] = TaskBatchResult(
+                index=index,
+                op=operation.op,
+                status="created",
+                task_id=task.id,
+                task=TaskResponse.model_validate(task),
+            )
+
+    # An update with no fields changes nothing, as in task_repository.update_task
+    updates = [
+        {"id": operation.task_id, **changes}
+        for _, operation in targeted
+        if isinstance(operation, TaskBatchUpdate)
+        and operation.task_id in owned
+        and (changes := operation.changes.model_dump(exclude_none=True))
+    ]
+    completions: dict[bool, list[int]] = {}
+    deletions: list[int] = []
+    for _, operation in targeted:
+        if operation.task_id not in owned:
+            continue
+        if isinstance(operation, TaskBatchComplete):
+            completions.setdefault(operation.completed, []).append(operation.task_id)
+        elif isinstance(operation, TaskBatchDelete):
+            deletions.append(operation.task_id)
+
+    # Bulk UPDATE by primary key (executemany, grouped by changed columns)
+    if updates:
+        db.execute(
+            update(Task)
+            .where(Task.user_id == user_id)
+            .values(version=Task.version + 1),
+            updates,
+            execution_options={"synchronize_session": None},
+        )
+
+    # One UPDATE ... WHERE id IN (...) per target completion value
+    for completed, ids in completions.items():
+        db.execute(
+            update(Task)
+            .where(Task.user_id == user_id, Task.id.in_(ids))
+            .values(completed=completed, version=Task.version + 1),
+            execution_options={"synchronize_session": False},
+        )
+
+    if deletions:
+        db.execute(
+            delete(Task).where(Task.user_id == user_id, Task.id.in_(deletions)),
+            execution_options={"synchronize_session": False},
+        )
+        task_repository.record_tombstones(db, user_id, deletions)
+
+    # Read back every modified row in one statement
+    modified = [
+        operation.task_id
+        for _, operation in targeted
+        if operation.task_id in owned and not isinstance(operation, TaskBatchDelete)
+    ]
+    tasks_by_id: dict[int, Task] = {}
+    if modified:
+        tasks_by_id = {
+            task.id: task
+            for task in db.scalars(
+                select(Task)
+                .where(Task.id.in_(modified))
+                .execution_options(populate_existing=True)
+            )
+        }
+
+    for index, operation in targeted:
+        if operation.task_id not in owned:
+            outcome = "not_found"
+            task = None
+        elif isinstance(operation, TaskBatchDelete):
+            outcome = "deleted"
+            task = None
+        else:
+            outcome = "updated"
+            task = TaskResponse.model_validate(tasks_by_id[operation.task_id])
+        results[index] = TaskBatchResult(
+            index=index,
+            op=operation.op,
+            status=outcome,
+            task_id=operation.task_id,
+            task=task,
+        )
+
+    changed = bool(creates or updates or completions or deletions)
+    if changed:
+        task_repository.bump_task_version(db, user_id)
+    db.commit()
+    if changed:
+        get_task_cache().invalidate(str(user_id))
+
+    return [results[index] for index in range(len(operations))]
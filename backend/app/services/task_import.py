@@ -0,0 +1,237 @@
+"""Streaming bulk import of tasks from NDJSON or CSV.
+
+The request body is decoded and parsed record by record as it arrives. Each
+record is validated with the TaskCreate rules; invalid records are reported
+by row number and skipped. Valid rows are loaded in chunks, one transaction per
+chunk: Postgres uses COPY (psycopg2 ``copy_expert`` / asyncpg
+``copy_records_to_table``), other dialects a single executemany INSERT.
+"""
+
+import codecs
+import csv
+import enum
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from app.database import Database
+from app.models.task import Task
+from app.schemas.task import TaskCreate, TaskImportError, TaskImportResponse
+from app.services import task_repository
+from app.services.cache import get_task_cache
+
+ImportFormat = Literal["ndjson", "csv"]
+
+# Column order used for COPY and executemany
+IMPORT_COLUMNS = (
+    "title",
+    "description",
+    "completed",
+    "priority",
+    "category",
+    "due_date",
+    "user_id",
+    "created_at",
+    "updated_at",
+)
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a UTF-8 byte stream into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    # Pieces of the unfinished line, joined once its newline arrives, so a
+    # long line spread over many chunks is not re-scanned for every chunk
+    pending: list[str] = []
+    async for chunk in chunks:
+        *complete, rest = decoder.decode(chunk).split("\n")
+        if complete:
+            complete[0] = "".join(pending) + complete[0]
+            pending.clear()
+            for line in complete:
+                yield line.removesuffix("\r")
+        if rest:
+            pending.append(rest)
+    tail = "".join(pending) + decoder.decode(b"", final=True)
+    if tail:
+        yield tail.removesuffix("\r")
+
+
+async def _ndjson_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """Yield (row, object) per non-blank line, or (row, error message)."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            value = json.loads(line)
+        except ValueError as exc:
+            yield row, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(value, dict):
+            yield row, "Expected a JSON object"
+            continue
+        yield row, value
+
+
+async def _csv_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[int, dict[str, Any] | str]]:
+    """
+    Yield (row, fields) per CSV record after the header, or (row, error).
+
+    Quoted fields may span lines: physical lines are joined until the record's
+    quotes balance. Empty fields are dropped so the TaskCreate defaults apply.
+    """
+    header: list[str] | None = None
+    row = 0
+    record = ""
+    async for line in lines:
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} fields, got {len(values)}"
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}
+    if record:
+        yield row + 1, "Unterminated quoted field"
+
+
+def _validation_message(exc: ValidationError) -> str:
+    """Flatten a ValidationError into one line per failing field."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def _copy_value(value: Any) -> Any:
+    """Render a value for COPY (enums by value)."""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _copy_tasks(db: Session, records: list[tuple[Any, ...]]) -> None:
+    """Load rows with Postgres COPY on the session's connection."""
+    raw = db.connection().connection
+    driver_connection = raw.driver_connection
+    if db.get_bind().dialect.driver == "asyncpg":
+        await_only(
+            driver_connection.copy_records_to_table(
+                Task.__tablename__, records=records, columns=list(IMPORT_COLUMNS)
+            )
+        )
+        return
+
+    buffer = io.StringIO()
+    # QUOTE_NOTNULL keeps None unquoted, which COPY's csv format reads as NULL
+    csv.writer(buffer, quoting=csv.QUOTE_NOTNULL).writerows(records)
+    buffer.seek(0)
+    with raw.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {Task.__tablename__} ({', '.join(IMPORT_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def load_tasks(db: Session, user_id: int, tasks: list[dict[str, Any]]) -> int:
+    """
+    Insert validated TaskCreate dicts for a user in one transaction.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        tasks: Validated task values (TaskCreate.model_dump())
+
+    Returns:
+        int: Number of tasks inserted
+    """
+    now = datetime.utcnow()
+    rows = [
+        {**task, "completed": False, "user_id": user_id, "created_at": now, "updated_at": now}
+        for task in tasks
+    ]
+
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver in ("psycopg2", "asyncpg"):
+        _copy_tasks(
+            db,
+            [tuple(_copy_value(row[column]) for column in IMPORT_COLUMNS) for row in rows],
+        )
+    else:
+        db.execute(insert(Task.__table__), rows)
+
+    task_repository.bump_task_version(db, user_id)
+    db.commit()
+    get_task_cache().invalidate(str(user_id))
+    return len(rows)
+
+
+async def import_tasks(
+    db: Database,
+    user_id: int,
+    chunks: AsyncIterator[bytes],
+    import_format: ImportFormat,
+    chunk_size: int,
+    max_errors: int,
+) -> TaskImportResponse:
+    """
+    Validate and load a streamed NDJSON or CSV body of tasks.
+
+    Args:
+        db: Database handle
+        user_id: Owner of the imported tasks
+        chunks: Raw request body chunks
+        import_format: "ndjson" or "csv" (CSV needs a header row)
+        chunk_size: Valid rows loaded per transaction
+        max_errors: Maximum number of row errors listed in the response
+
+    Returns:
+        TaskImportResponse: Counts and per-row errors
+    """
+    if import_format == "csv":
+        records = _csv_records(_lines(chunks))
+    else:
+        records = _ndjson_records(_lines(chunks))
+
+    imported = failed = 0
+    errors: list[TaskImportError] = []
+    pending: list[dict[str, Any]] = []
+    async for row, record in records:
+        if not isinstance(record, str):
+            try:
+                pending.append(TaskCreate.model_validate(record).model_dump())
+            except ValidationError as exc:
+                record = _validation_message(exc)
+            else:
+                if len(pending) >= chunk_size:
+                    imported += await db.run(load_tasks, user_id, pending)
+                    pending = []
+                continue
+
+        failed += 1
+        if len(errors) < max_errors:
+            errors.append(TaskImportError(row=row, error=record))
+
+    if pending:
+        imported += await db.run(load_tasks, user_id, pending)
+
+    return TaskImportResponse(imported=imported, failed=failed, errors=errors)
@@ -0,0 +1,369 @@
+"""Task persistence shared by the REST router and the MCP server.
+
+Every mutation is a single statement scoped to ``id`` and ``user_id``. Where the
+dialect supports it, ``UPDATE ... RETURNING`` / ``DELETE ... RETURNING`` hand the
+row back in the same round trip; otherwise (SQLite < 3.35) the row is read with
+one extra SELECT.
+
+Successful writes also bump ``User.task_version`` in the same transaction, which
+the tasks router exposes as an ETag, and drop the user's cached task lists.
+Deletes leave a ``TaskTombstone`` behind for delta sync.
+"""
+
+from collections.abc import Collection, Sequence
+from datetime import datetime
+from typing import Any, Literal
+
+from sqlalchemy import ColumnElement, Row, Select, delete, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.task import Task, TaskCategory, TaskPriority, TaskTombstone
+from app.models.user import User
+from app.services.cache import get_task_cache
+
+
+class TaskVersionConflict(Exception):
+    """A conditional write found the task at a different version."""
+
+    def __init__(self, task: Task):
+        super().__init__(f"Task {task.id} is at version {task.version}")
+        self.task = task
+
+
+def get_task_version(db: Session, user_id: int) -> int:
+    """
+    Read the user's task-collection version with a primary-key lookup.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task collection
+
+    Returns:
+        int: Current version (0 if the user does not exist)
+    """
+    return db.scalar(select(User.task_version).where(User.id == user_id)) or 0
+
+
+def bump_task_version(db: Session, user_id: int) -> None:
+    """
+    Increment the user's task-collection version in the current transaction.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task collection
+    """
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(task_version=User.task_version + 1),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def record_tombstones(db: Session, user_id: int, task_ids: Sequence[int]) -> None:
+    """
+    Record deleted tasks for delta sync in the current transaction.
+
+    Args:
+        db: Database session
+        user_id: Owner of the deleted tasks
+        task_ids: IDs of the deleted tasks
+    """
+    if not task_ids:
+        return
+    deleted_at = datetime.utcnow()
+    db.execute(
+        insert(TaskTombstone),
+        [{"task_id": task_id, "user_id": user_id, "deleted_at": deleted_at} for task_id in task_ids],
+    )
+
+
+def _commit_detached(db: Session, user_id: int, task: Task | None) -> Task | None:
+    """
+    Bump the task version, commit and invalidate cached lists.
+
+    The task is expunged first so commit does not expire its attributes, which
+    would otherwise cost one more SELECT when the caller serializes it. Nothing
+    is bumped when the write matched no row.
+    """
+    if task is not None:
+        bump_task_version(db, user_id)
+        db.expunge(task)
+    db.commit()
+    if task is not None:
+        get_task_cache().invalidate(str(user_id))
+    return task
+
+
+def get_task(db: Session, user_id: int, task_id: int) -> Task | None:
+    """
+    Fetch one task owned by the user.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task
+        task_id: Task ID
+
+    Returns:
+        Task | None: The task, or None if it does not exist for this user
+    """
+    return db.scalars(
+        select(Task).where(Task.id == task_id, Task.user_id == user_id)
+    ).first()
+
+
+def _filter_tasks(
+    statement: Select,
+    user_id: int,
+    *,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    order: Literal["asc", "desc"] = "asc",
+    completed: bool | None = None,
+    priority: TaskPriority | None = None,
+    category: TaskCategory | None = None,
+    due_after: datetime | None = None,
+    due_before: datetime | None = None,
+) -> Select:
+    """Apply the task-list filters, keyset position, order and limit."""
+    statement = statement.where(Task.user_id == user_id)
+    if completed is False and (due_after is not None or due_before is not None):
+        # Overdue / upcoming open tasks: spell out ix_tasks_open_due_date's
+        # predicate, built the same way as the index's, so the planner can use it
+        statement = statement.where(Task.completed.is_(False), Task.due_date.isnot(None))
+    elif completed is not None:
+        statement = statement.where(Task.completed == completed)
+    if priority is not None:
+        statement = statement.where(Task.priority == priority)
+    if category is not None:
+        statement = statement.where(Task.category == category)
+    if due_after is not None:
+        statement = statement.where(Task.due_date >= due_after)
+    if due_before is not None:
+        statement = statement.where(Task.due_date <= due_before)
+
+    if after is not None:
+        position = tuple_(Task.created_at, Task.id)
+        if order == "asc":
+            statement = statement.where(position > tuple_(*after))
+        else:
+            statement = statement.where(position < tuple_(*after))
+
+    if order == "asc":
+        statement = statement.order_by(Task.created_at.asc(), Task.id.asc())
+    else:
+        statement = statement.order_by(Task.created_at.desc(), Task.id.desc())
+
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def list_tasks(
+    db: Session,
+    user_id: int,
+    *,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    order: Literal["asc", "desc"] = "asc",
+    completed: bool | None = None,
+    priority: TaskPriority | None = None,
+    category: TaskCategory | None = None,
+    due_after: datetime | None = None,
+    due_before: datetime | None = None,
+) -> list[Task]:
+    """
+    List a user's tasks in (created_at, id) order with optional filters.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        limit: Maximum number of tasks (None for all)
+        after: Keyset position to continue from, in the direction of ``order``
+        order: Sort direction on (created_at, id)
+        completed: Filter by completion status
+        priority: Filter by priority
+        category: Filter by category
+        due_after: Only tasks due at or after this time
+        due_before: Only tasks due at or before this time
+
+    Returns:
+        list[Task]: Matching tasks
+    """
+    statement = _filter_tasks(
+        select(Task),
+        user_id,
+        limit=limit,
+        after=after,
+        order=order,
+        completed=completed,
+        priority=priority,
+        category=category,
+        due_after=due_after,
+        due_before=due_before,
+    )
+    return list(db.scalars(statement))
+
+
+def list_task_rows(
+    db: Session,
+    user_id: int,
+    columns: Sequence[ColumnElement[Any]],
+    **filters: Any,
+) -> list[Row]:
+    """
+    Like list_tasks, but return plain Core rows of the given columns.
+
+    Rows bypass the identity map and attribute instrumentation, which makes
+    this the cheap path for read-only listings that are serialized at once.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        columns: Task columns to select, in output order
+        **filters: Same keyword filters as list_tasks
+
+    Returns:
+        list[Row]: Matching rows
+    """
+    statement = _filter_tasks(select(*columns), user_id, **filters)
+    return list(db.execute(statement))
+
+
+def create_task(db: Session, user_id: int, values: dict[str, Any]) -> Task:
+    """
+    Insert a task and commit.
+
+    The INSERT already returns generated columns, so no refresh is needed.
+
+    Args:
+        db: Database session
+        user_id: Owner of the new task
+        values: Column values for the task
+
+    Returns:
+        Task: The created task
+    """
+    task = Task(user_id=user_id, **values)
+    db.add(task)
+    db.flush()
+    return _commit_detached(db, user_id, task)
+
+
+def update_task(
+    db: Session,
+    user_id: int,
+    task_id: int,
+    values: dict[str, Any],
+    expected_versions: Collection[int] | None = None,
+) -> Task | None:
+    """
+    Apply column changes to a task with a single UPDATE and commit.
+
+    The UPDATE increments ``Task.version``. With ``expected_versions`` it is
+    conditional (``WHERE version IN (...)``), so a concurrent write is
+    detected without locking the row.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task
+        task_id: Task ID
+        values: Columns to change; an empty dict leaves the task untouched
+        expected_versions: Versions the caller's copy may have (None: any)
+
+    Returns:
+        Task | None: The updated task, or None if it does not exist for this user
+
+    Raises:
+        TaskVersionConflict: If the task exists at a version not expected
+    """
+    if not values:
+        task = get_task(db, user_id, task_id)
+        if (
+            task is not None
+            and expected_versions is not None
+            and task.version not in expected_versions
+        ):
+            raise TaskVersionConflict(task)
+        return task
+
+    statement = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .values(**values, version=Task.version + 1)
+    )
+    if expected_versions is not None:
+        statement = statement.where(Task.version.in_(expected_versions))
+    if db.get_bind().dialect.update_returning:
+        task = db.scalars(
+            statement.returning(Task),
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        ).first()
+    else:
+        result = db.execute(
+            statement, execution_options={"synchronize_session": False}
+        )
+        task = (
+            db.scalars(
+                select(Task)
+                .where(Task.id == task_id)
+                .execution_options(populate_existing=True)
+            ).first()
+            if result.rowcount
+            else None
+        )
+
+    if task is None and expected_versions is not None:
+        # Nothing matched: either the task is gone or its version moved on
+        current = get_task(db, user_id, task_id)
+        if current is not None:
+            db.rollback()
+            raise TaskVersionConflict(current)
+
+    return _commit_detached(db, user_id, task)
+
+
+def set_task_completed(
+    db: Session, user_id: int, task_id: int, completed: bool
+) -> Task | None:
+    """
+    Set the completion status of a task.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task
+        task_id: Task ID
+        completed: New completion status
+
+    Returns:
+        Task | None: The updated task, or None if it does not exist for this user
+    """
+    return update_task(db, user_id, task_id, {"completed": completed})
+
+
+def delete_task(db: Session, user_id: int, task_id: int) -> Task | None:
+    """
+    Delete a task with a single DELETE and commit.
+
+    Args:
+        db: Database session
+        user_id: Owner of the task
+        task_id: Task ID
+
+    Returns:
+        Task | None: The deleted row, or None if it did not exist for this user
+    """
+    statement = delete(Task).where(Task.id == task_id, Task.user_id == user_id)
+    if db.get_bind().dialect.delete_returning:
+        task = db.scalars(
+            statement.returning(Task),
+            execution_options={"synchronize_session": False},
+        ).first()
+    else:
+        task = get_task(db, user_id, task_id)
+        if task is not None:
+            db.execute(statement, execution_options={"synchronize_session": False})
+
+    if task is not None:
+        record_tombstones(db, user_id, [task.id])
+    return _commit_detached(db, user_id, task)
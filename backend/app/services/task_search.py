@@ -0,0 +1,78 @@
+"""Ranked full-text search over task titles and descriptions."""
+
+import re
+
+from sqlalchemy import column, func, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+
+# External-content FTS5 table maintained by triggers (SQLite only)
+tasks_fts = table("tasks_fts", column("rowid"), column("rank"))
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(q: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so punctuation and FTS5 operators
+    typed by the user cannot cause syntax errors.
+    """
+    return " ".join(f'"{token}"*' for token in _TOKEN.findall(q))
+
+
+def search_tasks(
+    db: Session, user_id: int, q: str, limit: int, offset: int = 0
+) -> list[Task]:
+    """
+    Search a user's tasks, best match first.
+
+    Postgres matches the GIN-indexed ``search_vector`` column with
+    ``websearch_to_tsquery`` and ranks with ``ts_rank``; SQLite uses the
+    ``tasks_fts`` FTS5 table ranked by bm25. Other dialects fall back to an
+    unranked substring match.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        q: Free-text query
+        limit: Maximum number of results
+        offset: Number of results to skip
+
+    Returns:
+        list[Task]: Matching tasks in rank order
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        vector = literal_column("tasks.search_vector")
+        tsquery = func.websearch_to_tsquery("english", q)
+        statement = (
+            select(Task)
+            .where(Task.user_id == user_id, vector.op("@@")(tsquery))
+            .order_by(func.ts_rank(vector, tsquery).desc(), Task.id.desc())
+        )
+    elif dialect == "sqlite":
+        match = _fts5_query(q)
+        if not match:
+            return []
+        statement = (
+            select(Task)
+            .join(tasks_fts, tasks_fts.c.rowid == Task.id)
+            .where(Task.user_id == user_id, literal_column("tasks_fts").op("MATCH")(match))
+            .order_by(tasks_fts.c.rank, Task.id.desc())
+        )
+    else:
+        pattern = f"%{q}%"
+        statement = (
+            select(Task)
+            .where(
+                Task.user_id == user_id,
+                or_(Task.title.ilike(pattern), Task.description.ilike(pattern)),
+            )
+            .order_by(Task.id.desc())
+        )
+
+    return list(db.scalars(statement.limit(limit).offset(offset)))
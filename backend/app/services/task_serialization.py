@@ -0,0 +1,63 @@
+"""Fast JSON encoding of task lists, byte-compatible with TaskResponse.
+
+The regular response path validates every ORM object into a ``TaskResponse``
+and dumps it again. For large listings the fast path instead selects exactly
+the ``TaskResponse`` columns as Core rows and encodes them straight to bytes
+with orjson, which emits the same JSON as Pydantic for these types (str enums
+by value, naive ISO-8601 datetimes, compact separators, raw UTF-8).
+"""
+
+import json
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Any
+
+from app.models.task import Task
+from app.schemas.task import TaskResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+# Field order of TaskResponse, and the matching task columns
+TASK_RESPONSE_FIELDS = tuple(TaskResponse.model_fields)
+TASK_RESPONSE_COLUMNS = tuple(Task.__table__.c[name] for name in TASK_RESPONSE_FIELDS)
+
+
+def _default(value: Any) -> Any:
+    """Encode the non-JSON types found in task rows (stdlib fallback only)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Args:
+        value: JSON-compatible value (datetimes and str enums allowed)
+
+    Returns:
+        bytes: Encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(
+        value, separators=(",", ":"), ensure_ascii=False, default=_default
+    ).encode()
+
+
+def dump_task_rows(rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Encode rows of TASK_RESPONSE_COLUMNS as a JSON list of TaskResponse.
+
+    Args:
+        rows: Row tuples in TASK_RESPONSE_FIELDS order
+
+    Returns:
+        bytes: JSON identical to dumping list[TaskResponse]
+    """
+    fields = TASK_RESPONSE_FIELDS
+    return dumps([dict(zip(fields, row)) for row in rows])
@@ -0,0 +1,76 @@
+"""Aggregated task statistics computed with a single GROUP BY."""
+
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.models.task import Task, TaskCategory, TaskPriority
+from app.schemas.task import TaskStatsResponse
+
+
+def get_task_stats(db: Session, user_id: int, now: datetime) -> TaskStatsResponse:
+    """
+    Count a user's tasks by status, priority and category in one query.
+
+    The query groups by (completed, priority, category), so at most
+    2 x 4 x 7 rows come back however many tasks the user has; the overdue
+    and due-today counts are conditional sums in the same pass.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        now: Reference time for the overdue and due-today counts (UTC)
+
+    Returns:
+        TaskStatsResponse: Aggregated counts
+    """
+    start_of_day = datetime.combine(now.date(), time.min)
+    end_of_day = start_of_day + timedelta(days=1)
+    pending = Task.completed.is_(False)
+
+    rows = db.execute(
+        select(
+            Task.completed,
+            Task.priority,
+            Task.category,
+            func.count(),
+            func.sum(case((and_(pending, Task.due_date < now), 1), else_=0)),
+            func.sum(
+                case(
+                    (
+                        and_(
+                            pending,
+                            Task.due_date >= start_of_day,
+                            Task.due_date < end_of_day,
+                        ),
+                        1,
+                    ),
+                    else_=0,
+                )
+            ),
+        )
+        .where(Task.user_id == user_id)
+        .group_by(Task.completed, Task.priority, Task.category)
+    ).all()
+
+    stats = TaskStatsResponse(
+        total=0,
+        completed=0,
+        pending=0,
+        overdue=0,
+        due_today=0,
+        by_priority={priority: 0 for priority in TaskPriority},
+        by_category={category: 0 for category in TaskCategory},
+    )
+    for completed, priority, category, count, overdue, due_today in rows:
+        stats.total += count
+        if completed:
+            stats.completed += count
+        else:
+            stats.pending += count
+        stats.overdue += overdue or 0
+        stats.due_today += due_today or 0
+        stats.by_priority[priority] += count
+        stats.by_category[category] += count
+    return stats
@@ -0,0 +1,94 @@
+"""Delta sync: a user's task changes since a cursor, including deletions.
+
+Two change streams are read with keyset queries and merged in time order:
+live tasks by (updated_at, id) and tombstones by (deleted_at, id). The sync
+cursor records the last position sent in each stream, so a client that stores
+it and comes back later receives only what changed in between.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.task import Task, TaskTombstone
+from app.schemas.task import TaskChangesResponse, TaskResponse, TaskTombstoneResponse
+from app.services.pagination import encode_sync_cursor
+
+
+def get_task_changes(
+    db: Session,
+    user_id: int,
+    tasks_position: tuple[datetime, int] | None,
+    tombstones_position: tuple[datetime, int] | None,
+    initial: bool,
+    limit: int,
+) -> TaskChangesResponse:
+    """
+    Read up to ``limit`` changes after the given stream positions.
+
+    On an initial sync the client holds no tasks, so no tombstones are sent;
+    the tombstone position starts at the newest existing tombstone instead.
+
+    Args:
+        db: Database session
+        user_id: Owner of the tasks
+        tasks_position: Last (updated_at, id) already sent, or None
+        tombstones_position: Last (deleted_at, id) already sent, or None
+        initial: True when the client has no cursor yet
+        limit: Maximum number of changes to return
+
+    Returns:
+        TaskChangesResponse: Changes in time order and the cursor to resume from
+    """
+    statement = select(Task).where(Task.user_id == user_id)
+    if tasks_position is not None:
+        statement = statement.where(tuple_(Task.updated_at, Task.id) > tuple_(*tasks_position))
+    tasks = db.scalars(
+        statement.order_by(Task.updated_at, Task.id).limit(limit + 1)
+    ).all()
+
+    tombstones: list[TaskTombstone] = []
+    if initial:
+        newest = db.execute(
+            select(TaskTombstone.deleted_at, TaskTombstone.id)
+            .where(TaskTombstone.user_id == user_id)
+            .order_by(TaskTombstone.deleted_at.desc(), TaskTombstone.id.desc())
+            .limit(1)
+        ).first()
+        tombstones_position = tuple(newest) if newest else None
+    else:
+        statement = select(TaskTombstone).where(TaskTombstone.user_id == user_id)
+        if tombstones_position is not None:
+            statement = statement.where(
+                tuple_(TaskTombstone.deleted_at, TaskTombstone.id) > tuple_(*tombstones_position)
+            )
+        tombstones = db.scalars(
+            statement.order_by(TaskTombstone.deleted_at, TaskTombstone.id).limit(limit + 1)
+        ).all()
+
+    # Both lists are sorted, so the first `limit` merged changes are exact
+    changes = sorted(
+        [(task.updated_at, 0, task.id, task) for task in tasks]
+        + [(tombstone.deleted_at, 1, tombstone.id, tombstone) for tombstone in tombstones],
+        key=lambda change: change[:3],
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    updated: list[TaskResponse] = []
+    deleted: list[TaskTombstoneResponse] = []
+    for changed_at, _, row_id, row in changes:
+        if isinstance(row, Task):
+            updated.append(TaskResponse.model_validate(row))
+            tasks_position = (changed_at, row_id)
+        else:
+            deleted.append(TaskTombstoneResponse.model_validate(row))
+            tombstones_position = (changed_at, row_id)
+
+    return TaskChangesResponse(
+        updated=updated,
+        deleted=deleted,
+        cursor=encode_sync_cursor(tasks_position, tombstones_position),
+        has_more=has_more,
+    )
@@ -0,0 +1,189 @@
+"""Offline token estimates and per-turn prompt budget accounting for the LLM.
+
+The estimator needs no tokenizer files or network. It approximates BPE
+tokenizers such as Llama 3's: short words are one token, longer words about
+one per four characters, punctuation one each, and non-ASCII characters one
+each. It errs slightly high, which is the safe side for a budget; the
+provider's ``usage`` figures are recorded next to it for comparison.
+"""
+
+import json
+import re
+import threading
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any
+
+# Chat-template overhead per message (role markers) and per reply
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+
+_PIECES = re.compile(r"[A-Za-z]+|[0-9]{1,3}|[^\sA-Za-z0-9]")
+
+
+class PromptBudgetExceeded(Exception):
+    """Raised when a completion request cannot be brought under the budget."""
+
+    def __init__(self, estimated_tokens: int, max_tokens: int):
+        super().__init__(
+            f"Prompt needs about {estimated_tokens} tokens, budget is {max_tokens}"
+        )
+        self.estimated_tokens = estimated_tokens
+        self.max_tokens = max_tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        tokens += (len(piece) + 3) // 4 if piece.isascii() else len(piece)
+    return tokens
+
+
+def estimate_message_tokens(message: dict[str, Any]) -> int:
+    """Estimate one chat message, including tool calls it carries."""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content") or "")
+    for call in message.get("tool_calls") or []:
+        function = call["function"]
+        tokens += MESSAGE_OVERHEAD_TOKENS
+        tokens += estimate_tokens(function["name"]) + estimate_tokens(function["arguments"])
+    return tokens
+
+
+def estimate_tools_tokens(tools: list[dict[str, Any]]) -> int:
+    """Estimate the tool schemas, which are sent with every completion."""
+    return sum(estimate_tokens(json.dumps(tool)) for tool in tools)
+
+
+def estimate_prompt_tokens(
+    messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None = None
+) -> int:
+    """Estimate a whole completion request: messages, tool schemas and reply priming."""
+    tokens = REPLY_OVERHEAD_TOKENS + sum(estimate_message_tokens(m) for m in messages)
+    if tools:
+        tokens += estimate_tools_tokens(tools)
+    return tokens
+
+
+def compact_tool_result(text: str, max_tokens: int) -> str:
+    """
+    Cut a tool result down to about ``max_tokens``, keeping whole leading lines.
+
+    Args:
+        text: The tool's text output
+        max_tokens: Largest estimated size to keep
+
+    Returns:
+        str: The text unchanged if it fits, else its head and a note saying
+        how many lines were left out
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    kept: list[str] = []
+    used = 0
+    for line in lines:
+        used += estimate_tokens(line) + 1
+        if used > max_tokens:
+            break
+        kept.append(line)
+    if not kept:
+        # One enormous line: fall back to a character cut
+        kept = [lines[0][: max_tokens * 4]] if lines else []
+    omitted = len(lines) - len(kept)
+    return "\n".join(kept) + (
+        f"\n... ({omitted} more lines not shown; use a narrower filter or search)"
+    )
+
+
+def fit_prompt(
+    messages: list[dict[str, Any]], tools: list[dict[str, Any]], max_tokens: int
+) -> int:
+    """
+    Trim history in place until the request fits the budget.
+
+    The system prompt (first message) and the newest user message are kept;
+    older history messages are dropped oldest first. Tool exchanges of the
+    current turn (after the newest user message) are never split.
+
+    Args:
+        messages: The completion's messages, modified in place
+        tools: Tool schemas sent with the request
+        max_tokens: Prompt budget
+
+    Returns:
+        int: Estimated prompt tokens after trimming
+
+    Raises:
+        PromptBudgetExceeded: If the request is over budget with no history left
+    """
+    estimate = estimate_prompt_tokens(messages, tools)
+    if estimate <= max_tokens:
+        return estimate
+    last_user = max(
+        (i for i, message in enumerate(messages) if message["role"] == "user"), default=0
+    )
+    while estimate > max_tokens and last_user > 1:
+        estimate -= estimate_message_tokens(messages.pop(1))
+        last_user -= 1
+    if estimate > max_tokens:
+        raise PromptBudgetExceeded(estimate, max_tokens)
+    return estimate
+
+
+@dataclass
+class TurnUsage:
+    """Token accounting for one chat turn (all of its completions)."""
+
+    completions: int = 0
+    estimated_prompt_tokens: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    trimmed_messages: int = 0
+    truncated_tool_results: int = 0
+
+    def record_request(self, estimated_prompt_tokens: int) -> None:
+        """Count an outgoing completion and its estimated size."""
+        self.completions += 1
+        self.estimated_prompt_tokens += estimated_prompt_tokens
+
+    def record_usage(self, usage: Any) -> None:
+        """Add a completion's measured ``usage`` (ignored when missing)."""
+        if usage is None:
+            return
+        self.prompt_tokens += usage.prompt_tokens or 0
+        self.completion_tokens += usage.completion_tokens or 0
+
+
+@dataclass
+class UsageTotals:
+    """Process-wide totals of TurnUsage, reported under /metrics."""
+
+    turns: int = 0
+    completions: int = 0
+    estimated_prompt_tokens: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    trimmed_messages: int = 0
+    truncated_tool_results: int = 0
+    budget_rejections: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, turn: TurnUsage) -> None:
+        """Accumulate a finished turn."""
+        with self._lock:
+            self.turns += 1
+            for name, value in asdict(turn).items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def reject(self) -> None:
+        """Count a turn refused for exceeding the prompt budget."""
+        with self._lock:
+            self.budget_rejections += 1
+
+    def as_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        with self._lock:
+            return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "_lock"}
+
+
+usage_totals = UsageTotals()
@@ -0,0 +1,152 @@
+"""Cache of verified JWT claims, so a token's signature is checked once."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.config import settings
+from app.services.cache import CacheStats
+
+
+def _token_key(token: str) -> bytes:
+    """Hash a token so raw bearer tokens are never kept in memory."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _token_exp(claims: dict[str, Any]) -> float | None:
+    """The token's own ``exp`` as a timestamp, if it has a numeric one."""
+    exp = claims.get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def _expires_at(claims: dict[str, Any], max_ttl_seconds: float) -> float:
+    """Wall-clock expiry of cached claims: the token's exp, capped by the TTL."""
+    expires_at = time.time() + max_ttl_seconds
+    exp = _token_exp(claims)
+    if exp is not None:
+        expires_at = min(expires_at, exp)
+    return expires_at
+
+
+class TokenCache:
+    """
+    Bounded LRU of decoded JWT claims keyed by a hash of the token.
+
+    Claims are kept until the token's ``exp`` (or ``max_ttl_seconds``, whichever
+    comes first). Revoked tokens go on a deny list until their own ``exp``,
+    however long that is, so a revoked token cannot be re-verified and
+    re-cached once its claims would have left the cache.
+    """
+
+    def __init__(self, max_entries: int, max_ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached tokens; 0 disables caching
+                (revocation still works)
+            max_ttl_seconds: Upper bound on how long claims stay cached
+        """
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+        self._revoked: dict[bytes, float] = {}
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Return the cached claims, or None on a miss or expired entry."""
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return claims
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        """Cache verified claims, evicting the least recently used tokens."""
+        if not self.max_entries:
+            return
+        key = _token_key(token)
+        expires_at = _expires_at(claims, self.max_ttl_seconds)
+        with self._lock:
+            if key in self._revoked:
+                return
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def revoke(self, token: str, claims: dict[str, Any] | None = None) -> None:
+        """
+        Revocation hook: forget a token and refuse it until it expires.
+
+        Args:
+            token: The bearer token to revoke
+            claims: Its decoded claims; their ``exp`` is how long it is remembered
+        """
+        key = _token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if claims is None and entry is not None:
+                claims = entry[0]
+            # Without an exp the token is refused for the longest cache TTL
+            exp = _token_exp(claims or {})
+            self._revoked[key] = exp if exp is not None else now + self.max_ttl_seconds
+            self._revoked = {k: until for k, until in self._revoked.items() if until > now}
+            self._stats.invalidations += 1
+
+    def is_revoked(self, token: str) -> bool:
+        """Check the deny list."""
+        key = _token_key(token)
+        with self._lock:
+            until = self._revoked.get(key)
+            return until is not None and until > time.time()
+
+    def clear(self) -> None:
+        """Drop every cached token and the deny list (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return CacheStats(
+                **{**self._stats.as_dict(), "entries": len(self._entries)}
+            )
+
+
+_token_cache: TokenCache | None = None
+
+
+def get_token_cache() -> TokenCache:
+    """Get or create the token cache configured in settings."""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache(
+            max_entries=settings.auth_token_cache_max_entries
+            if settings.auth_token_cache_enabled
+            else 0,
+            max_ttl_seconds=settings.auth_token_cache_max_ttl_seconds,
+        )
+    return _token_cache
+
+
+def set_token_cache(cache: TokenCache) -> None:
+    """Replace the token cache (e.g. with different limits in tests)."""
+    global _token_cache
+    _token_cache = cache
@@ -0,0 +1,54 @@
+"""Benchmark per-request token verification overhead.
+
+Times ``decode_access_token`` for a realistic bearer token with the claims
+cache disabled (every call checks the signature) and enabled (the first call
+does), and reports the mean cost per request.
+
+Usage (from backend/):
+    python -m benchmarks.auth_overhead [--requests 100000] [--users 100]
+"""
+
+import argparse
+import time
+
+from app.config import settings
+from app.services.auth import create_access_token, decode_access_token
+from app.services.token_cache import TokenCache, set_token_cache
+
+
+def measure(tokens: list[str], requests: int) -> float:
+    """Return the mean seconds per decode, cycling through the tokens."""
+    started = time.perf_counter()
+    for i in range(requests):
+        decode_access_token(tokens[i % len(tokens)])
+    return (time.perf_counter() - started) / requests
+
+
+def run(requests: int, users: int) -> None:
+    """Compare the uncached and cached verification paths."""
+    tokens = [create_access_token({"sub": str(user_id)}) for user_id in range(1, users + 1)]
+    ttl = settings.auth_token_cache_max_ttl_seconds
+
+    set_token_cache(TokenCache(max_entries=0, max_ttl_seconds=ttl))
+    uncached = measure(tokens, requests)
+
+    cache = TokenCache(max_entries=settings.auth_token_cache_max_entries, max_ttl_seconds=ttl)
+    set_token_cache(cache)
+    cached = measure(tokens, requests)
+
+    print(f"{'path':>9} {'us/request':>11} {'requests/s':>12}")
+    for name, seconds in (("uncached", uncached), ("cached", cached)):
+        print(f"{name:>9} {seconds * 1e6:>11.2f} {1 / seconds:>12,.0f}")
+    print(f"speedup: {uncached / cached:.1f}x, {cache.stats().as_dict()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+    run(args.requests, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark concurrent chat turns: a blocking turn per thread vs. async ``achat``.
+
+The LLM is replaced by a stub that waits ``--latency`` seconds per completion,
+so the numbers show how many simultaneous conversations one worker carries.
+The baseline is a blocking turn (the LLM wait as ``time.sleep``, as a sync
+client would hold its thread) on a threadpool of Starlette's default size
+(40 threads); the async agent runs every conversation as a coroutine on one
+event loop.
+
+Usage (from backend/):
+    python -m benchmarks.chat_concurrency [--conversations 500] [--latency 0.5]
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import anyio.to_thread
+
+from app.services.ai_agent import AIAgent
+
+THREADPOOL_SIZE = 40
+
+
+def completion() -> SimpleNamespace:
+    """A final (tool-free) completion shaped like the Groq client's."""
+    message = SimpleNamespace(content="Done.", tool_calls=None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def stub_agent(latency: float) -> AIAgent:
+    """An agent whose async client sleeps instead of calling Groq."""
+    agent = AIAgent(api_key="benchmark")
+
+    async def acreate(**kwargs):
+        await asyncio.sleep(latency)
+        return completion()
+
+    agent.async_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=acreate))
+    )
+    return agent
+
+
+def blocking_turn(latency: float) -> str:
+    """A turn whose completion blocks its thread, like a sync LLM client."""
+    time.sleep(latency)
+    return completion().choices[0].message.content
+
+
+async def run_threadpool(agent: AIAgent, conversations: int, latency: float) -> float:
+    """Run every turn as a blocking call on a bounded threadpool; return seconds."""
+    limiter = anyio.CapacityLimiter(THREADPOOL_SIZE)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        anyio.to_thread.run_sync(blocking_turn, latency, limiter=limiter)
+        for _ in range(conversations)
+    ))
+    return time.perf_counter() - started
+
+
+async def run_async(agent: AIAgent, conversations: int, latency: float) -> float:
+    """Run every turn through ``achat`` concurrently; return seconds."""
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        agent.achat("Hi", [], user_id=1, db=None) for _ in range(conversations)
+    ))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    agent = stub_agent(args.latency)
+    print(f"{'agent':>12} {'seconds':>8} {'turns/s':>9}")
+    for name, runner in (("threadpool", run_threadpool), ("async", run_async)):
+        elapsed = asyncio.run(runner(agent, args.conversations, args.latency))
+        print(f"{name:>12} {elapsed:>8.2f} {args.conversations / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark the rate limiter's per-request overhead.
+
+Times a bare bucket acquire on the in-memory store, then one ASGI request
+through RateLimitMiddleware for an unlisted route, an IP-keyed route and a
+user-keyed route (token subject from the verified-claims cache). Limits are
+set high enough that no request is rejected.
+
+Usage (from backend/):
+    python -m benchmarks.rate_limit [--requests 200000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.services.auth import create_access_token
+from app.services.rate_limit import (
+    InMemoryRateLimitStore,
+    RateLimitMiddleware,
+    RateLimitPolicy,
+    set_rate_limit_store,
+)
+
+POLICIES = [
+    RateLimitPolicy("login", "POST", "/api/auth/login", rate=1e9, burst=10**9, key="ip"),
+    RateLimitPolicy("chat", "POST", "/api/chat", rate=1e9, burst=10**9, key="user"),
+]
+
+
+async def endpoint(scope, receive, send) -> None:
+    """Stand-in application that does nothing."""
+
+
+def scope(method: str, path: str, token: str | None = None) -> dict:
+    """Minimal HTTP scope for the middleware."""
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": headers,
+        "client": ("203.0.113.7", 50000),
+    }
+
+
+async def measure(app, request_scope: dict, requests: int) -> float:
+    """Mean seconds per request through ``app``."""
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(request_scope, None, None)
+    return (time.perf_counter() - started) / requests
+
+
+def run(requests: int) -> None:
+    """Print the per-request cost of each path in microseconds."""
+    store = InMemoryRateLimitStore(max_keys=100_000)
+    set_rate_limit_store(store)
+    app = RateLimitMiddleware(endpoint, POLICIES)
+    token = create_access_token({"sub": "1"})
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        store.acquire("bench", 1e9, 10**9)
+    acquire = (time.perf_counter() - started) / requests
+
+    results = {
+        "store.acquire": acquire,
+        "bare endpoint": asyncio.run(measure(endpoint, scope("GET", "/health"), requests)),
+        "unlisted route": asyncio.run(measure(app, scope("GET", "/health"), requests)),
+        "login (ip)": asyncio.run(measure(app, scope("POST", "/api/auth/login"), requests)),
+        "chat (user)": asyncio.run(measure(app, scope("POST", "/api/chat", token), requests)),
+    }
+    print(f"{'path':>15} {'us/request':>11}")
+    for name, seconds in results.items():
+        print(f"{name:>15} {seconds * 1e6:>11.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.requests)
+
+
+if __name__ == "__main__":
+    main()
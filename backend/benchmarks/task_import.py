@@ -0,0 +1,105 @@
+"""Benchmark streaming task import throughput.
+
+Feeds a generated NDJSON or CSV body through the import pipeline (parse,
+TaskCreate validation, chunked load) against an in-memory SQLite database and
+reports rows per second.
+
+Usage (from backend/):
+    python -m benchmarks.task_import [--rows 10000 100000] [--format ndjson]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.database import Base, Database
+from app.models.task import Task
+from app.models.user import User
+from app.services.task_import import import_tasks
+
+PRIORITIES = ["LOW", "MEDIUM", "HIGH", "URGENT"]
+
+
+def body_lines(rows: int, import_format: str) -> list[bytes]:
+    """Generate the import body as encoded lines."""
+    if import_format == "csv":
+        lines = ["title,description,priority,due_date"]
+        lines += [
+            f"Imported task {i},Notes for {i},{PRIORITIES[i % 4]},2026-03-{i % 28 + 1:02d}T09:00:00"
+            for i in range(rows)
+        ]
+    else:
+        lines = [
+            json.dumps({
+                "title": f"Imported task {i}",
+                "description": f"Notes for {i}",
+                "priority": PRIORITIES[i % 4],
+                "due_date": f"2026-03-{i % 28 + 1:02d}T09:00:00",
+            })
+            for i in range(rows)
+        ]
+    return [f"{line}\n".encode() for line in lines]
+
+
+async def chunked(lines: list[bytes], size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Re-chunk the body like a streamed request (64 KiB reads)."""
+    buffer = bytearray()
+    for line in lines:
+        buffer += line
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def run(sizes: list[int], import_format: str) -> None:
+    """Import each size into a fresh database and print the throughput."""
+    print(f"{'rows':>8} {'seconds':>8} {'rows/s':>10}")
+    for size in sizes:
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=engine)
+        lines = body_lines(size, import_format)
+        with Session(engine) as session:
+            user = User(username="bench", email="bench@example.com", hashed_password="x")
+            session.add(user)
+            session.commit()
+
+            started = time.perf_counter()
+            result = asyncio.run(
+                import_tasks(
+                    Database(session, session),
+                    user.id,
+                    chunked(lines),
+                    import_format,
+                    settings.task_import_chunk_size,
+                    settings.task_import_max_errors,
+                )
+            )
+            elapsed = time.perf_counter() - started
+
+            assert result.imported == size and result.failed == 0, result.errors[:3]
+            assert session.scalar(select(func.count()).select_from(Task)) == size
+        engine.dispose()
+        print(f"{size:>8} {elapsed:>8.2f} {size / elapsed:>10,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+    run(args.rows, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark the task list serialization paths.
+
+Compares the default path (ORM objects validated into TaskResponse and dumped
+by Pydantic) with the fast path (Core rows encoded by orjson) for one user's
+task list at several sizes, against an in-memory SQLite database.
+
+Usage (from backend/):
+    python -m benchmarks.task_serialization [--sizes 1000 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models.task import Task, TaskCategory, TaskPriority
+from app.models.user import User
+from app.schemas.task import TaskResponse
+from app.services import task_repository
+from app.services.task_serialization import TASK_RESPONSE_COLUMNS, dump_task_rows
+
+task_list_adapter = TypeAdapter(list[TaskResponse])
+
+
+def seed(session: Session, user_id: int, count: int) -> None:
+    """Insert ``count`` tasks for the user with a realistic mix of values."""
+    start = datetime(2026, 1, 1, 8, 0, 0)
+    priorities = list(TaskPriority)
+    categories = list(TaskCategory)
+    session.execute(
+        insert(Task),
+        [
+            {
+                "title": f"Task {i}: follow up on item #{i}",
+                "description": f"Details for task {i}" if i % 3 else None,
+                "completed": i % 4 == 0,
+                "priority": priorities[i % len(priorities)],
+                "category": categories[i % len(categories)],
+                "due_date": start + timedelta(days=i % 90) if i % 2 else None,
+                "user_id": user_id,
+                "created_at": start + timedelta(seconds=i, microseconds=i % 1000),
+                "updated_at": start + timedelta(seconds=i),
+            }
+            for i in range(count)
+        ],
+    )
+    session.commit()
+
+
+def pydantic_path(session: Session, user_id: int) -> bytes:
+    """Default path: ORM entities -> TaskResponse -> JSON."""
+    tasks = task_repository.list_tasks(session, user_id)
+    return task_list_adapter.dump_json(
+        task_list_adapter.validate_python(tasks, from_attributes=True)
+    )
+
+
+def fast_path(session: Session, user_id: int) -> bytes:
+    """Fast path: Core rows -> orjson."""
+    rows = task_repository.list_task_rows(session, user_id, TASK_RESPONSE_COLUMNS)
+    return dump_task_rows(rows)
+
+
+def measure(fn, session: Session, user_id: int, repeat: int) -> tuple[float, bytes]:
+    """Return the median wall time of fn over ``repeat`` runs and its output."""
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        session.expunge_all()
+        started = time.perf_counter()
+        body = fn(session, user_id)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), body
+
+
+def run(sizes: list[int], repeat: int) -> None:
+    """Seed each size, check both paths agree and print the timings."""
+    print(f"{'rows':>8} {'pydantic ms':>12} {'fast ms':>10} {'speedup':>8}")
+    for size in sizes:
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            user = User(username="bench", email="bench@example.com", hashed_password="x")
+            session.add(user)
+            session.commit()
+            seed(session, user.id, size)
+
+            slow_time, slow_body = measure(pydantic_path, session, user.id, repeat)
+            fast_time, fast_body = measure(fast_path, session, user.id, repeat)
+            assert fast_body == slow_body, "fast path output differs from TaskResponse"
+
+        engine.dispose()
+        print(
+            f"{size:>8} {slow_time * 1000:>12.1f} {fast_time * 1000:>10.1f}"
+            f" {slow_time / fast_time:>7.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 """Pytest configuration and fixtures."""
 
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -9,6 +9,11 @@ from sqlalchemy.pool import StaticPool
 
 from app.database import Base, get_db
 from app.main import app
+from app.services.cache import get_task_cache
+from app.services.auth import get_user_cache
+from app.services.history_cache import get_history_cache
+from app.services.rate_limit import get_rate_limit_store
+from app.services.token_cache import get_token_cache
 
 # Create in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -37,7 +42,14 @@ def db_session():
 def mock_ai_agent():
     """Create a mock AI agent for testing."""
     mock_agent = Mock()
-    mock_agent.chat.return_value = "I've processed your request successfully!"
+    mock_agent.achat = AsyncMock(return_value="I've processed your request successfully!")
+    mock_agent.asummarize = AsyncMock(return_value="Summary of earlier messages")
+
+    async def achat_stream(**kwargs):
+        yield {"type": "token", "content": "I've processed "}
+        yield {"type": "token", "content": "your request successfully!"}
+
+    mock_agent.achat_stream = Mock(side_effect=achat_stream)
     return mock_agent
 
 
@@ -51,6 +63,12 @@ def client(db_session, mock_ai_agent):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    # User ids repeat across tests, so start every test with an empty cache
+    get_task_cache().clear()
+    get_token_cache().clear()
+    get_user_cache().clear()
+    get_rate_limit_store().clear()
+    get_history_cache().clear()
     
     # Mock the AI agent to avoid needing GROQ_API_KEY
     with patch('app.routers.chat.get_ai_agent', return_value=mock_ai_agent):
@@ -0,0 +1,133 @@
+"""Tests for the API running on the async engine (DATABASE_MODE=async)."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.config import settings
+from app.database import Base
+
+
+@pytest.fixture
+def async_mode(client, tmp_path, monkeypatch):
+    """Serve requests from an aiosqlite engine instead of the sync session."""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+
+    async_engine = create_async_engine(
+        url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool
+    )
+    monkeypatch.setattr(settings, "database_mode", "async")
+    monkeypatch.setattr(
+        database,
+        "_async_sessionmaker",
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+    )
+    yield client
+    sync_engine.dispose()
+
+
+def register(client, username: str) -> dict:
+    """Register and log in a user, returning the id and auth headers."""
+    user = client.post(
+        "/api/auth/register",
+        json={"username": username, "email": f"{username}@example.com", "password": "password123"},
+    ).json()
+    token = client.post(
+        "/api/auth/login", json={"username": username, "password": "password123"}
+    ).json()["access_token"]
+    return {"id": user["id"], "headers": {"Authorization": f"Bearer {token}"}}
+
+
+def test_task_crud_async(async_mode):
+    """Create, list, update, search and delete tasks through the async engine."""
+    user = register(async_mode, "asyncuser")
+    url = f"/api/{user['id']}/tasks"
+
+    created = async_mode.post(url, json={"title": "Buy groceries"}, headers=user["headers"])
+    assert created.status_code == 201
+    task_id = created.json()["id"]
+
+    listed = async_mode.get(url, headers=user["headers"])
+    assert [task["id"] for task in listed.json()] == [task_id]
+
+    updated = async_mode.put(
+        f"{url}/{task_id}", json={"completed": True}, headers=user["headers"]
+    )
+    assert updated.json()["completed"] is True
+
+    exported = async_mode.get(f"{url}/export", headers=user["headers"])
+    assert exported.text.splitlines() == [updated.text]
+
+    found = async_mode.get(f"{url}/search", params={"q": "groc"}, headers=user["headers"])
+    assert [task["id"] for task in found.json()] == [task_id]
+
+    deleted = async_mode.delete(f"{url}/{task_id}", headers=user["headers"])
+    assert deleted.status_code == 204
+    assert async_mode.get(f"{url}/{task_id}", headers=user["headers"]).status_code == 404
+
+
+def test_chat_async(async_mode, mock_ai_agent):
+    """Chat persists the conversation through the async engine."""
+    user = register(async_mode, "asyncchat")
+
+    response = async_mode.post("/api/chat", json={"message": "Hello"}, headers=user["headers"])
+    assert response.status_code == 200
+    conversation_id = response.json()["conversation_id"]
+
+    conversation = async_mode.get(f"/api/chat/{conversation_id}", headers=user["headers"])
+    assert [message["role"] for message in conversation.json()["messages"]] == [
+        "user",
+        "assistant",
+    ]
+
+
+def test_chat_fold_updates_history_cache_async(async_mode, mock_ai_agent, monkeypatch):
+    """A summary fold on the async engine lands in the history cache."""
+    from unittest.mock import patch
+
+    from app.services import history_cache
+    from app.services.history_cache import HistoryCache
+
+    cache = HistoryCache(max_bytes=1024 * 1024, max_messages=6, ttl_seconds=0)
+    monkeypatch.setattr(history_cache, "_history_cache", cache)
+    user = register(async_mode, "asyncfold")
+
+    with patch.multiple(settings, chat_history_turns=2, chat_summary_batch_turns=1):
+        conversation_id = async_mode.post(
+            "/api/chat", json={"message": "Turn 1"}, headers=user["headers"]
+        ).json()["conversation_id"]
+        for turn in (2, 3):
+            async_mode.post(
+                "/api/chat",
+                json={"message": f"Turn {turn}", "conversation_id": conversation_id},
+                headers=user["headers"],
+            )
+
+    mock_ai_agent.asummarize.assert_awaited_once()
+    cached = cache.get(conversation_id)
+    assert cached.summary == "Summary of earlier messages"
+    assert cached.summary_message_id is not None
+    assert [m.content for m in cached.messages if m.role == "user"] == ["Turn 2", "Turn 3"]
+
+
+def test_fork_sessions_match_factories(async_mode, db_session):
+    """Forked sessions keep the factories' settings (no expiry on async commit)."""
+    import asyncio
+
+    from app.database import Database
+
+    async def check() -> None:
+        async with database.get_async_sessionmaker()() as session:
+            async with Database(session, db_session).fork() as fork:
+                assert fork.session.sync_session.expire_on_commit is False
+                assert fork.session.autoflush is False
+                assert fork.sync_session.autoflush is False
+        async with Database(db_session, db_session).fork() as fork:
+            assert fork.session.autoflush is False
+            assert fork.session.get_bind() is db_session.get_bind()
+
+    asyncio.run(check())
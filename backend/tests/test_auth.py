@@ -106,3 +106,165 @@ def test_get_current_user_invalid_token(client):
         headers={"Authorization": "Bearer invalid_token"},
     )
     assert response.status_code == 401
+
+
+def test_token_verification_is_cached(client, test_user):
+    """Repeated requests with the same token skip jwt.decode."""
+    from unittest.mock import patch
+
+    from app.services import auth
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    with patch.object(auth.jwt, "decode", wraps=auth.jwt.decode) as decode:
+        for _ in range(3):
+            assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert decode.call_count == 0
+
+
+def test_logout_revokes_token(client, test_user):
+    """A token is refused after logout even though its signature is valid."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    response = client.post("/api/auth/logout", headers=headers)
+    assert response.status_code == 204
+
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.post("/api/auth/logout", headers=headers).status_code == 401
+
+
+def test_logout_outlives_cache_ttl(client, test_user):
+    """A revoked token stays refused past the claim cache's max TTL."""
+    import time
+    from unittest.mock import patch
+
+    from app.config import settings
+    from app.services.token_cache import get_token_cache
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    assert client.post("/api/auth/logout", headers=headers).status_code == 204
+
+    later = time.time() + settings.auth_token_cache_max_ttl_seconds + 100
+    with patch("app.services.token_cache.time.time", return_value=later):
+        assert get_token_cache().is_revoked(test_user["token"])
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_principal_user_check_is_cached(client, test_user, db_session):
+    """Task routes confirm the user exists once per TTL, not per request."""
+    from unittest.mock import patch
+
+    from app.config import settings
+    from app.models.user import User
+    from app.services.auth import get_user_cache
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    assert client.get(url, headers=headers).status_code == 200
+
+    db_session.query(User).delete()
+    db_session.commit()
+
+    # Still within the existence TTL
+    assert client.get(url, headers=headers).status_code == 200
+    # Once the confirmation expires the deleted user is locked out
+    get_user_cache().clear()
+    assert client.get(url, headers=headers).status_code == 401
+
+    # A TTL of 0 trusts the signed claims alone
+    with patch.object(settings, "auth_user_check_ttl_seconds", 0):
+        assert client.get(url, headers=headers).status_code == 200
+
+
+def test_password_pool_rejects_when_saturated(client, test_user):
+    """Logins beyond the pool's workers and queue fail fast with 503."""
+    import asyncio
+    import threading
+    import time
+
+    from app.services import password_pool
+    from app.services.password_pool import PasswordPool, set_password_pool
+
+    login = {"username": "testuser", "password": "testpassword123"}
+    previous = password_pool.get_password_pool()
+    pool = PasswordPool(workers=1, max_queue=0)
+    set_password_pool(pool)
+    release = threading.Event()
+    try:
+        # Occupy the only worker with a job that waits for the event
+        blocker = threading.Thread(target=asyncio.run, args=(pool.run(release.wait),))
+        blocker.start()
+        while pool.stats().in_flight == 0:
+            time.sleep(0.001)
+
+        response = client.post("/api/auth/login", json=login)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert pool.stats().rejected == 1
+
+        release.set()
+        blocker.join()
+        assert client.post("/api/auth/login", json=login).status_code == 200
+
+        stats = client.get("/metrics").json()["password_pool"]
+        assert stats["completed"] == 2
+        assert stats["queue_wait_max"] >= 0
+        assert stats["work_time_total"] > 0
+    finally:
+        release.set()
+        pool.shutdown()
+        set_password_pool(previous)
+
+
+def test_token_bucket_refills():
+    """A bucket allows a burst, then one request per 1/rate seconds."""
+    from unittest.mock import patch
+
+    from app.services.rate_limit import InMemoryRateLimitStore
+
+    store = InMemoryRateLimitStore(max_keys=2)
+    with patch("app.services.rate_limit.time.monotonic", return_value=100.0):
+        assert [store.acquire("a", rate=0.5, burst=2) for _ in range(3)] == [0, 0, 2.0]
+        assert store.acquire("b", rate=0.5, burst=2) == 0
+    with patch("app.services.rate_limit.time.monotonic", return_value=102.0):
+        assert store.acquire("a", rate=0.5, burst=2) == 0
+        assert store.acquire("a", rate=0.5, burst=2) == 2.0
+
+    # Least recently used buckets are dropped (and come back full)
+    store.acquire("c", rate=0.5, burst=2)
+    assert store.acquire("b", rate=0.5, burst=1) == 0
+
+
+def test_rate_limit_refill_must_be_positive():
+    """A zero refill rate is rejected at startup instead of dividing by zero."""
+    from pydantic import ValidationError
+
+    from app.config import Settings
+
+    with pytest.raises(ValidationError):
+        Settings(rate_limit_login_per_minute=0)
+    with pytest.raises(ValidationError):
+        Settings(rate_limit_chat_per_minute=0)
+
+
+def test_login_rate_limited_per_ip(client, test_user):
+    """Login attempts beyond the burst get 429 with Retry-After."""
+    from app.config import settings
+
+    login = {"username": "testuser", "password": "wrong"}
+    # The test_user fixture has already used one token by logging in
+    statuses = [
+        client.post("/api/auth/login", json=login).status_code
+        for _ in range(settings.rate_limit_login_burst - 1)
+    ]
+    assert statuses == [401] * (settings.rate_limit_login_burst - 1)
+
+    response = client.post("/api/auth/login", json=login)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # Other routes are not limited
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
@@ -0,0 +1,165 @@
+"""Tests for the task-list cache."""
+
+import time
+
+from app.services.cache import LRUCache, get_task_cache
+from app.services.token_cache import TokenCache
+
+
+def test_lru_eviction_by_entries():
+    """The least-recently-used entry is evicted past max_entries."""
+    cache = LRUCache(max_entries=2, max_bytes=1024, ttl_seconds=0)
+    cache.set("1", "a", b"A")
+    cache.set("1", "b", b"B")
+    assert cache.get("1", "a") == b"A"  # "a" becomes most recent
+    cache.set("1", "c", b"C")
+
+    assert cache.get("1", "b") is None
+    assert cache.get("1", "a") == b"A"
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.entries == 2
+
+
+def test_lru_memory_ceiling():
+    """Entries are evicted to stay under max_bytes; oversized values are skipped."""
+    cache = LRUCache(max_entries=100, max_bytes=40, ttl_seconds=0)
+    cache.set("1", "a", b"x" * 20)
+    cache.set("1", "b", b"x" * 20)
+    assert cache.stats().evictions == 1
+    assert cache.stats().bytes <= 40
+
+    cache.set("1", "huge", b"x" * 100)
+    assert cache.get("1", "huge") is None
+
+    # Sizes are counted in encoded bytes, not characters
+    cache.clear()
+    cache.set("1", "é" * 9, "é".encode() * 9)
+    assert cache.stats().bytes == 1 + 18 + 18
+
+
+def test_ttl_expiry():
+    """Expired entries count as misses."""
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl_seconds=0.01)
+    cache.set("1", "a", b"A")
+    time.sleep(0.02)
+    assert cache.get("1", "a") is None
+    assert cache.stats().expirations == 1
+
+
+def test_invalidate_group():
+    """Invalidating a group leaves other groups intact."""
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl_seconds=0)
+    cache.set("1", "a", b"A")
+    cache.set("1", "b", b"B")
+    cache.set("2", "a", b"C")
+    cache.invalidate("1")
+
+    assert cache.get("1", "a") is None
+    assert cache.get("1", "b") is None
+    assert cache.get("2", "a") == b"C"
+
+
+def test_token_cache_lru_and_expiry():
+    """Token claims are bounded by count and dropped at their exp."""
+    cache = TokenCache(max_entries=2, max_ttl_seconds=60)
+    cache.set("t1", {"sub": "1", "exp": time.time() + 60})
+    cache.set("t2", {"sub": "2", "exp": time.time() + 60})
+    assert cache.get("t1")["sub"] == "1"  # "t1" becomes most recent
+    cache.set("t3", {"sub": "3", "exp": time.time() + 60})
+    assert cache.get("t2") is None
+    assert cache.stats().evictions == 1
+
+    cache.set("short", {"sub": "4", "exp": time.time() + 0.01})
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.stats().expirations == 1
+
+
+def test_token_cache_revocation():
+    """A revoked token is dropped, refused and never cached again."""
+    cache = TokenCache(max_entries=10, max_ttl_seconds=60)
+    claims = {"sub": "1", "exp": time.time() + 60}
+    cache.set("t1", claims)
+    cache.revoke("t1")
+
+    assert cache.get("t1") is None
+    assert cache.is_revoked("t1")
+    cache.set("t1", claims)
+    assert cache.get("t1") is None
+    assert not cache.is_revoked("t2")
+
+    # Caching disabled: revocation still applies
+    disabled = TokenCache(max_entries=0, max_ttl_seconds=60)
+    disabled.set("t1", claims)
+    assert disabled.get("t1") is None
+    disabled.revoke("t1", claims)
+    assert disabled.is_revoked("t1")
+
+
+def test_task_list_served_from_cache(client, test_user):
+    """Repeated list reads hit the cache and writes invalidate it."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    client.post(url, json={"title": "Cached"}, headers=headers)
+    cache = get_task_cache()
+    hits = cache.stats().hits
+
+    first = client.get(url, headers=headers)
+    second = client.get(url, headers=headers)
+    assert second.json() == first.json()
+    assert cache.stats().hits == hits + 1
+
+    client.post(url, json={"title": "Fresh"}, headers=headers)
+    assert cache.stats().entries == 0
+    assert [task["title"] for task in client.get(url, headers=headers).json()] == [
+        "Cached",
+        "Fresh",
+    ]
+
+
+def test_metrics_endpoint(client):
+    """Cache counters are exposed on /metrics."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions"} <= set(response.json()["task_cache"])
+    assert {"hits", "misses", "evictions"} <= set(response.json()["token_cache"])
+
+
+def test_history_cache_append_fold_and_byte_ceiling():
+    """Histories keep their newest messages, absorb folds and evict by bytes."""
+    from app.services.history_cache import CachedHistory, CachedMessage, HistoryCache
+
+    def messages(*ids):
+        return tuple(CachedMessage.create(i, "user", f"message {i}") for i in ids)
+
+    cache = HistoryCache(max_bytes=64 * 1024, max_messages=4, ttl_seconds=0)
+    assert cache.get(1) is None
+    cache.append(1, messages(1))  # not cached: nothing to append to
+    assert cache.get(1) is None
+
+    cache.put(1, CachedHistory(7, summary=None, summary_message_id=None, messages=messages(1, 2)))
+    cache.append(1, messages(4, 3))
+    cache.append(1, messages(5))
+    assert [m.id for m in cache.get(1).messages] == [2, 3, 4, 5]
+
+    # A later put (from a slower read) does not replace the appended entry
+    cache.put(1, CachedHistory(7, None, None, messages(1)))
+    assert len(cache.get(1).messages) == 4
+
+    cache.fold(1, "Earlier: 1-3", through_message_id=3)
+    history = cache.get(1)
+    assert (history.summary, history.summary_message_id) == ("Earlier: 1-3", 3)
+    assert [m.id for m in history.messages] == [4, 5]
+
+    cache.invalidate(1)
+    assert cache.get(1) is None
+
+    small = HistoryCache(max_bytes=2000, max_messages=4, ttl_seconds=0)
+    for conversation_id in range(1, 6):
+        small.put(conversation_id, CachedHistory(7, None, None, messages(1, 2, 3, 4)))
+    stats = small.stats()
+    assert stats.evictions > 0
+    assert stats.bytes <= 2000
+    assert small.get(5) is not None
+    assert small.get(1) is None
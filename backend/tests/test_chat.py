@@ -17,7 +17,7 @@ def test_chat_new_conversation(client, test_user, mock_ai_agent):
     assert data["message"] == "I've processed your request successfully!"
     
     # Verify AI agent was called
-    mock_ai_agent.chat.assert_called_once()
+    mock_ai_agent.achat.assert_called_once()
 
 
 def test_chat_existing_conversation(client, test_user, mock_ai_agent):
@@ -31,7 +31,7 @@ def test_chat_existing_conversation(client, test_user, mock_ai_agent):
     conversation_id = first_response.json()["conversation_id"]
     
     # Reset mock to clear previous call
-    mock_ai_agent.chat.reset_mock()
+    mock_ai_agent.achat.reset_mock()
     
     # Continue the conversation
     response = client.post(
@@ -48,8 +48,8 @@ def test_chat_existing_conversation(client, test_user, mock_ai_agent):
     assert "message" in data
     
     # Verify AI agent was called with conversation history
-    mock_ai_agent.chat.assert_called_once()
-    call_args = mock_ai_agent.chat.call_args
+    mock_ai_agent.achat.assert_called_once()
+    call_args = mock_ai_agent.achat.call_args
     assert call_args.kwargs["user_message"] == "What tasks do I have?"
     assert len(call_args.kwargs["conversation_history"]) == 2  # Previous user + assistant message
 
@@ -144,16 +144,84 @@ def test_list_conversations(client, test_user):
     assert all("message_count" in conv for conv in data)
 
 
+def test_chat_turn_single_commit(client, test_user, db_session):
+    """A turn's writes share one commit, bumping updated_at and message_count."""
+    from sqlalchemy import event
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    first = client.post("/api/chat", json={"message": "First"}, headers=headers).json()
+    second = client.post("/api/chat", json={"message": "Second"}, headers=headers).json()
+    listed = client.get("/api/chat", headers=headers).json()
+    assert [conv["id"] for conv in listed] == [
+        second["conversation_id"], first["conversation_id"]
+    ]
+
+    commits = []
+    listener = lambda session: commits.append(session)
+    event.listen(db_session, "after_commit", listener)
+    try:
+        client.post(
+            "/api/chat",
+            json={"message": "Back to the first", "conversation_id": first["conversation_id"]},
+            headers=headers,
+        )
+    finally:
+        event.remove(db_session, "after_commit", listener)
+    assert len(commits) == 1
+
+    # Continuing the older conversation moves it to the top
+    listed = client.get("/api/chat", headers=headers).json()
+    assert [conv["id"] for conv in listed] == [
+        first["conversation_id"], second["conversation_id"]
+    ]
+    assert [conv["message_count"] for conv in listed] == [4, 2]
+    assert listed[0]["updated_at"] > listed[0]["created_at"]
+
+    messages = client.get(
+        f"/api/chat/{first['conversation_id']}", headers=headers
+    ).json()["messages"]
+    assert [(m["role"], m["content"]) for m in messages][2:] == [
+        ("user", "Back to the first"),
+        ("assistant", "I've processed your request successfully!"),
+    ]
+
+
 def test_list_conversations_unauthorized(client):
     """Test listing conversations without authentication."""
     response = client.get("/api/chat")
     assert response.status_code == 401
 
 
+def test_export_conversations(client, test_user):
+    """Test streaming export of all conversation messages."""
+    import csv
+    import io
+    import json
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    first = client.post("/api/chat", json={"message": "Hello"}, headers=headers).json()
+    second = client.post("/api/chat", json={"message": "Again"}, headers=headers).json()
+
+    response = client.get("/api/chat/export", headers=headers)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["conversation_id"], line["role"]) for line in lines] == [
+        (first["conversation_id"], "user"),
+        (first["conversation_id"], "assistant"),
+        (second["conversation_id"], "user"),
+        (second["conversation_id"], "assistant"),
+    ]
+    assert lines[0]["content"] == "Hello"
+
+    response = client.get("/api/chat/export", params={"format": "csv"}, headers=headers)
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["content"] for row in rows[::2]] == ["Hello", "Again"]
+
+
 def test_chat_ai_agent_error_handling(client, test_user, mock_ai_agent):
     """Test that AI agent errors are handled gracefully."""
     # Make the AI agent raise an exception
-    mock_ai_agent.chat.side_effect = Exception("API Error")
+    mock_ai_agent.achat.side_effect = Exception("API Error")
     
     response = client.post(
         "/api/chat",
@@ -163,3 +231,646 @@ def test_chat_ai_agent_error_handling(client, test_user, mock_ai_agent):
     assert response.status_code == 200
     data = response.json()
     assert "error" in data["message"].lower() or "sorry" in data["message"].lower()
+
+
+def test_chat_rate_limited_per_user(client, test_user):
+    """Each user has their own chat bucket."""
+    from app.config import settings
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    for _ in range(settings.rate_limit_chat_burst):
+        assert client.post("/api/chat", json={"message": "Hi"}, headers=headers).status_code == 200
+
+    limited = client.post("/api/chat", json={"message": "Hi"}, headers=headers)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+
+    client.post(
+        "/api/auth/register",
+        json={"username": "other", "email": "other@example.com", "password": "otherpass123"},
+    )
+    token = client.post(
+        "/api/auth/login", json={"username": "other", "password": "otherpass123"}
+    ).json()["access_token"]
+    other = client.post(
+        "/api/chat", json={"message": "Hi"}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert other.status_code == 200
+
+
+def _sse_events(body: str) -> list[tuple[str, dict]]:
+    """Parse a text/event-stream body into (event, data) pairs."""
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_chat_stream(client, test_user, mock_ai_agent, db_session):
+    """Streamed replies arrive as token events and the full reply is saved."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    response = client.post("/api/chat/stream", json={"message": "Hello"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    # A new conversation is created with the turn, so its ID comes last
+    events = _sse_events(response.text)
+    assert [event for event, _ in events] == ["token", "token", "conversation", "done"]
+    conversation_id = events[-2][1]["conversation_id"]
+    assert events[-1][1] == {
+        "message": "I've processed your request successfully!",
+        "conversation_id": conversation_id,
+    }
+    # The body outlives the handler, so it runs on a fork, not the request session
+    assert mock_ai_agent.achat_stream.call_args.kwargs["db"].session is not db_session
+
+    messages = client.get(f"/api/chat/{conversation_id}", headers=headers).json()["messages"]
+    assert [(m["role"], m["content"]) for m in messages] == [
+        ("user", "Hello"),
+        ("assistant", "I've processed your request successfully!"),
+    ]
+
+    # Continuing a conversation announces it first
+    events = _sse_events(
+        client.post(
+            "/api/chat/stream",
+            json={"message": "Again", "conversation_id": conversation_id},
+            headers=headers,
+        ).text
+    )
+    assert [event for event, _ in events] == ["conversation", "token", "token", "done"]
+    assert events[0][1] == {"conversation_id": conversation_id}
+
+
+def test_chat_stream_agent_error(client, test_user, mock_ai_agent):
+    """An agent failure is reported as an error event and saved as the reply."""
+    mock_ai_agent.achat_stream.side_effect = Exception("API Error")
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+
+    events = _sse_events(
+        client.post("/api/chat/stream", json={"message": "Hello"}, headers=headers).text
+    )
+    assert [event for event, _ in events] == ["error", "conversation", "done"]
+    assert "sorry" in events[-1][1]["message"].lower()
+
+    missing = client.post(
+        "/api/chat/stream", json={"message": "Hi", "conversation_id": 99999}, headers=headers
+    )
+    assert missing.status_code == 404
+
+
+def test_chat_stream_saves_final_round(client, test_user, mock_ai_agent):
+    """Text streamed before a tool call is shown but only the final round is saved."""
+    async def achat_stream(**kwargs):
+        yield {"type": "token", "content": "Let me check. "}
+        yield {"type": "tool_call", "id": "c1", "name": "list_tasks", "arguments": "{}"}
+        yield {"type": "tool_result", "id": "c1", "name": "list_tasks", "content": "[]"}
+        yield {"type": "token", "content": "You have no tasks."}
+
+    mock_ai_agent.achat_stream.side_effect = achat_stream
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+
+    events = _sse_events(
+        client.post("/api/chat/stream", json={"message": "Tasks?"}, headers=headers).text
+    )
+    assert [data["content"] for event, data in events if event == "token"] == [
+        "Let me check. ",
+        "You have no tasks.",
+    ]
+    assert events[-1][1]["message"] == "You have no tasks."
+    messages = client.get(
+        f"/api/chat/{events[-1][1]['conversation_id']}", headers=headers
+    ).json()["messages"]
+    assert messages[-1]["content"] == "You have no tasks."
+
+
+def test_chat_stream_disconnect_saves_turn(test_user, db_session, mock_ai_agent):
+    """A stream closed mid-reply still saves the turn with the text so far."""
+    import asyncio
+    from unittest.mock import patch
+
+    from fastapi import BackgroundTasks
+
+    from app.database import Database
+    from app.models.conversation import Conversation
+    from app.routers import chat
+    from app.schemas.conversation import ChatRequest
+    from app.services.auth import Principal
+
+    async def achat_stream(**kwargs):
+        yield {"type": "token", "content": "Working on"}
+        await asyncio.Event().wait()
+
+    mock_ai_agent.achat_stream.side_effect = achat_stream
+
+    async def run():
+        with patch("app.routers.chat.get_ai_agent", return_value=mock_ai_agent):
+            response = await chat.chat_stream(
+                ChatRequest(message="Add milk"),
+                Principal(id=test_user["user"]["id"]),
+                Database(db_session, db_session),
+                BackgroundTasks(),
+            )
+            assert (await anext(response.body_iterator)).startswith("event: token")
+            # The client goes away before the reply finishes
+            await response.body_iterator.aclose()
+            await asyncio.gather(*chat._interrupted_saves)
+
+    asyncio.run(run())
+    conversation = db_session.query(Conversation).one()
+    assert [(m.role, m.content) for m in conversation.messages] == [
+        ("user", "Add milk"),
+        ("assistant", "Working on"),
+    ]
+
+
+def _completion_chunk(content=None, tool_calls=None):
+    """A streamed completion chunk shaped like the Groq client's."""
+    from types import SimpleNamespace as NS
+
+    return NS(choices=[NS(delta=NS(content=content, tool_calls=tool_calls))])
+
+
+def _tool_call_fragment(index, id=None, name=None, arguments=None):
+    """A streamed tool-call delta shaped like the Groq client's."""
+    from types import SimpleNamespace as NS
+
+    return NS(index=index, id=id, function=NS(name=name, arguments=arguments))
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def test_agent_chat_stream_assembles_tool_calls():
+    """Tool-call fragments are joined, executed and followed by another round."""
+    import asyncio
+    from unittest.mock import AsyncMock, patch
+
+    from app.services.ai_agent import AIAgent
+
+    agent = AIAgent(api_key="test")
+    agent.async_client = AsyncMock()
+    agent.async_client.chat.completions.create.side_effect = [
+        _aiter([
+            _completion_chunk(tool_calls=[
+                _tool_call_fragment(0, id="call_1", name="task_stats", arguments='{"us')
+            ]),
+            _completion_chunk(tool_calls=[_tool_call_fragment(0, arguments='er_id": 7}')]),
+        ]),
+        _aiter([_completion_chunk("You have "), _completion_chunk("3 tasks.")]),
+    ]
+
+    async def collect():
+        return [event async for event in agent.achat_stream("How many?", [], user_id=7, db=None)]
+
+    with patch.object(agent, "_arun_tool", return_value="Total: 3") as run_tool:
+        events = asyncio.run(collect())
+
+    run_tool.assert_awaited_once_with("task_stats", '{"user_id": 7}', 7, None)
+    assert events == [
+        {"type": "tool_call", "id": "call_1", "name": "task_stats", "arguments": '{"user_id": 7}'},
+        {"type": "tool_result", "id": "call_1", "name": "task_stats", "content": "Total: 3"},
+        {"type": "token", "content": "You have "},
+        {"type": "token", "content": "3 tasks."},
+    ]
+    second_round = agent.async_client.chat.completions.create.call_args.kwargs
+    assert second_round["stream"] is True
+    assert second_round["messages"][-1] == {
+        "role": "tool", "tool_call_id": "call_1", "content": "Total: 3"
+    }
+
+
+def test_agent_achat_awaits_tools(client, test_user, db_session):
+    """achat awaits the async client and runs MCP tools on the Database handle."""
+    import asyncio
+    from types import SimpleNamespace as NS
+    from unittest.mock import AsyncMock
+
+    from app.database import Database
+    from app.services.ai_agent import AIAgent
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    client.post(f"/api/{test_user['user']['id']}/tasks", json={"title": "One"}, headers=headers)
+
+    def completion(content=None, tool_calls=None):
+        return NS(choices=[NS(message=NS(content=content, tool_calls=tool_calls))])
+
+    agent = AIAgent(api_key="test")
+    agent.async_client = AsyncMock()
+    agent.async_client.chat.completions.create.side_effect = [
+        completion(tool_calls=[
+            NS(id="call_1", function=NS(name="task_stats", arguments="{}"))
+        ]),
+        completion("You have 1 task."),
+    ]
+
+    reply = asyncio.run(
+        agent.achat("How many?", [], test_user["user"]["id"], Database(db_session, db_session))
+    )
+    assert reply == "You have 1 task."
+    tool_message = agent.async_client.chat.completions.create.call_args.kwargs["messages"][-1]
+    assert tool_message["role"] == "tool"
+    assert "Total: 1" in tool_message["content"]
+
+
+def test_agent_caps_tool_rounds(test_user, db_session, monkeypatch):
+    """A model that keeps calling tools is stopped after chat_max_tool_rounds."""
+    import asyncio
+    from types import SimpleNamespace as NS
+    from unittest.mock import AsyncMock
+
+    from app.config import settings
+    from app.database import Database
+    from app.services.ai_agent import TOOL_ROUNDS_EXCEEDED_REPLY, AIAgent
+
+    monkeypatch.setattr(settings, "chat_max_tool_rounds", 2)
+    call = NS(id="call_1", function=NS(name="task_stats", arguments="{}"))
+
+    agent = AIAgent(api_key="test")
+    agent.async_client = AsyncMock()
+    agent.async_client.chat.completions.create.return_value = NS(
+        choices=[NS(message=NS(content=None, tool_calls=[call]))]
+    )
+    db = Database(db_session, db_session)
+    reply = asyncio.run(agent.achat("Loop", [], test_user["user"]["id"], db))
+    assert reply == TOOL_ROUNDS_EXCEEDED_REPLY
+    # Two tool rounds, then the completion whose tool calls are refused
+    assert agent.async_client.chat.completions.create.await_count == 3
+
+    async def stream_events():
+        agent.async_client.chat.completions.create.reset_mock()
+        agent.async_client.chat.completions.create.side_effect = lambda **kwargs: _aiter([
+            _completion_chunk(tool_calls=[_tool_call_fragment(0, "call_1", "task_stats", "{}")])
+        ])
+        return [
+            event async for event in agent.achat_stream(
+                "Loop", [], test_user["user"]["id"], db
+            )
+        ]
+
+    events = asyncio.run(stream_events())
+    assert [event["type"] for event in events].count("tool_call") == 2
+    assert events[-1] == {"type": "token", "content": TOOL_ROUNDS_EXCEEDED_REPLY}
+
+
+def test_agent_runs_independent_tool_calls_concurrently(db_session):
+    """Distinct tasks run side by side; calls on one task keep their order."""
+    import asyncio
+    import json
+    import time
+    from types import SimpleNamespace as NS
+    from unittest.mock import AsyncMock
+
+    from app.database import Database
+    from app.services.ai_agent import AIAgent
+
+    started: list[tuple[str, int | None]] = []
+
+    async def slow_tool(name, arguments, db):
+        started.append((name, arguments.get("task_id")))
+        await asyncio.sleep(0.2)
+        return f"{name} {arguments.get('task_id')} done"
+
+    def completion(content=None, tool_calls=None):
+        return NS(choices=[NS(message=NS(content=content, tool_calls=tool_calls))])
+
+    def call(id, name, **arguments):
+        return NS(id=id, function=NS(name=name, arguments=json.dumps(arguments)))
+
+    agent = AIAgent(api_key="test")
+    agent._call_mcp_tool = slow_tool
+    agent.async_client = AsyncMock()
+    agent.async_client.chat.completions.create.side_effect = [
+        completion(tool_calls=[
+            call("a", "update_task", task_id=1, title="Renamed"),
+            call("b", "get_task", task_id=2),
+            # The same task, with its id spelled as a string
+            call("c", "mark_task_complete", task_id="1"),
+            call("d", "list_tasks"),
+        ]),
+        completion("All done."),
+    ]
+
+    begin = time.perf_counter()
+    reply = asyncio.run(agent.achat("Go", [], 1, Database(db_session, db_session)))
+    elapsed = time.perf_counter() - begin
+
+    assert reply == "All done."
+    # Three chains: task 1 (two calls in order), task 2, and the list
+    assert 0.4 <= elapsed < 0.6
+    assert started.index(("update_task", 1)) < started.index(("mark_task_complete", "1"))
+    tool_messages = agent.async_client.chat.completions.create.call_args.kwargs["messages"][-4:]
+    assert [(m["tool_call_id"], m["content"]) for m in tool_messages] == [
+        ("a", "update_task 1 done"),
+        ("b", "get_task 2 done"),
+        ("c", "mark_task_complete 1 done"),
+        ("d", "list_tasks None done"),
+    ]
+
+
+def test_chat_context_window_and_summary(client, test_user, mock_ai_agent):
+    """Older turns are folded into a stored summary; recent ones stay verbatim."""
+    from unittest.mock import patch
+
+    from app.config import settings
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    with patch.multiple(settings, chat_history_turns=2, chat_summary_batch_turns=1):
+        conversation_id = client.post(
+            "/api/chat", json={"message": "Turn 1"}, headers=headers
+        ).json()["conversation_id"]
+        for turn in (2, 3):
+            client.post(
+                "/api/chat",
+                json={"message": f"Turn {turn}", "conversation_id": conversation_id},
+                headers=headers,
+            )
+
+        # After turn 3, turn 1 left the two-turn window and was folded
+        mock_ai_agent.asummarize.assert_awaited_once()
+        previous, folded = mock_ai_agent.asummarize.await_args.args
+        assert previous is None
+        assert [m["content"] for m in folded] == [
+            "Turn 1", "I've processed your request successfully!"
+        ]
+
+        client.post(
+            "/api/chat",
+            json={"message": "Turn 4", "conversation_id": conversation_id},
+            headers=headers,
+        )
+
+    history = mock_ai_agent.achat.call_args.kwargs["conversation_history"]
+    assert history[0] == {
+        "role": "system",
+        "content": "Summary of the earlier conversation:\nSummary of earlier messages",
+    }
+    assert [m["content"] for m in history[1:] if m["role"] == "user"] == ["Turn 2", "Turn 3"]
+
+    # The full transcript is still stored and served
+    messages = client.get(f"/api/chat/{conversation_id}", headers=headers).json()["messages"]
+    assert len(messages) == 8
+
+
+def test_chat_history_cache(client, test_user, mock_ai_agent, monkeypatch):
+    """Cached turns skip the history queries and see the same context."""
+    from unittest.mock import Mock, patch
+
+    from app.config import settings
+    from app.routers import chat as chat_router
+    from app.services import history_cache
+    from app.services.history_cache import HistoryCache
+
+    cache = HistoryCache(max_bytes=1024 * 1024, max_messages=6, ttl_seconds=0)
+    monkeypatch.setattr(history_cache, "_history_cache", cache)
+    load_context = Mock(wraps=chat_router.load_context)
+    monkeypatch.setattr(chat_router, "load_context", load_context)
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    with patch.multiple(settings, chat_history_turns=2, chat_summary_batch_turns=1):
+        conversation_id = client.post(
+            "/api/chat", json={"message": "Turn 1"}, headers=headers
+        ).json()["conversation_id"]
+        for turn in (2, 3, 4):
+            client.post(
+                "/api/chat",
+                json={"message": f"Turn {turn}", "conversation_id": conversation_id},
+                headers=headers,
+            )
+
+    # The new conversation was cached on save, then appended to and folded
+    load_context.assert_not_called()
+    assert cache.stats().hits == 3
+    history = mock_ai_agent.achat.call_args.kwargs["conversation_history"]
+    assert history[0]["content"].endswith("Summary of earlier messages")
+    assert [m["content"] for m in history[1:] if m["role"] == "user"] == ["Turn 2", "Turn 3"]
+
+    # Another user's request for the conversation falls through to a 404
+    other_user = {"username": "other", "email": "other@example.com", "password": "password123"}
+    client.post("/api/auth/register", json=other_user)
+    other = client.post(
+        "/api/auth/login",
+        json={"username": "other", "password": "password123"},
+    ).json()["access_token"]
+    response = client.post(
+        "/api/chat",
+        json={"message": "Hi", "conversation_id": conversation_id},
+        headers={"Authorization": f"Bearer {other}"},
+    )
+    assert response.status_code == 404
+
+    # Deleting the conversation drops its entry
+    client.delete(f"/api/chat/{conversation_id}", headers=headers)
+    assert cache.get(conversation_id) is None
+
+
+def test_context_history_budget():
+    """The oldest verbatim messages are dropped to fit the token budget."""
+    from app.services.conversation_context import _fit_budget
+    from app.services.history_cache import CachedMessage
+
+    messages = tuple(CachedMessage.create(i, "user", "x" * 400) for i in range(5))
+    assert len(_fit_budget(None, messages, max_tokens=250)) == 2
+    assert len(_fit_budget("s" * 400, messages, max_tokens=250)) == 1
+    # The newest message is kept even if it alone exceeds the budget
+    assert len(_fit_budget(None, messages, max_tokens=10)) == 1
+
+
+def test_token_estimates_and_tool_result_compaction():
+    """Estimates grow with the text; oversized tool results keep their head."""
+    from app.services.token_budget import (
+        compact_tool_result,
+        estimate_prompt_tokens,
+        estimate_tokens,
+    )
+
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Add a task") == 3
+    assert estimate_tokens("internationalization") == 5
+    assert estimate_tokens("buy milk, eggs!") > estimate_tokens("buy milk")
+    tools = [{"type": "function", "function": {"name": "add_task", "parameters": {}}}]
+    messages = [{"role": "user", "content": "hi"}]
+    assert estimate_prompt_tokens(messages, tools) > estimate_prompt_tokens(messages)
+
+    short = "1. Buy milk\n2. Walk dog"
+    assert compact_tool_result(short, max_tokens=100) is short
+    listing = "\n".join(f"{i}. Task number {i}" for i in range(200))
+    compacted = compact_tool_result(listing, max_tokens=50)
+    assert compacted.startswith("0. Task number 0\n")
+    assert estimate_tokens(compacted) < estimate_tokens(listing)
+    assert "more lines not shown" in compacted
+
+
+def test_fit_prompt_drops_oldest_history():
+    """History is trimmed oldest first; the system prompt and new turn stay."""
+    from app.services.token_budget import PromptBudgetExceeded, fit_prompt
+
+    system = {"role": "system", "content": "You are a task assistant."}
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " * 20}
+        for i in range(6)
+    ]
+    current = {"role": "user", "content": "What is left?"}
+    messages = [system, *history, current]
+
+    estimate = fit_prompt(messages, [], max_tokens=120)
+    assert estimate <= 120
+    assert messages[0] is system and messages[-1] is current
+    assert messages[1:-1] == history[len(history) - len(messages) + 2:]
+
+    with pytest.raises(PromptBudgetExceeded):
+        fit_prompt([system, {"role": "user", "content": "x " * 500}], [], max_tokens=50)
+
+
+def test_agent_records_turn_usage(client, test_user, db_session):
+    """A turn's provider usage is summed over its completions and saved."""
+    import asyncio
+    from types import SimpleNamespace as NS
+    from unittest.mock import AsyncMock
+
+    from app.database import Database
+    from app.services.ai_agent import AIAgent
+    from app.services.token_budget import TurnUsage, usage_totals
+
+    def completion(content=None, tool_calls=None, prompt=0, output=0):
+        return NS(
+            choices=[NS(message=NS(content=content, tool_calls=tool_calls))],
+            usage=NS(prompt_tokens=prompt, completion_tokens=output),
+        )
+
+    agent = AIAgent(api_key="test")
+    agent.async_client = AsyncMock()
+    agent.async_client.chat.completions.create.side_effect = [
+        completion(
+            tool_calls=[NS(id="call_1", function=NS(name="task_stats", arguments="{}"))],
+            prompt=900,
+            output=20,
+        ),
+        completion("Nothing yet.", prompt=950, output=5),
+    ]
+
+    turns_before = usage_totals.as_dict()["turns"]
+    usage = TurnUsage()
+    asyncio.run(
+        agent.achat(
+            "How many?", [], test_user["user"]["id"], Database(db_session, db_session), usage
+        )
+    )
+    assert usage.completions == 2
+    assert (usage.prompt_tokens, usage.completion_tokens) == (1850, 25)
+    assert usage.estimated_prompt_tokens > 0
+    assert usage_totals.as_dict()["turns"] == turns_before + 1
+
+    # The router saves the usage on the assistant reply
+    from datetime import datetime
+
+    from app.routers.chat import _get_messages, _save_turn
+
+    conversation_id = _save_turn(
+        db_session, test_user["user"]["id"], None, "How many?", datetime.utcnow(),
+        "Nothing yet.", usage,
+    )
+    user_message, reply = _get_messages(db_session, conversation_id)
+    assert user_message.prompt_tokens is None
+    assert (reply.prompt_tokens, reply.completion_tokens) == (1850, 25)
+
+
+def test_agent_stream_records_turn_usage(test_user, db_session):
+    """Streamed turns add the usage Groq reports on the last chunk to the totals."""
+    import asyncio
+    from types import SimpleNamespace as NS
+    from unittest.mock import AsyncMock
+
+    from app.database import Database
+    from app.services.ai_agent import AIAgent
+    from app.services.token_budget import TurnUsage, usage_totals
+
+    last_chunk = NS(
+        choices=[],
+        x_groq=NS(usage=NS(prompt_tokens=700, completion_tokens=12)),
+    )
+    agent = AIAgent(api_key="test")
+    agent.async_client = AsyncMock()
+    agent.async_client.chat.completions.create.return_value = _aiter(
+        [_completion_chunk("Done."), last_chunk]
+    )
+
+    before = usage_totals.as_dict()
+    usage = TurnUsage()
+
+    async def run():
+        return [
+            event async for event in agent.achat_stream(
+                "Hi", [], test_user["user"]["id"], Database(db_session, db_session), usage
+            )
+        ]
+
+    asyncio.run(run())
+    assert (usage.completions, usage.prompt_tokens, usage.completion_tokens) == (1, 700, 12)
+    after = usage_totals.as_dict()
+    assert after["turns"] == before["turns"] + 1
+    assert after["prompt_tokens"] == before["prompt_tokens"] + 700
+    assert after["completion_tokens"] == before["completion_tokens"] + 12
+
+
+def test_agent_summary_is_budgeted_and_accounted(monkeypatch):
+    """Summary completions go through the prompt budget and the usage totals."""
+    import asyncio
+    from types import SimpleNamespace as NS
+    from unittest.mock import AsyncMock
+
+    from app.config import settings
+    from app.services.ai_agent import AIAgent
+    from app.services.token_budget import PromptBudgetExceeded, usage_totals
+
+    agent = AIAgent(api_key="test")
+    agent.async_client = AsyncMock()
+    agent.async_client.chat.completions.create.return_value = NS(
+        choices=[NS(message=NS(content="- likes lists"))],
+        usage=NS(prompt_tokens=300, completion_tokens=8),
+    )
+    messages = [{"role": "user", "content": "I like lists"}]
+
+    before = usage_totals.as_dict()
+    assert asyncio.run(agent.asummarize(None, messages)) == "- likes lists"
+    after = usage_totals.as_dict()
+    assert after["completions"] == before["completions"] + 1
+    assert after["estimated_prompt_tokens"] > before["estimated_prompt_tokens"]
+    assert after["prompt_tokens"] == before["prompt_tokens"] + 300
+    assert after["completion_tokens"] == before["completion_tokens"] + 8
+
+    monkeypatch.setattr(settings, "chat_prompt_max_tokens", 10)
+    with pytest.raises(PromptBudgetExceeded):
+        asyncio.run(agent.asummarize("- likes lists", messages * 20))
+    agent.async_client.chat.completions.create.assert_awaited_once()
+    assert usage_totals.as_dict()["budget_rejections"] == after["budget_rejections"] + 1
+
+
+def test_chat_over_prompt_budget(client, test_user, monkeypatch):
+    """A turn that cannot fit the prompt budget is refused without a completion."""
+    from unittest.mock import AsyncMock, patch
+
+    from app.config import settings
+    from app.services.ai_agent import AIAgent
+    from app.services.token_budget import usage_totals
+
+    monkeypatch.setattr(settings, "chat_prompt_max_tokens", 100)
+    agent = AIAgent(api_key="test")
+    agent.async_client = AsyncMock()
+    rejections = usage_totals.as_dict()["budget_rejections"]
+
+    with patch("app.routers.chat.get_ai_agent", return_value=agent):
+        response = client.post(
+            "/api/chat",
+            json={"message": "Add a task"},
+            headers={"Authorization": f"Bearer {test_user['token']}"},
+        )
+    assert response.status_code == 200
+    assert "too large" in response.json()["message"]
+    agent.async_client.chat.completions.create.assert_not_called()
+    assert usage_totals.as_dict()["budget_rejections"] == rejections + 1
@@ -0,0 +1,187 @@
+"""Query-plan regression tests for the task indexes."""
+
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, text
+
+from app.mcp_server import task_mcp_server
+
+
+@contextmanager
+def capture_task_selects(db_session):
+    """Record every SELECT against the tasks table issued inside the block."""
+    engine = db_session.get_bind()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM tasks" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_plan(db_session, statement, parameters) -> str:
+    """Return SQLite's EXPLAIN QUERY PLAN output as a single string."""
+    connection = db_session.connection().connection
+    rows = connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.fixture
+def seeded_tasks(client, test_user):
+    """Create a handful of tasks so every index has rows to cover."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    for i in range(3):
+        client.post(
+            url,
+            json={"title": f"Task {i}", "due_date": f"2026-03-0{i + 1}T09:00:00"},
+            headers=headers,
+        )
+    return {"url": url, "headers": headers, "user_id": test_user["user"]["id"]}
+
+
+def test_indexes_created(db_session):
+    """The composite and partial indexes exist on the tasks table."""
+    names = {
+        row[0]
+        for row in db_session.execute(
+            text("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='tasks'")
+        )
+    }
+    assert {
+        "ix_tasks_user_id_created_at_id",
+        "ix_tasks_user_id_completed_created_at",
+        "ix_tasks_user_id_due_date",
+        "ix_tasks_open_due_date",
+        "ix_tasks_user_id_updated_at_id",
+    } <= names
+
+
+@pytest.mark.parametrize(
+    "params, expected_index",
+    [
+        ({}, "ix_tasks_user_id_created_at_id"),
+        ({"order": "desc"}, "ix_tasks_user_id_created_at_id"),
+        ({"completed": False}, "ix_tasks_user_id_completed_created_at"),
+        (
+            {"due_after": "2026-03-01T00:00:00", "due_before": "2026-03-31T00:00:00"},
+            "ix_tasks_user_id_due_date",
+        ),
+        (
+            {"completed": False, "due_before": "2026-03-02T00:00:00"},
+            "ix_tasks_open_due_date",
+        ),
+    ],
+)
+def test_list_endpoint_uses_index(client, db_session, seeded_tasks, params, expected_index):
+    """GET /api/{user_id}/tasks is served from the expected index."""
+    with capture_task_selects(db_session) as statements:
+        response = client.get(seeded_tasks["url"], params=params, headers=seeded_tasks["headers"])
+    assert response.status_code == 200
+    assert statements
+
+    plan = query_plan(db_session, *statements[-1])
+    assert expected_index in plan, plan
+    assert "SCAN tasks" not in plan, plan
+
+
+@pytest.mark.parametrize("dialect_name", ["postgresql", "sqlite"])
+def test_open_due_predicate_matches_query(dialect_name):
+    """The partial index predicate renders exactly as the listing query's filter."""
+    from datetime import datetime
+
+    from sqlalchemy import select
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    from app.models.task import Task
+    from app.services.task_repository import _filter_tasks
+
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}[dialect_name].dialect()
+    index = next(i for i in Task.__table__.indexes if i.name == "ix_tasks_open_due_date")
+    query = _filter_tasks(select(Task), 1, completed=False, due_before=datetime(2026, 3, 2))
+    sql = str(query.compile(dialect=dialect))
+    for term in index.dialect_options[dialect_name]["where"].clauses:
+        assert str(term.compile(dialect=dialect)) in sql
+
+
+def test_get_task_uses_primary_key(client, db_session, seeded_tasks):
+    """GET /api/{user_id}/tasks/{task_id} is a primary-key lookup."""
+    task_id = client.get(seeded_tasks["url"], headers=seeded_tasks["headers"]).json()[0]["id"]
+    with capture_task_selects(db_session) as statements:
+        client.get(f"{seeded_tasks['url']}/{task_id}", headers=seeded_tasks["headers"])
+    assert statements
+
+    plan = query_plan(db_session, *statements[-1])
+    assert "USING INTEGER PRIMARY KEY" in plan, plan
+
+
+@pytest.mark.parametrize(
+    "arguments, expected_index",
+    [
+        ({}, "ix_tasks_user_id_created_at_id"),
+        ({"completed": False}, "ix_tasks_user_id_completed_created_at"),
+    ],
+)
+def test_mcp_list_tasks_uses_index(db_session, seeded_tasks, arguments, expected_index):
+    """The MCP list_tasks tool avoids a table scan and a sort."""
+    with capture_task_selects(db_session) as statements:
+        asyncio.run(
+            task_mcp_server._list_tasks(
+                db_session, {"user_id": seeded_tasks["user_id"], **arguments}
+            )
+        )
+    assert statements
+
+    plan = query_plan(db_session, *statements[-1])
+    assert expected_index in plan, plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+def test_search_uses_fts_index(client, db_session, seeded_tasks):
+    """GET /api/{user_id}/tasks/search is driven by the FTS5 index."""
+    with capture_task_selects(db_session) as statements:
+        response = client.get(
+            f"{seeded_tasks['url']}/search", params={"q": "task"}, headers=seeded_tasks["headers"]
+        )
+    assert response.status_code == 200
+    assert statements
+
+    plan = query_plan(db_session, *statements[-1])
+    assert "tasks_fts VIRTUAL TABLE INDEX" in plan, plan
+    assert "SEARCH tasks USING INTEGER PRIMARY KEY" in plan, plan
+
+
+def test_changes_use_updated_at_index(client, db_session, seeded_tasks):
+    """GET /api/{user_id}/tasks/changes reads tasks by (user_id, updated_at, id)."""
+    first = client.get(f"{seeded_tasks['url']}/changes", headers=seeded_tasks["headers"])
+    with capture_task_selects(db_session) as statements:
+        response = client.get(
+            f"{seeded_tasks['url']}/changes",
+            params={"since": first.json()["cursor"]},
+            headers=seeded_tasks["headers"],
+        )
+    assert response.status_code == 200
+    assert statements
+
+    plan = query_plan(db_session, *statements[-1])
+    assert "ix_tasks_user_id_updated_at_id" in plan, plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+def test_stats_is_one_indexed_aggregate(client, db_session, seeded_tasks):
+    """GET /api/{user_id}/tasks/stats is a single aggregate over the user's index range."""
+    with capture_task_selects(db_session) as statements:
+        response = client.get(f"{seeded_tasks['url']}/stats", headers=seeded_tasks["headers"])
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+    plan = query_plan(db_session, *statements[0])
+    assert "SEARCH tasks USING" in plan, plan
+    assert "SCAN tasks" not in plan, plan
@@ -0,0 +1,183 @@
+"""Tests for the shared task repository."""
+
+import asyncio
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.mcp_server import task_mcp_server
+from app.models.user import User
+from app.services import task_repository
+
+
+@pytest.fixture
+def owner(db_session):
+    """Create a user that owns the tasks under test."""
+    user = User(username="owner", email="owner@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    return user.id
+
+
+@pytest.fixture
+def statements(db_session):
+    """Record the SQL statements issued against the tasks table."""
+    engine = db_session.get_bind()
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if re.search(r"\btasks\b", statement):
+            recorded.append(statement.lstrip().split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_update_is_single_statement(db_session, owner, statements):
+    """An update issues one UPDATE ... RETURNING and no follow-up SELECT."""
+    task = task_repository.create_task(db_session, owner, {"title": "Draft"})
+    statements.clear()
+
+    updated = task_repository.update_task(db_session, owner, task.id, {"title": "Final"})
+
+    assert updated.title == "Final"
+    assert statements == ["UPDATE"]
+
+
+def test_delete_is_single_statement(db_session, owner, statements):
+    """A delete issues one DELETE ... RETURNING and returns the removed row."""
+    task = task_repository.create_task(db_session, owner, {"title": "Gone"})
+    statements.clear()
+
+    deleted = task_repository.delete_task(db_session, owner, task.id)
+
+    assert deleted.title == "Gone"
+    assert statements == ["DELETE"]
+    assert task_repository.get_task(db_session, owner, task.id) is None
+
+
+def test_mutations_are_scoped_to_owner(db_session, owner):
+    """Another user's id never matches the task."""
+    task = task_repository.create_task(db_session, owner, {"title": "Mine"})
+
+    assert task_repository.update_task(db_session, owner + 1, task.id, {"title": "x"}) is None
+    assert task_repository.delete_task(db_session, owner + 1, task.id) is None
+    assert task_repository.get_task(db_session, owner, task.id).title == "Mine"
+
+
+def test_fallback_without_returning(db_session, owner, monkeypatch):
+    """Dialects without RETURNING fall back to a follow-up SELECT."""
+    dialect = db_session.get_bind().dialect
+    monkeypatch.setattr(dialect, "update_returning", False)
+    monkeypatch.setattr(dialect, "delete_returning", False)
+    task = task_repository.create_task(db_session, owner, {"title": "Old"})
+
+    updated = task_repository.set_task_completed(db_session, owner, task.id, True)
+    assert updated.completed is True
+    assert task_repository.update_task(db_session, owner, 99999, {"title": "x"}) is None
+
+    deleted = task_repository.delete_task(db_session, owner, task.id)
+    assert deleted.title == "Old"
+    assert task_repository.delete_task(db_session, owner, task.id) is None
+
+
+def test_mcp_tools_use_repository(db_session, owner):
+    """The MCP mutation tools round-trip through the repository."""
+    result = asyncio.run(
+        task_mcp_server._create_task(db_session, {"user_id": owner, "title": "Chat task"})
+    )
+    task_id = int(result[0].text.split("ID: ")[1].split(",")[0])
+
+    result = asyncio.run(
+        task_mcp_server._mark_task_complete(db_session, {"user_id": owner, "task_id": task_id})
+    )
+    assert "marked as complete" in result[0].text
+    assert task_repository.get_task(db_session, owner, task_id).completed is True
+
+    result = asyncio.run(
+        task_mcp_server._update_task(
+            db_session, {"user_id": owner, "task_id": task_id, "priority": "high"}
+        )
+    )
+    assert "Priority: HIGH" in result[0].text
+
+    result = asyncio.run(
+        task_mcp_server._delete_task(db_session, {"user_id": owner, "task_id": task_id})
+    )
+    assert "'Chat task' deleted" in result[0].text
+
+    result = asyncio.run(
+        task_mcp_server._delete_task(db_session, {"user_id": owner, "task_id": task_id})
+    )
+    assert result[0].text == "Task not found."
+
+
+def test_writes_bump_task_version(db_session, owner):
+    """Only writes that match a row bump the user's task version."""
+    assert task_repository.get_task_version(db_session, owner) == 0
+    task = task_repository.create_task(db_session, owner, {"title": "One"})
+    task_repository.update_task(db_session, owner, task.id, {"title": "Two"})
+    task_repository.update_task(db_session, owner, 99999, {"title": "Missing"})
+    assert task_repository.get_task_version(db_session, owner) == 2
+
+    task_repository.delete_task(db_session, owner, task.id)
+    assert task_repository.get_task_version(db_session, owner) == 3
+
+
+def test_mcp_search_tasks(db_session, owner):
+    """The MCP search_tasks tool returns matching tasks only."""
+    task_repository.create_task(db_session, owner, {"title": "Renew passport"})
+    task_repository.create_task(db_session, owner, {"title": "Water plants"})
+
+    result = asyncio.run(
+        task_mcp_server._search_tasks(db_session, {"user_id": owner, "query": "passport"})
+    )
+    assert "Renew passport" in result[0].text
+    assert "Water plants" not in result[0].text
+
+    result = asyncio.run(
+        task_mcp_server._search_tasks(db_session, {"user_id": owner, "query": "taxes"})
+    )
+    assert result[0].text == "No matching tasks found."
+
+
+def test_conditional_update(db_session, owner, statements):
+    """A versioned update is one UPDATE; a stale version raises a conflict."""
+    task = task_repository.create_task(db_session, owner, {"title": "Draft"})
+    assert task.version == 1
+    statements.clear()
+
+    updated = task_repository.update_task(
+        db_session, owner, task.id, {"title": "Final"}, expected_versions=[1]
+    )
+    assert (updated.title, updated.version) == ("Final", 2)
+    assert statements == ["UPDATE"]
+
+    with pytest.raises(task_repository.TaskVersionConflict) as conflict:
+        task_repository.update_task(
+            db_session, owner, task.id, {"title": "Stale"}, expected_versions=[1]
+        )
+    assert conflict.value.task.version == 2
+    assert task_repository.get_task(db_session, owner, task.id).title == "Final"
+
+    # A missing task is still "not found", not a conflict
+    assert task_repository.update_task(
+        db_session, owner, task.id + 100, {"title": "x"}, expected_versions=[1]
+    ) is None
+
+
+def test_mcp_update_with_stale_version(db_session, owner):
+    """The MCP update tool reports a conflict instead of overwriting."""
+    task = task_repository.create_task(db_session, owner, {"title": "Draft"})
+    task_repository.update_task(db_session, owner, task.id, {"title": "Edited in UI"})
+
+    result = asyncio.run(
+        task_mcp_server._update_task(
+            db_session,
+            {"user_id": owner, "task_id": task.id, "title": "From chat", "version": 1},
+        )
+    )
+    assert "changed by someone else (now version 2)" in result[0].text
+    assert task_repository.get_task(db_session, owner, task.id).title == "Edited in UI"
@@ -189,3 +189,560 @@ def test_update_task_priority_and_category(client, test_user):
     data = update_response.json()
     assert data["priority"] == "URGENT"
     assert data["category"] == "WORK"
+
+
+def test_get_all_tasks_keyset_pagination(client, test_user):
+    """Test paging through tasks with the X-Next-Cursor header."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    for i in range(5):
+        client.post(url, json={"title": f"Task {i}"}, headers=headers)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(task["title"] for task in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"Task {i}" for i in range(5)]
+
+    # Descending order walks the same keyset backwards
+    response = client.get(url, params={"order": "desc", "limit": 3}, headers=headers)
+    assert [task["title"] for task in response.json()] == ["Task 4", "Task 3", "Task 2"]
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_get_all_tasks_filters(client, test_user):
+    """Test server-side filtering of the task list."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    client.post(
+        url,
+        json={"title": "Work", "priority": "HIGH", "category": "WORK",
+              "due_date": "2026-03-01T09:00:00"},
+        headers=headers,
+    )
+    done = client.post(url, json={"title": "Done", "category": "PERSONAL"}, headers=headers)
+    client.put(f"{url}/{done.json()['id']}", json={"completed": True}, headers=headers)
+
+    response = client.get(url, params={"completed": True}, headers=headers)
+    assert [task["title"] for task in response.json()] == ["Done"]
+
+    response = client.get(url, params={"priority": "HIGH", "category": "WORK"}, headers=headers)
+    assert [task["title"] for task in response.json()] == ["Work"]
+
+    response = client.get(
+        url,
+        params={"due_after": "2026-02-28T00:00:00", "due_before": "2026-03-02T00:00:00"},
+        headers=headers,
+    )
+    assert [task["title"] for task in response.json()] == ["Work"]
+
+    # Overdue open tasks: a completed task with an earlier due date is excluded
+    late = client.post(
+        url, json={"title": "Late", "due_date": "2026-02-01T09:00:00"}, headers=headers
+    )
+    client.put(f"{url}/{late.json()['id']}", json={"completed": True}, headers=headers)
+    response = client.get(
+        url, params={"completed": False, "due_before": "2026-03-02T00:00:00"}, headers=headers
+    )
+    assert [task["title"] for task in response.json()] == ["Work"]
+
+
+def test_get_all_tasks_invalid_cursor(client, test_user):
+    """Test that a malformed cursor is rejected."""
+    response = client.get(
+        f"/api/{test_user['user']['id']}/tasks",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {test_user['token']}"},
+    )
+    assert response.status_code == 400
+
+
+def test_fast_serialization_matches_task_response(client, test_user, monkeypatch):
+    """Test that the orjson row path returns the same bytes as TaskResponse."""
+    from app.config import settings
+    from app.services.cache import get_task_cache
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    client.post(
+        url,
+        json={"title": 'Quote " slash \\ café 😀', "description": "line\nbreak",
+              "priority": "HIGH", "category": "WORK", "due_date": "2026-03-01T09:30:15.250000"},
+        headers=headers,
+    )
+    for i in range(3):
+        client.post(url, json={"title": f"Task {i}"}, headers=headers)
+
+    params = {"limit": 3, "order": "desc"}
+    expected = client.get(url, params=params, headers=headers)
+
+    get_task_cache().clear()
+    monkeypatch.setattr(settings, "task_fast_serialization", True)
+    fast = client.get(url, params=params, headers=headers)
+
+    assert fast.status_code == 200
+    assert fast.content == expected.content
+    assert fast.headers["X-Next-Cursor"] == expected.headers["X-Next-Cursor"]
+
+    # The cursor from a row-based page continues like an ORM-based one
+    rest = client.get(
+        url, params={**params, "cursor": fast.headers["X-Next-Cursor"]}, headers=headers
+    )
+    assert [task["title"] for task in rest.json()] == ['Quote " slash \\ café 😀']
+
+
+def test_export_tasks_ndjson_and_csv(client, test_user, monkeypatch):
+    """Test streaming task export in both formats across several batches."""
+    import csv
+    import io
+    import json
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "export_batch_size", 2)
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    for i in range(5):
+        client.post(url, json={"title": f"Task, {i}", "priority": "HIGH"}, headers=headers)
+    tasks = client.get(url, headers=headers).json()
+
+    response = client.get(f"{url}/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="tasks.ndjson"' in response.headers["content-disposition"]
+    assert [json.loads(line) for line in response.text.splitlines()] == tasks
+
+    response = client.get(f"{url}/export", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == [f"Task, {i}" for i in range(5)]
+    assert rows[0]["priority"] == "HIGH"
+    assert rows[0]["completed"] == "false"
+    assert rows[0]["created_at"] == tasks[0]["created_at"]
+
+
+def test_export_tasks_empty_and_forbidden(client, test_user):
+    """Test that an empty CSV export still has a header and access is checked."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    user_id = test_user["user"]["id"]
+
+    response = client.get(f"/api/{user_id}/tasks/export", params={"format": "csv"}, headers=headers)
+    assert response.text.splitlines() == [
+        "id,title,description,completed,priority,category,due_date,user_id,created_at,updated_at,version"
+    ]
+
+    assert client.get(f"/api/{user_id}/tasks/export", params={"format": "xml"}, headers=headers).status_code == 422
+    assert client.get(f"/api/{user_id + 1}/tasks/export", headers=headers).status_code == 403
+
+
+def test_import_tasks_ndjson_reports_row_errors(client, test_user, monkeypatch):
+    """Test NDJSON import loads valid rows in chunks and reports bad ones."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "task_import_chunk_size", 2)
+    monkeypatch.setattr(settings, "task_import_max_errors", 2)
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    # Prime the list cache so the import has to invalidate it
+    assert client.get(url, headers=headers).json() == []
+
+    body = "\n".join([
+        '{"title": "One", "priority": "HIGH"}',
+        '{"title": ""}',
+        '{"title": "Two", "due_date": "2026-03-01T09:00:00"}',
+        "",
+        "not json",
+        '["Three"]',
+        '{"title": "Three", "category": "WORK"}',
+    ])
+    response = client.post(f"{url}/import", content=body.encode(), headers=headers)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 3
+    assert result["failed"] == 3
+    # Only max_errors errors are listed, numbered by non-blank line
+    assert [error["row"] for error in result["errors"]] == [2, 4]
+    assert result["errors"][0]["error"].startswith("title:")
+
+    tasks = client.get(url, headers=headers).json()
+    assert [(t["title"], t["priority"], t["category"]) for t in tasks] == [
+        ("One", "HIGH", "OTHER"),
+        ("Two", "MEDIUM", "OTHER"),
+        ("Three", "MEDIUM", "WORK"),
+    ]
+    assert tasks[1]["due_date"] == "2026-03-01T09:00:00"
+
+
+def test_import_tasks_csv(client, test_user):
+    """Test CSV import with a header, quoted newlines and empty fields."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    body = (
+        "\ufefftitle,description,priority\r\n"
+        'Buy milk,"Two lines,\r\nwith ""quotes""",LOW\r\n'
+        "Call mom,,\r\n"
+        "Bad,row,URGENT,extra\r\n"
+        "Oops,,NOT_A_PRIORITY\r\n"
+    )
+    response = client.post(
+        f"{url}/import", params={"format": "csv"}, content=body.encode(), headers=headers
+    )
+    result = response.json()
+    assert result["imported"] == 2
+    assert [error["row"] for error in result["errors"]] == [3, 4]
+    assert "Expected 3 fields" in result["errors"][0]["error"]
+
+    tasks = client.get(url, headers=headers).json()
+    assert tasks[0]["description"] == 'Two lines,\nwith "quotes"'
+    assert tasks[0]["priority"] == "LOW"
+    assert tasks[1]["description"] is None
+
+    other = client.post(f"/api/{test_user['user']['id'] + 1}/tasks/import", content=b"", headers=headers)
+    assert other.status_code == 403
+
+
+def test_import_lines_split_across_chunks():
+    """Test line splitting when lines, CRLFs and UTF-8 sequences straddle chunks."""
+    import asyncio
+
+    from app.services.task_import import _lines
+
+    body = "\ufeff" + "é" * 5000 + "\r\nshort\r\n\r\nlast 😀"
+
+    async def collect(size: int) -> list[str]:
+        data = body.encode()
+
+        async def chunks():
+            for start in range(0, len(data), size):
+                yield data[start:start + size]
+
+        return [line async for line in _lines(chunks())]
+
+    expected = ["é" * 5000, "short", "", "last 😀"]
+    for size in (1, 3, 7, 4096):
+        assert asyncio.run(collect(size)) == expected
+
+
+def test_task_stats(client, test_user, db_session):
+    """Test aggregated task counts from the endpoint and the MCP tool."""
+    import asyncio
+    from datetime import datetime, timedelta
+
+    from app.mcp_server import task_mcp_server
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    user_id = test_user["user"]["id"]
+    url = f"/api/{user_id}/tasks"
+    now = datetime.utcnow()
+    # Later today (UTC) and not yet overdue
+    today = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+    yesterday = (now - timedelta(days=1)).isoformat()
+    client.post(url, json={"title": "Late", "priority": "HIGH", "due_date": yesterday}, headers=headers)
+    client.post(url, json={"title": "Today", "category": "WORK", "due_date": today.isoformat()}, headers=headers)
+    done = client.post(url, json={"title": "Done late", "due_date": yesterday}, headers=headers)
+    client.put(f"{url}/{done.json()['id']}", json={"completed": True}, headers=headers)
+
+    stats = client.get(f"{url}/stats", headers=headers).json()
+    assert stats["total"] == 3
+    assert stats["completed"] == 1
+    assert stats["pending"] == 2
+    assert stats["overdue"] == 1
+    assert stats["due_today"] == 1
+    assert stats["by_priority"] == {"LOW": 0, "MEDIUM": 2, "HIGH": 1, "URGENT": 0}
+    assert stats["by_category"]["WORK"] == 1
+    assert stats["by_category"]["OTHER"] == 2
+
+    result = asyncio.run(task_mcp_server._task_stats(db_session, {"user_id": user_id}))
+    assert "Total: 3" in result[0].text
+    assert "Overdue: 1" in result[0].text
+    assert "By priority: MEDIUM: 2, HIGH: 1" in result[0].text
+
+    assert client.get(f"/api/{user_id + 1}/tasks/stats", headers=headers).status_code == 403
+
+
+def test_task_changes_delta_sync(client, test_user):
+    """Test delta sync returns only changes since the cursor, with deletions."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    ids = [
+        client.post(url, json={"title": f"Task {i}"}, headers=headers).json()["id"]
+        for i in range(3)
+    ]
+    # Deleted before the first sync: not reported to a client with no cursor
+    gone = client.post(url, json={"title": "Gone"}, headers=headers).json()["id"]
+    client.delete(f"{url}/{gone}", headers=headers)
+
+    # Initial sync, paged
+    first = client.get(f"{url}/changes", params={"limit": 2}, headers=headers).json()
+    assert [task["id"] for task in first["updated"]] == ids[:2]
+    assert first["deleted"] == []
+    assert first["has_more"] is True
+    second = client.get(
+        f"{url}/changes", params={"since": first["cursor"], "limit": 2}, headers=headers
+    ).json()
+    assert [task["id"] for task in second["updated"]] == ids[2:]
+    assert second["has_more"] is False
+
+    # Nothing changed since
+    idle = client.get(f"{url}/changes", params={"since": second["cursor"]}, headers=headers).json()
+    assert idle["updated"] == [] and idle["deleted"] == []
+    assert idle["has_more"] is False
+
+    client.put(f"{url}/{ids[0]}", json={"title": "Renamed"}, headers=headers)
+    client.post(
+        f"{url}/batch",
+        json={"operations": [
+            {"op": "complete", "task_id": ids[1], "completed": True},
+            {"op": "delete", "task_id": ids[2]},
+        ]},
+        headers=headers,
+    )
+
+    delta = client.get(f"{url}/changes", params={"since": idle["cursor"]}, headers=headers).json()
+    assert [(task["id"], task["title"], task["completed"]) for task in delta["updated"]] == [
+        (ids[0], "Renamed", False),
+        (ids[1], "Task 1", True),
+    ]
+    assert [tombstone["task_id"] for tombstone in delta["deleted"]] == [ids[2]]
+
+    response = client.get(f"{url}/changes", params={"since": "bogus"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_batch_task_operations(client, test_user):
+    """Test applying mixed operations in one batch request."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    ids = [
+        client.post(url, json={"title": f"Task {i}"}, headers=headers).json()["id"]
+        for i in range(3)
+    ]
+
+    response = client.post(
+        f"{url}/batch",
+        json={
+            "operations": [
+                {"op": "create", "task": {"title": "New", "priority": "HIGH"}},
+                {"op": "update", "task_id": ids[0], "changes": {"title": "Renamed"}},
+                {"op": "complete", "task_id": ids[1]},
+                {"op": "delete", "task_id": ids[2]},
+                {"op": "delete", "task_id": 99999},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == [
+        "created", "updated", "updated", "deleted", "not_found",
+    ]
+    assert results[0]["task"]["title"] == "New"
+    assert results[0]["task"]["priority"] == "HIGH"
+    assert results[1]["task"]["title"] == "Renamed"
+    assert results[2]["task"]["completed"] is True
+
+    titles = {task["title"]: task for task in client.get(url, headers=headers).json()}
+    assert set(titles) == {"New", "Renamed", "Task 1"}
+    assert titles["Task 1"]["completed"] is True
+
+
+def test_batch_empty_update_changes_nothing(client, test_user):
+    """Test that an update with no fields leaves the version and ETag alone."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    task = client.post(url, json={"title": "Task"}, headers=headers).json()
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    response = client.post(
+        f"{url}/batch",
+        json={"operations": [{"op": "update", "task_id": task["id"], "changes": {}}]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    [result] = response.json()["results"]
+    assert result["status"] == "updated"
+    assert result["task"]["version"] == task["version"]
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_batch_rejects_duplicate_task(client, test_user):
+    """Test that a batch may not target the same task twice."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    task_id = client.post(url, json={"title": "Task"}, headers=headers).json()["id"]
+
+    response = client.post(
+        f"{url}/batch",
+        json={
+            "operations": [
+                {"op": "complete", "task_id": task_id},
+                {"op": "delete", "task_id": task_id},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+def test_batch_statement_count_is_constant(client, test_user, db_session):
+    """Test that batch cost scales with operation kinds, not item count."""
+    from sqlalchemy import event
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    engine = db_session.get_bind()
+
+    def run_batch(size):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if "tasks" in statement:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            response = client.post(
+                f"{url}/batch",
+                json={"operations": [
+                    {"op": "create", "task": {"title": f"T{i}"}} for i in range(size)
+                ]},
+                headers=headers,
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        assert response.status_code == 200
+        return len(statements)
+
+    assert run_batch(2) == run_batch(50)
+
+
+def test_conditional_get_with_etag(client, test_user, db_session):
+    """Test that If-None-Match short-circuits to 304 until a write happens."""
+    from sqlalchemy import event
+
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    task_id = client.post(url, json={"title": "Task"}, headers=headers).json()["id"]
+
+    first = client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+
+    engine = db_session.get_bind()
+    task_queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM tasks" in statement:
+            task_queries.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        cached = client.get(url, headers={**headers, "If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert task_queries == []
+
+    # Different query parameters are a different representation
+    filtered = client.get(url, params={"completed": True}, headers={**headers, "If-None-Match": etag})
+    assert filtered.status_code == 200
+
+    # Single-task ETag
+    single = client.get(f"{url}/{task_id}", headers=headers)
+    single_etag = single.headers["ETag"]
+    assert client.get(
+        f"{url}/{task_id}", headers={**headers, "If-None-Match": single_etag}
+    ).status_code == 304
+
+    # Any write invalidates both validators
+    client.put(f"{url}/{task_id}", json={"completed": True}, headers=headers)
+    refreshed = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+    assert client.get(
+        f"{url}/{task_id}", headers={**headers, "If-None-Match": single_etag}
+    ).status_code == 200
+
+
+def test_update_with_if_match(client, test_user):
+    """Test optimistic concurrency: If-Match applies or fails with 412."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    created = client.post(url, json={"title": "Draft"}, headers=headers)
+    assert created.json()["version"] == 1
+    task_url = f"{url}/{created.json()['id']}"
+
+    etag = client.get(task_url, headers=headers).headers["ETag"]
+    assert etag == created.headers["ETag"] == '"1"'
+
+    first = client.put(task_url, json={"title": "UI edit"}, headers={**headers, "If-Match": etag})
+    assert first.status_code == 200
+    assert first.json()["version"] == 2
+    assert first.headers["ETag"] == '"2"'
+
+    # A second writer still holding version 1 loses instead of overwriting
+    stale = client.put(task_url, json={"title": "Chat edit"}, headers={**headers, "If-Match": etag})
+    assert stale.status_code == 412
+    assert stale.headers["ETag"] == '"2"'
+    assert client.get(task_url, headers=headers).json()["title"] == "UI edit"
+
+    # Weak validators never satisfy If-Match; "*" and a list with the current tag do
+    weak = client.put(task_url, json={"title": "x"}, headers={**headers, "If-Match": 'W/"2"'})
+    assert weak.status_code == 412
+    listed = client.put(task_url, json={"completed": True}, headers={**headers, "If-Match": '"1", "2"'})
+    assert listed.json()["version"] == 3
+    assert client.put(task_url, json={"title": "Any"}, headers={**headers, "If-Match": "*"}).status_code == 200
+
+    # Without If-Match the update stays unconditional
+    assert client.put(task_url, json={"title": "Blind"}, headers=headers).json()["version"] == 5
+
+    missing = client.put(f"{url}/999999", json={"title": "x"}, headers={**headers, "If-Match": '"1"'})
+    assert missing.status_code == 404
+
+
+def test_search_tasks(client, test_user):
+    """Test ranked, user-scoped full-text search."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    client.post(url, json={"title": "Buy groceries", "description": "milk and bread"}, headers=headers)
+    client.post(url, json={"title": "Bread bread bread", "description": "bake bread"}, headers=headers)
+    client.post(url, json={"title": "Write report"}, headers=headers)
+
+    response = client.get(f"{url}/search", params={"q": "bread"}, headers=headers)
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()] == ["Bread bread bread", "Buy groceries"]
+
+    # Prefix matching and punctuation-safe parsing
+    response = client.get(f"{url}/search", params={"q": 'groc" ('}, headers=headers)
+    assert [task["title"] for task in response.json()] == ["Buy groceries"]
+
+    # Pagination
+    response = client.get(f"{url}/search", params={"q": "bread", "limit": 1}, headers=headers)
+    assert len(response.json()) == 1
+    assert response.headers["X-Next-Offset"] == "1"
+
+
+def test_search_tracks_updates_and_deletes(client, test_user):
+    """Test that the search index follows task writes."""
+    headers = {"Authorization": f"Bearer {test_user['token']}"}
+    url = f"/api/{test_user['user']['id']}/tasks"
+    task_id = client.post(url, json={"title": "Call plumber"}, headers=headers).json()["id"]
+
+    client.put(f"{url}/{task_id}", json={"title": "Call electrician"}, headers=headers)
+    assert client.get(f"{url}/search", params={"q": "plumber"}, headers=headers).json() == []
+    assert len(client.get(f"{url}/search", params={"q": "electrician"}, headers=headers).json()) == 1
+
+    client.delete(f"{url}/{task_id}", headers=headers)
+    assert client.get(f"{url}/search", params={"q": "electrician"}, headers=headers).json() == []
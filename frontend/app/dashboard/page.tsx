@@ -21,8 +21,18 @@ export default function DashboardPage() {
     }
   }, [session, isPending, router]);
 
-  const { tasks, loading, error, createTask, updateTask, deleteTask } =
-    useTasks(session?.user?.id ? Number(session.user.id) : null);
+  const {
+    tasks,
+    stats,
+    loading,
+    loadingMore,
+    hasMore,
+    loadMore,
+    error,
+    createTask,
+    updateTask,
+    deleteTask,
+  } = useTasks(session?.user?.id ? Number(session.user.id) : null);
 
   const handleLogout = async () => {
     await betterAuthWrapper.signOut();
@@ -65,9 +75,10 @@ export default function DashboardPage() {
     return null; // Will redirect in useEffect
   }
 
-  const completedTasks = tasks.filter((t) => t.completed).length;
-  const totalTasks = tasks.length;
-  const pendingTasks = totalTasks - completedTasks;
+  // From the stats endpoint: the task list only holds the pages loaded so far
+  const completedTasks = stats?.completed ?? 0;
+  const totalTasks = stats?.total ?? 0;
+  const pendingTasks = stats?.pending ?? 0;
   const progressPercentage = totalTasks > 0 ? (completedTasks / totalTasks) * 100 : 0;
 
   return (
@@ -232,6 +243,9 @@ export default function DashboardPage() {
             loading={loading}
             onUpdate={updateTask}
             onDelete={deleteTask}
+            hasMore={hasMore}
+            loadingMore={loadingMore}
+            onLoadMore={loadMore}
           />
         </div>
       </main>
@@ -8,6 +8,9 @@ interface TaskListProps {
   loading: boolean;
   onUpdate: (taskId: number, data: TaskUpdate) => Promise<Task | null>;
   onDelete: (taskId: number) => Promise<boolean>;
+  hasMore?: boolean;
+  loadingMore?: boolean;
+  onLoadMore?: () => void;
 }
 
 export default function TaskList({
@@ -15,6 +18,9 @@ export default function TaskList({
   loading,
   onUpdate,
   onDelete,
+  hasMore = false,
+  loadingMore = false,
+  onLoadMore,
 }: TaskListProps) {
   if (loading) {
     return (
@@ -127,6 +133,20 @@ export default function TaskList({
           </div>
         </div>
       )}
+
+      {/* Further pages are fetched only when asked for */}
+      {hasMore && onLoadMore && (
+        <div className="text-center">
+          <button
+            type="button"
+            onClick={onLoadMore}
+            disabled={loadingMore}
+            className="px-6 py-2 font-mono text-sm text-neon-cyan bg-neon-cyan/10 border border-neon-cyan/50 rounded shadow-[0_0_10px_rgba(0,255,255,0.3)] hover:bg-neon-cyan/20 disabled:opacity-50 transition-colors"
+          >
+            {loadingMore ? "> Loading..." : "> [LOAD_MORE]"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
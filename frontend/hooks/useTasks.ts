@@ -4,13 +4,18 @@
 
 import { useState, useEffect, useCallback } from "react";
 import { api } from "@/lib/api";
-import { Task, TaskCreate, TaskUpdate } from "@/lib/types";
+import { Task, TaskCreate, TaskStats, TaskUpdate } from "@/lib/types";
 
 interface UseTasksReturn {
   tasks: Task[];
+  // Counts over all of the user's tasks, not just the pages loaded so far
+  stats: TaskStats | null;
   loading: boolean;
+  loadingMore: boolean;
+  hasMore: boolean;
   error: string | null;
   refetch: () => Promise<void>;
+  loadMore: () => Promise<void>;
   createTask: (data: TaskCreate) => Promise<Task | null>;
   updateTask: (taskId: number, data: TaskUpdate) => Promise<Task | null>;
   deleteTask: (taskId: number) => Promise<boolean>;
@@ -19,8 +24,21 @@ interface UseTasksReturn {
 export function useTasks(userId: number | null): UseTasksReturn {
   const [tasks, setTasks] = useState<Task[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [stats, setStats] = useState<TaskStats | null>(null);
   const [error, setError] = useState<string | null>(null);
 
+  const fetchStats = useCallback(async () => {
+    if (!userId) return;
+
+    try {
+      setStats(await api.getTaskStats(userId));
+    } catch {
+      // Stale counts are better than none; the task list reports errors
+    }
+  }, [userId]);
+
   const fetchTasks = useCallback(async () => {
     if (!userId) {
       setLoading(false);
@@ -30,19 +48,41 @@ export function useTasks(userId: number | null): UseTasksReturn {
     try {
       setLoading(true);
       setError(null);
-      const data = await api.getTasks(userId);
-      setTasks(data);
+      // First page only; further pages are fetched on demand by loadMore
+      const [page] = await Promise.all([api.getTasks(userId), fetchStats()]);
+      setTasks(page.tasks);
+      setNextCursor(page.nextCursor);
     } catch (err: any) {
       setError(err.response?.data?.detail || "Failed to fetch tasks");
     } finally {
       setLoading(false);
     }
-  }, [userId]);
+  }, [userId, fetchStats]);
 
   useEffect(() => {
     fetchTasks();
   }, [fetchTasks]);
 
+  const loadMore = useCallback(async () => {
+    if (!userId || !nextCursor || loadingMore) return;
+
+    try {
+      setLoadingMore(true);
+      setError(null);
+      const page = await api.getTasks(userId, nextCursor);
+      setTasks((prev) => {
+        // A task created locally since the last page may come back again
+        const seen = new Set(prev.map((task) => task.id));
+        return [...prev, ...page.tasks.filter((task) => !seen.has(task.id))];
+      });
+      setNextCursor(page.nextCursor);
+    } catch (err: any) {
+      setError(err.response?.data?.detail || "Failed to fetch tasks");
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [userId, nextCursor, loadingMore]);
+
   const createTask = async (data: TaskCreate): Promise<Task | null> => {
     if (!userId) return null;
 
@@ -50,6 +90,7 @@ export function useTasks(userId: number | null): UseTasksReturn {
       setError(null);
       const newTask = await api.createTask(userId, data);
       setTasks((prev) => [...prev, newTask]);
+      fetchStats();
       return newTask;
     } catch (err: any) {
       setError(err.response?.data?.detail || "Failed to create task");
@@ -69,6 +110,7 @@ export function useTasks(userId: number | null): UseTasksReturn {
       setTasks((prev) =>
         prev.map((task) => (task.id === taskId ? updatedTask : task))
       );
+      fetchStats();
       return updatedTask;
     } catch (err: any) {
       setError(err.response?.data?.detail || "Failed to update task");
@@ -83,6 +125,7 @@ export function useTasks(userId: number | null): UseTasksReturn {
       setError(null);
       await api.deleteTask(userId, taskId);
       setTasks((prev) => prev.filter((task) => task.id !== taskId));
+      fetchStats();
       return true;
     } catch (err: any) {
       setError(err.response?.data?.detail || "Failed to delete task");
@@ -92,9 +135,13 @@ export function useTasks(userId: number | null): UseTasksReturn {
 
   return {
     tasks,
+    stats,
     loading,
+    loadingMore,
+    hasMore: nextCursor !== null,
     error,
     refetch: fetchTasks,
+    loadMore,
     createTask,
     updateTask,
     deleteTask,
@@ -8,6 +8,11 @@ import {
   Task,
   TaskCreate,
   TaskUpdate,
+  TaskBatchOperation,
+  TaskBatchResult,
+  TaskChanges,
+  TaskPage,
+  TaskStats,
   UserRegister,
   UserLogin,
   AuthToken,
@@ -77,8 +82,21 @@ class ApiClient {
   }
 
   // Task endpoints
-  async getTasks(userId: number): Promise<Task[]> {
-    const response = await this.client.get<Task[]>(`/api/${userId}/tasks`);
+  async getTasks(userId: number, cursor?: string): Promise<TaskPage> {
+    // One page per call; X-Next-Cursor points at the next one
+    const response = await this.client.get<Task[]>(`/api/${userId}/tasks`, {
+      params: cursor ? { cursor } : undefined,
+    });
+    return {
+      tasks: response.data,
+      nextCursor: response.headers["x-next-cursor"] ?? null,
+    };
+  }
+
+  async getTaskStats(userId: number): Promise<TaskStats> {
+    const response = await this.client.get<TaskStats>(
+      `/api/${userId}/tasks/stats`
+    );
     return response.data;
   }
 
@@ -113,6 +131,25 @@ class ApiClient {
     await this.client.delete(`/api/${userId}/tasks/${taskId}`);
   }
 
+  async batchTasks(
+    userId: number,
+    operations: TaskBatchOperation[]
+  ): Promise<TaskBatchResult[]> {
+    const response = await this.client.post<{ results: TaskBatchResult[] }>(
+      `/api/${userId}/tasks/batch`,
+      { operations }
+    );
+    return response.data.results;
+  }
+
+  async getTaskChanges(userId: number, since?: string): Promise<TaskChanges> {
+    const response = await this.client.get<TaskChanges>(
+      `/api/${userId}/tasks/changes`,
+      { params: since ? { since } : {} }
+    );
+    return response.data;
+  }
+
   // Chat endpoints
   async sendChatMessage(message: string, conversationId?: number): Promise<{ message: string; conversation_id: number }> {
     const response = await this.client.post("/api/chat", {
@@ -38,6 +38,23 @@ export interface Task {
   user_id: number;
   created_at: string;
   updated_at: string;
+  version: number;
+}
+
+export interface TaskPage {
+  tasks: Task[];
+  // Cursor for the following page; null on the last page
+  nextCursor: string | null;
+}
+
+export interface TaskStats {
+  total: number;
+  completed: number;
+  pending: number;
+  overdue: number;
+  due_today: number;
+  by_priority: Partial<Record<TaskPriority, number>>;
+  by_category: Partial<Record<TaskCategory, number>>;
 }
 
 export interface TaskCreate {
@@ -57,6 +74,27 @@ export interface TaskUpdate {
   due_date?: string;
 }
 
+export type TaskBatchOperation =
+  | { op: "create"; task: TaskCreate }
+  | { op: "update"; task_id: number; changes: TaskUpdate }
+  | { op: "complete"; task_id: number; completed?: boolean }
+  | { op: "delete"; task_id: number };
+
+export interface TaskBatchResult {
+  index: number;
+  op: string;
+  status: "created" | "updated" | "deleted" | "not_found";
+  task_id: number | null;
+  task: Task | null;
+}
+
+export interface TaskChanges {
+  updated: Task[];
+  deleted: { task_id: number; deleted_at: string }[];
+  cursor: string;
+  has_more: boolean;
+}
+
 export interface UserRegister {
   username: string;
   email: string;